@@ -1,14 +1,27 @@
-from copy import deepcopy
+import os
+import argparse
+import yaml
 from config import (
     ALMANAC_SYSTEM_DATA_PATH,
     INARA_SYSTEM_DATA_PATH,
     INORGANIC_GROUPS_PATH,
-    RAW_SYSTEMS_DATA_PATH
+    RAW_SYSTEMS_DATA_PATH,
+    NAME_MATCH_CACHE_PATH,
+    COMBINE_CHANGE_LOG_PATH,
+    MY_SYSTEM_DATA_PATH,
+    FIX_RULES_PATH
 )
-from common import load_system_data, save_system_data, load_resource_groups
+from common import load_system_data, save_system_data, load_resource_groups, hash_data, save_json_atomic
+from resource_coverage import get_resource_coverage, get_resource_rows, get_row_resources
 
 # Constant to control the verbosity of fixed discrepancy messages
 PRINT_FIXED = False
+# List every unmatched planet by system, not just the totals
+PRINT_UNMATCHED = False
+# Part of the name match cache keys. Bump when the matching rules change.
+NAME_MATCHER_VERSION = 1
+# Part of every system's rules hash. Bump when the stitching rules change so every system is stitched again.
+COMBINE_RULES_VERSION = 2
 
 
 def get_almanac_flora_fauna_set(biomes):
@@ -29,21 +42,6 @@ def get_almanac_flora_fauna_set(biomes):
     return flora, fauna
 
 
-def get_almanac_inorganic(biomes):
-    """
-    Extract inorganic resources from almanac biomes.
-
-    Parameters:
-    - biomes (dict): Biomes data from almanac.
-
-    Returns:
-    - set: Set of inorganic resources.
-    """
-    inorganic = set()
-    for biome in biomes.values():
-        inorganic.update(biome.get('resources', {}).get('inorganic', []))
-    return inorganic
-
 def get_inara_flora_fauna_set(flora, fauna):
     """
     Extract flora and fauna sets from INARA data.
@@ -64,48 +62,129 @@ def get_inara_flora_fauna_set(flora, fauna):
 
     return flora_set, fauna_set
 
-def handle_flora_fauna_discrepancies(fixed_planet, almanac_flora, almanac_fauna, inara_flora, inara_fauna):
+
+def create_name_matcher(candidates, name_match_cache=None):
+    """
+    Precompile Almanac organism names for matching INARA names against them.
+
+    Parameters:
+    - candidates (set): Almanac flora or fauna names of a planet.
+    - name_match_cache (dict): Results of earlier runs, see load_name_match_cache.
+
+    Returns:
+    - dict: The lowercased candidates in a fixed order and the results so far.
+    """
+    entries = []
+    for candidate in sorted(candidates):
+        lowered = candidate.lower()
+        entries.append((lowered, f" {lowered} ", candidate))
+    key = hash_data(NAME_MATCHER_VERSION, sorted(candidates))
+    return {"key": key, "entries": entries, "matches": dict((name_match_cache or {}).get(key, {}))}
+
+
+def match_name(matcher, name):
+    """
+    Find the Almanac name an INARA name is part of (case insensitive).
+    Among several, prefers an exact match, then one containing the name as whole words,
+    then the shortest and finally the alphabetically first, so the result never depends on set order.
+
+    Parameters:
+    - matcher (dict): Matcher from create_name_matcher.
+    - name (str): INARA flora or fauna name.
+
+    Returns:
+    - str: The best Almanac name, or `name` if none contains it.
+    """
+    if name not in matcher["matches"]:
+        lowered = name.lower()
+        padded = f" {lowered} "
+        best_rank, best_candidate = None, name
+        for candidate_lowered, candidate_padded, candidate in matcher["entries"]:
+            if lowered not in candidate_lowered:
+                continue
+            rank = (candidate_lowered != lowered, padded not in candidate_padded, len(candidate_lowered), candidate)
+            if best_rank is None or rank < best_rank:
+                best_rank, best_candidate = rank, candidate
+        matcher["matches"][name] = best_candidate
+    return matcher["matches"][name]
+
+
+def match_names(matcher, names):
+    """
+    Match a batch of INARA names, see match_name.
+
+    Parameters:
+    - matcher (dict): Matcher from create_name_matcher.
+    - names (iterable): INARA flora or fauna names.
+
+    Returns:
+    - dict: INARA name to its best Almanac name.
+    """
+    return {name: match_name(matcher, name) for name in names}
+
+
+def load_name_match_cache(path=NAME_MATCH_CACHE_PATH):
+    """
+    Load the name matches of earlier runs, keyed by the matcher key of their candidates.
+
+    Parameters:
+    - path (str): Cache file.
+
+    Returns:
+    - dict: Matcher key to {INARA name: Almanac name}.
+    """
+    if not os.path.exists(path):
+        return {}
+    return load_system_data(path)
+
+
+def handle_flora_fauna_discrepancies(fixed_planet, flora_matcher, fauna_matcher, inara_flora, inara_fauna):
     """
     Handle discrepancies in flora and fauna between Almanac and INARA.
 
     Parameters:
     - fixed_planet (dict): The planet data from fixed_data.
-    - almanac_flora (set): Flora from Almanac.
-    - almanac_fauna (set): Fauna from Almanac.
+    - flora_matcher (dict): Matcher over the Almanac flora, see create_name_matcher.
+    - fauna_matcher (dict): Matcher over the Almanac fauna.
     - inara_flora (set): Flora from INARA.
     - inara_fauna (set): Fauna from INARA.
     """
+    fauna_matches = match_names(fauna_matcher, inara_fauna)
+    flora_matches = match_names(flora_matcher, inara_flora)
+
     # Correct fauna names directly within the fixed_planet structure
     for category in ['domesticable', 'gatherable']:
         if category in fixed_planet['fauna']:
+            renamed = {}
             for key, fauna_name in fixed_planet['fauna'][category].items():
-                matched_name = next(
-                    (a_fauna for a_fauna in almanac_fauna if fauna_name.lower() in a_fauna.lower()),
-                    fauna_name
-                )
+                matched_name = fauna_matches[fauna_name]
                 if matched_name != fauna_name and PRINT_FIXED:
                     print(
                         f"\nFauna Fixed for {fixed_planet['name']}:\n"
                         f"Original: {fauna_name}\n"
                         f"Fixed: {matched_name}"
                     )
-                fixed_planet['fauna'][category][key] = matched_name
+                renamed[key] = matched_name
+            if renamed != fixed_planet['fauna'][category]:
+                # Copy on write, the input planet keeps its names
+                fixed_planet['fauna'] = {**fixed_planet['fauna'], category: renamed}
 
     # Correct flora names directly within the fixed_planet structure
     for category in ['domesticable', 'gatherable']:
         if category in fixed_planet['flora']:
+            renamed = {}
             for key, flora_name in fixed_planet['flora'][category].items():
-                matched_name = next(
-                    (a_flora for a_flora in almanac_flora if flora_name.lower() in a_flora.lower()),
-                    flora_name
-                )
+                matched_name = flora_matches[flora_name]
                 if matched_name != flora_name and PRINT_FIXED:
                     print(
                         f"\nFlora Fixed for {fixed_planet['name']}:\n"
                         f"Original: {flora_name}\n"
                         f"Fixed: {matched_name}"
                     )
-                fixed_planet['flora'][category][key] = matched_name
+                renamed[key] = matched_name
+            if renamed != fixed_planet['flora'][category]:
+                # Copy on write, the input planet keeps its names
+                fixed_planet['flora'] = {**fixed_planet['flora'], category: renamed}
 
     # Case 1: Missing Fauna or Flora in Almanac Only (Ignored)
     # No action needed, as per user instructions
@@ -129,9 +208,10 @@ def handle_biome_discrepancies(fixed_planet, almanac_planet):
 
     # Case 2: Missing Biome in Almanac Only (Add as empty biome)
     if missing_in_almanac_biomes:
-        for biome in missing_in_almanac_biomes:
-            fixed_planet['biomes'].append(biome)
-            fixed_planet['biome_resources'][biome] = {}
+        fixed_planet['biomes'] = fixed_planet['biomes'] + list(missing_in_almanac_biomes)
+        fixed_planet['biome_resources'] = {
+            **fixed_planet['biome_resources'], **{biome: {} for biome in missing_in_almanac_biomes}
+        }
         if PRINT_FIXED:
             print(
                 f"\nBiome discrepancy for {fixed_planet['name']}:\n"
@@ -142,18 +222,58 @@ def handle_biome_discrepancies(fixed_planet, almanac_planet):
     return missing_in_inara_biomes, missing_in_almanac_biomes
 
 
-def handle_inorganic_discrepancies(fixed_planet, almanac_planet, resource_groups, missing_in_inara_biomes, missing_in_almanac_biomes):
+def set_planet_inorganics(fixed_planet, inorganics):
+    """
+    Replace a planet's inorganic resources. The resources dict is copied rather than modified,
+    as it is shared with the INARA input.
+
+    Parameters:
+    - fixed_planet (dict): The planet data from fixed_data.
+    - inorganics (list): The new inorganic resources.
+    """
+    fixed_planet["resources"] = {**fixed_planet["resources"], "inorganic": inorganics}
+
+
+def set_biome_inorganics(fixed_planet, biome_name, inorganics):
+    """
+    Replace the inorganic resources of one of a planet's biomes, adding the biome if it has none.
+    The biome_resources dict and the biome's dict are copied rather than modified,
+    as they are shared with the INARA input.
+
+    Parameters:
+    - fixed_planet (dict): The planet data from fixed_data.
+    - biome_name (str): The biome.
+    - inorganics (list): The new inorganic resources.
+    """
+    biome_resources = fixed_planet["biome_resources"]
+    fixed_planet["biome_resources"] = {
+        **biome_resources, biome_name: {**biome_resources.get(biome_name, {}), "inorganic": inorganics}
+    }
+
+
+def handle_inorganic_discrepancies(
+    fixed_planet,
+    almanac_coverage,
+    almanac_row,
+    resource_groups,
+    missing_in_inara_biomes,
+    missing_in_almanac_biomes,
+    fix_rules,
+):
     """
     Handle discrepancies in inorganic resources between Almanac and INARA.
 
     Parameters:
     - fixed_planet (dict): The planet data from fixed_data.
-    - almanac_planet (dict): The corresponding planet data from Almanac.
+    - almanac_coverage (dict): Resource coverage of the Almanac, see resource_coverage.py.
+    - almanac_row (int): Row of the corresponding Almanac planet in almanac_coverage.
     - resource_groups (dict): Mapping of resource groups to their respective resources.
     - missing_in_inara_biomes (set): Biomes missing in INARA.
     - missing_in_almanac_biomes (set): Biomes missing in Almanac.
+    - fix_rules (dict): Rule table from compile_fix_rules, for inorganics missing on both sides.
     """
-    almanac_inorganic = get_almanac_inorganic(almanac_planet["biomes"])
+    almanac_inorganic = get_row_resources(almanac_coverage, "planet_resources", almanac_row, "inorganic")
+    almanac_biome_rows = almanac_coverage["planet_biomes"][almanac_row]
     fixed_inorganic = set(fixed_planet.get("resources", {}).get("inorganic", []))
     missing_in_inara_inorganic = almanac_inorganic - fixed_inorganic  # Inorganics present in Almanac but missing in INARA
     missing_in_almanac_inorganic = fixed_inorganic - almanac_inorganic  # Inorganics present in INARA but missing in Almanac
@@ -168,11 +288,11 @@ def handle_inorganic_discrepancies(fixed_planet, almanac_planet, resource_groups
                     group_found = True
                     # Assign to a biome that contains another resource from the same group
                     assigned = False
-                    for biome_name, biome_data in almanac_planet['biomes'].items():
-                        biome_inorganics = set(biome_data.get('resources', {}).get('inorganic', []))
-                        if any(r in resources for r in biome_inorganics):
-                            # Ensure 'inorganic' key is initialized
-                            fixed_planet["biome_resources"].setdefault(biome_name, {}).setdefault("inorganic", []).append(resource)
+                    for biome_row in get_resource_rows(almanac_coverage, "biome_resources", resources):
+                        if biome_row in almanac_biome_rows:
+                            biome_name = almanac_coverage["biomes"][biome_row][1]
+                            biome_inorganics = fixed_planet["biome_resources"].get(biome_name, {}).get("inorganic", [])
+                            set_biome_inorganics(fixed_planet, biome_name, biome_inorganics + [resource])
                             if PRINT_FIXED:
                                 print(
                                     f"\nInorganic discrepancy for {fixed_planet['name']}:\n"
@@ -200,9 +320,9 @@ def handle_inorganic_discrepancies(fixed_planet, almanac_planet, resource_groups
 
     # Case 4: Missing Inorganic in INARA Only
     if missing_in_inara_inorganic:
-        if "inorganic" not in fixed_planet["resources"]:
-            fixed_planet["resources"]["inorganic"] = []
-        fixed_planet["resources"]["inorganic"].extend(sorted(missing_in_inara_inorganic))
+        set_planet_inorganics(
+            fixed_planet, fixed_planet["resources"].get("inorganic", []) + sorted(missing_in_inara_inorganic)
+        )
         if PRINT_FIXED:
             print(
                 f"\nInorganic discrepancy for {fixed_planet['name']}:\n"
@@ -212,26 +332,22 @@ def handle_inorganic_discrepancies(fixed_planet, almanac_planet, resource_groups
 
     # Case 6: Missing Inorganic in Both INARA and Almanac
     if missing_in_inara_inorganic and missing_in_almanac_inorganic:
-        # Specific case: Helium-3 vs Water
-        if missing_in_inara_inorganic == {'Helium-3'} and missing_in_almanac_inorganic == {'Water'}:
-            # Replace 'Helium-3' with 'Water'
-            fixed_planet["resources"]["inorganic"] = sorted(
-                (almanac_inorganic | fixed_inorganic) - {'Helium-3'} | {'Water'}
-            )
+        rule = find_fix_rule(fix_rules, fixed_planet['name'], missing_in_inara_inorganic, missing_in_almanac_inorganic)
+        if rule is not None:
+            apply_fix_rule(fixed_planet, rule)
             if PRINT_FIXED:
                 print(
-                    f"\nInorganic discrepancy for {fixed_planet['name']}:\n"
+                    f"\nFix rule '{rule['id']}' applied for {fixed_planet['name']}:\n"
                     f"Missing in INARA Inorganic: {sorted(missing_in_inara_inorganic)}\n"
                     f"Missing in Almanac Inorganic: {sorted(missing_in_almanac_inorganic)}\n"
-                    f"Solution: Replaced 'Helium-3' with 'Water'."
+                    f"Solution: {rule['solution']}"
                 )
         else:
-            # Flag for manual review
-            manual_review(
-                fixed_planet,
-                fixed_planet['name'],
-                sorted(missing_in_inara_inorganic),
-                sorted(missing_in_almanac_inorganic)
+            print(
+                f"\nManual Review Needed for {fixed_planet['name']}:\n"
+                f"Missing in INARA Inorganic: {sorted(missing_in_inara_inorganic)}\n"
+                f"Missing in Almanac Inorganic: {sorted(missing_in_almanac_inorganic)}\n"
+                f"Solution: Add a rule to {FIX_RULES_PATH}."
             )
 
         # Case 8: Missing Biome and Inorganic in Almanac (Assign to Missing Biome)
@@ -239,8 +355,8 @@ def handle_inorganic_discrepancies(fixed_planet, almanac_planet, resource_groups
             for resource in missing_in_almanac_inorganic:
                 assigned = False
                 for biome_name in missing_in_almanac_biomes:
-                    # Ensure 'biome_name' exists and 'inorganic' list is initialized
-                    fixed_planet["biome_resources"].setdefault(biome_name, {}).setdefault("inorganic", []).append(resource)
+                    biome_inorganics = fixed_planet["biome_resources"].get(biome_name, {}).get("inorganic", [])
+                    set_biome_inorganics(fixed_planet, biome_name, biome_inorganics + [resource])
                     if PRINT_FIXED:
                         print(
                             f"\nInorganic discrepancy for {fixed_planet['name']}:\n"
@@ -269,87 +385,134 @@ def map_biome_resources(fixed_planet, almanac_planet):
     - almanac_planet (dict): The corresponding planet data from Almanac.
     """
     for biome_name, biome_data in almanac_planet["biomes"].items():
-        if biome_name not in fixed_planet["biome_resources"]:
-            fixed_planet["biome_resources"][biome_name] = {}
-        fixed_planet["biome_resources"][biome_name]["inorganic"] = biome_data.get("resources", {}).get("inorganic", [])
+        set_biome_inorganics(fixed_planet, biome_name, biome_data.get("resources", {}).get("inorganic", []))
 
 
-def manual_review(fixed_planet, planet_name, missing_in_inara, missing_in_almanac):
+def load_fix_rules(path=FIX_RULES_PATH):
     """
-    Handle discrepancies that require manual review by applying predefined fixes.
-    
+    Load the fix rules for planets whose sources each miss inorganics the other has.
+    A rule matches on any of 'planet', 'missing_in_inara' and 'missing_in_almanac' (exact sets), and its
+    actions 'remove', 'replace' (old to new) and 'add' edit the planet's inorganics, in that order.
+    'sort' sorts the result. Every rule has an 'id' for the audit and a 'solution' describing the fix.
+
     Parameters:
-    - fixed_planet (dict): The planet data from fixed_data.
+    - path (str): JSON rule file.
+
+    Returns:
+    - list: The rules as written.
+    """
+    return load_system_data(path)
+
+
+def get_fix_rule_key(planet_name, missing_in_inara, missing_in_almanac):
+    """
+    Build a rule table key. Conditions a rule doesn't set are None.
+
+    Returns:
+    - tuple: Normalized planet name and frozensets of the missing inorganics.
+    """
+    return (
+        None if planet_name is None else normalize_planet_name(planet_name),
+        None if missing_in_inara is None else frozenset(missing_in_inara),
+        None if missing_in_almanac is None else frozenset(missing_in_almanac),
+    )
+
+
+def compile_fix_rules(rules):
+    """
+    Index fix rules by their match conditions.
+
+    Parameters:
+    - rules (list): Rules from load_fix_rules.
+
+    Returns:
+    - dict: The 'rules' as written and an 'index' from get_fix_rule_key to the rule.
+    """
+    index = {}
+    for rule in rules:
+        key = get_fix_rule_key(rule.get("planet"), rule.get("missing_in_inara"), rule.get("missing_in_almanac"))
+        if key in index:
+            raise ValueError(f"Fix rules '{index[key]['id']}' and '{rule['id']}' have the same conditions")
+        index[key] = rule
+    return {"rules": rules, "index": index}
+
+
+def find_fix_rule(fix_rules, planet_name, missing_in_inara, missing_in_almanac):
+    """
+    Find the most specific rule matching a planet: a rule for the planet beats a rule for the missing
+    inorganics alone, and more conditions beat fewer. A fixed number of lookups, however many rules there are.
+
+    Parameters:
+    - fix_rules (dict): Rule table from compile_fix_rules.
     - planet_name (str): Name of the planet.
-    - missing_in_inara (list): List of inorganics missing in INARA.
-    - missing_in_almanac (list): List of inorganics missing in Almanac.
-    """
-    # Define manual fixes based on planet names
-    manual_fixes = {
-        "Ourea": {
-            "add": ["Copper"],
-            "remove": ["Cobalt"],
-            "solution": "Almanac is wrong. Fixed_planet should contain Copper, no Cobalt."
-        },
-        "Cruth": {
-            "add": ["Fluorine"],
-            "remove": ["Iron"],
-            "solution": "INARA is wrong. Fixed_planet should contain Fluorine, no Iron."
-        },
-        "Linnaeus IV-c": {
-            "add": ["Palladium"],
-            "remove": ["Lead"],
-            "solution": "INARA is wrong. Fixed_planet should contain Palladium, no Lead."
-        },
-        "Nirvana II": {
-            "add": [],
-            "remove": ["Iridium"],
-            "solution": "Almanac is wrong. No Iridium, but Vanadium is there."
-        },
-        "Tirna III": {
-            "add": [],
-            "remove": ["Mercury"],
-            "solution": "Almanac is wrong. It's Silver here, no Mercury."
-        },
-        "Heinlein III-a": {
-            "add": [],
-            "remove": ["Europium"],
-            "solution": "Almanac is wrong. It's got Europium."
-        },
-        "Muphrid I-a": {
-            "add": ["Aluminum", "Helium-3"],
-            "remove": ["Iridium", "Uranium"],
-            "solution": "INARA is wrong. It's got ['Aluminum', 'Helium-3']."
-        }
-    }
-    
-    if planet_name in manual_fixes:
-        fix = manual_fixes[planet_name]
-        
-        # Add missing inorganics from INARA
-        for resource in fix.get("add", []):
-            fixed_planet["resources"]["inorganic"].append(resource)
-        
-        # Remove inorganics missing in Almanac
-        for resource in fix.get("remove", []):
-            if resource in fixed_planet["resources"]["inorganic"]:
-                fixed_planet["resources"]["inorganic"].remove(resource)
-        
-        if PRINT_FIXED:
-            print(
-                f"\nManual Review Applied for {planet_name}:\n"
-                f"Missing in INARA Inorganic: {missing_in_inara}\n"
-                f"Missing in Almanac Inorganic: {missing_in_almanac}\n"
-                f"Solution: {fix['solution']}"
-            )
-    else:
-            print(
-                f"\nManual Review Needed for {planet_name}:\n"
-                f"Missing in INARA Inorganic: {missing_in_inara}\n"
-                f"Missing in Almanac Inorganic: {missing_in_almanac}\n"
-                f"Solution: Manual intervention required."
+    - missing_in_inara (set): Inorganics missing in INARA.
+    - missing_in_almanac (set): Inorganics missing in Almanac.
+
+    Returns:
+    - dict: The rule, or None if no rule matches.
+    """
+    for use_planet in (True, False):
+        for use_inara, use_almanac in ((True, True), (True, False), (False, True), (False, False)):
+            key = get_fix_rule_key(
+                planet_name if use_planet else None,
+                missing_in_inara if use_inara else None,
+                missing_in_almanac if use_almanac else None,
             )
+            if key in fix_rules["index"]:
+                return fix_rules["index"][key]
+    return None
+
+
+def apply_fix_rule(fixed_planet, rule):
+    """
+    Apply a fix rule's actions to the planet's inorganics and record the rule on the planet ('fix_rules').
+
+    Parameters:
+    - fixed_planet (dict): The planet data from fixed_data.
+    - rule (dict): The matching rule.
+    """
+    inorganics = list(fixed_planet["resources"].get("inorganic", []))
+    for resource in rule.get("remove", []):
+        if resource in inorganics:
+            inorganics.remove(resource)
+    for resource, replacement in rule.get("replace", {}).items():
+        if resource in inorganics:
+            position = inorganics.index(resource)
+            if replacement in inorganics:
+                del inorganics[position]
+            else:
+                inorganics[position] = replacement
+    for resource in rule.get("add", []):
+        if resource not in inorganics:
+            inorganics.append(resource)
+    if rule.get("sort"):
+        inorganics.sort()
+
+    set_planet_inorganics(fixed_planet, inorganics)
+    fixed_planet["fix_rules"] = fixed_planet.get("fix_rules", []) + [rule["id"]]
+
+
+def print_fix_rule_hits(fixed_data, fix_rules):
+    """
+    Print how many planets each fix rule corrected, from the 'fix_rules' recorded on the planets.
+    Rules that no longer match anything are listed so they can be reviewed or removed.
 
+    Parameters:
+    - fixed_data (list): The stitched systems.
+    - fix_rules (dict): Rule table from compile_fix_rules.
+    """
+    hits = {rule["id"]: [] for rule in fix_rules["rules"]}
+    for system in fixed_data:
+        for planet in system["planets"]:
+            for rule_id in planet.get("fix_rules", []):
+                hits.setdefault(rule_id, []).append(planet["name"])
+    applied = {rule_id: planets for rule_id, planets in hits.items() if planets}
+    print(f"Fix rules applied: {sum(len(planets) for planets in applied.values())} planets")
+    for rule_id, planets in applied.items():
+        print(f"  {rule_id}: {', '.join(planets)}")
+    unused = [rule_id for rule_id, planets in hits.items() if not planets]
+    if unused:
+        print(f"Fix rules without a match: {', '.join(unused)}")
 
 
 def assign_resource_to_biome(fixed_planet, resource, group_resources):
@@ -363,83 +526,502 @@ def assign_resource_to_biome(fixed_planet, resource, group_resources):
     """
     for biome_name, biome_data in fixed_planet['biome_resources'].items():
         if any(r in group_resources for r in biome_data.get('inorganic', [])):
-            fixed_planet["biome_resources"][biome_name]["inorganic"].append(resource)
+            set_biome_inorganics(fixed_planet, biome_name, biome_data["inorganic"] + [resource])
             return biome_name
     return None
 
 
-def stitch_planet_data(systems_almanac, systems_inara, resource_groups):
+def normalize_planet_name(name):
+    """
+    Returns the key planets are matched on: lowercase with runs of whitespace collapsed.
+
+    Parameters:
+    - name (str): Planet name from either source.
+
+    Returns:
+    - str: Normalized name.
+    """
+    return " ".join(name.lower().split())
+
+
+def build_planet_index(planets):
+    """
+    Index planets by normalized name. The first planet of a name wins, like a front to back scan would.
+
+    Parameters:
+    - planets (list): Planets in system order.
+
+    Returns:
+    - dict: Normalized name to position in `planets`.
+    """
+    planet_index = {}
+    for position, planet in enumerate(planets):
+        planet_index.setdefault(normalize_planet_name(planet["name"]), position)
+    return planet_index
+
+
+def get_unmatched_report(systems_almanac, systems_inara, matched_almanac_rows):
+    """
+    Collect the planets the two sources don't share.
+
+    Parameters:
+    - systems_almanac (list): List of systems from the Almanac.
+    - systems_inara (list): List of systems from INARA.
+    - matched_almanac_rows (set): Rows of the Almanac planets that matched an INARA planet.
+
+    Returns:
+    - dict: 'inara_only' and 'almanac_only' map system names to their unmatched planet names,
+      'almanac_systems_without_planets' lists Almanac systems that have no planets at all.
+    """
+    almanac_names = {
+        normalize_planet_name(planet["name"]) for system in systems_almanac for planet in system.get("planets", [])
+    }
+    report = {"inara_only": {}, "almanac_only": {}, "almanac_systems_without_planets": []}
+    for system in systems_inara:
+        for planet in system["planets"]:
+            if normalize_planet_name(planet["name"]) not in almanac_names:
+                report["inara_only"].setdefault(system["name"], []).append(planet["name"])
+
+    almanac_row = 0
+    for system in systems_almanac:
+        if not system.get("planets"):
+            report["almanac_systems_without_planets"].append(system["name"])
+        for planet in system.get("planets", []):
+            if almanac_row not in matched_almanac_rows:
+                report["almanac_only"].setdefault(system["name"], []).append(planet["name"])
+            almanac_row += 1
+    return report
+
+
+def print_unmatched_report(report):
+    """
+    Print totals of the unmatched planet report, and every planet when PRINT_UNMATCHED is set.
+
+    Parameters:
+    - report (dict): Report from get_unmatched_report.
+    """
+    for side, label in [("inara_only", "INARA planets with no Almanac match"),
+                        ("almanac_only", "Almanac planets with no INARA match")]:
+        planet_count = sum(len(planets) for planets in report[side].values())
+        print(f"{label}: {planet_count} in {len(report[side])} systems")
+        if PRINT_UNMATCHED:
+            for system_name, planets in report[side].items():
+                print(f"  {system_name}: {', '.join(planets)}")
+    print(f"Almanac systems without planets: {len(report['almanac_systems_without_planets'])}")
+    if PRINT_UNMATCHED and report["almanac_systems_without_planets"]:
+        print(f"  {', '.join(report['almanac_systems_without_planets'])}")
+
+
+def load_observations(path=MY_SYSTEM_DATA_PATH):
+    """
+    Load gameplay observations: system name to planet name to either biome name to the inorganics seen there,
+    or a planet-level flag such as 'He3Atmo: True'.
+
+    Parameters:
+    - path (str): YAML observation file.
+
+    Returns:
+    - dict: The observations, empty if there is no file.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as file:
+        return yaml.safe_load(file) or {}
+
+
+def build_observation_index(observations):
+    """
+    Index observations by normalized planet name, splitting biome observations from planet flags.
+
+    Parameters:
+    - observations (dict): Observations from load_observations.
+
+    Returns:
+    - dict: Normalized planet name to its 'system', 'planet', 'biomes' and 'flags' as written in the file.
+    """
+    observation_index = {}
+    for system_name, planets in observations.items():
+        for planet_name, planet_observations in (planets or {}).items():
+            biomes, flags = {}, {}
+            for key, value in (planet_observations or {}).items():
+                if isinstance(value, list):
+                    biomes[key] = value
+                else:
+                    flags[key] = value
+            observation_index[normalize_planet_name(planet_name)] = {
+                "system": system_name,
+                "planet": planet_name,
+                "biomes": biomes,
+                "flags": flags,
+            }
+    return observation_index
+
+
+def create_observation_stats():
+    """
+    Create the counters apply_observation fills in.
+
+    Returns:
+    - dict: Zeroed counters plus lists of 'system_mismatches' and 'unmatched' observations.
+    """
+    return {
+        "planets": 0,
+        "biomes_filled": 0,
+        "biomes_added": 0,
+        "biomes_overridden": 0,
+        "resources_added": 0,
+        "resources_dropped": 0,
+        "planet_inorganics_added": 0,
+        "flags": 0,
+        "system_mismatches": [],
+        "unmatched": [],
+    }
+
+
+def add_observation_stats(observation_stats, system_stats):
+    """
+    Add the counters a system recorded ('observation_stats', see stitch_planet_data) to the run's totals.
+
+    Parameters:
+    - observation_stats (dict): Counters from create_observation_stats, updated in place.
+    - system_stats (dict): The system's counters.
+    """
+    for key, value in system_stats.items():
+        observation_stats[key] += value
+
+
+def apply_observation(fixed_planet, observation, observation_stats):
+    """
+    Override a stitched planet with what was observed in game. Observations win over both sources:
+    an observed biome's inorganics replace the stitched ones, and missing biomes and planet inorganics are added.
+
+    Parameters:
+    - fixed_planet (dict): The stitched planet.
+    - observation (dict): The planet's entry from build_observation_index.
+    - observation_stats (dict): Counters from create_observation_stats, updated in place.
+    """
+    observed_inorganics = []
+    for biome_name, resources in observation["biomes"].items():
+        if biome_name not in fixed_planet["biomes"]:
+            fixed_planet["biomes"] = fixed_planet["biomes"] + [biome_name]
+            observation_stats["biomes_added"] += 1
+
+        biome_data = fixed_planet["biome_resources"].get(biome_name, {})
+        stitched = biome_data.get("inorganic")
+        if stitched is None:
+            observation_stats["biomes_filled"] += 1
+        elif set(stitched) != set(resources):
+            observation_stats["biomes_overridden"] += 1
+            observation_stats["resources_added"] += len(set(resources) - set(stitched))
+            observation_stats["resources_dropped"] += len(set(stitched) - set(resources))
+        set_biome_inorganics(fixed_planet, biome_name, list(resources))
+        observed_inorganics.extend(resource for resource in resources if resource not in observed_inorganics)
+
+    planet_inorganics = fixed_planet["resources"].get("inorganic", [])
+    missing_inorganics = [resource for resource in observed_inorganics if resource not in planet_inorganics]
+    if missing_inorganics:
+        set_planet_inorganics(fixed_planet, planet_inorganics + missing_inorganics)
+        observation_stats["planet_inorganics_added"] += len(missing_inorganics)
+
+    if observation["flags"]:
+        fixed_planet["observations"] = {**fixed_planet.get("observations", {}), **observation["flags"]}
+        observation_stats["flags"] += len(observation["flags"])
+    observation_stats["planets"] += 1
+
+
+def print_observation_stats(observation_stats):
+    """
+    Print what the observations changed and which of them matched nothing.
+
+    Parameters:
+    - observation_stats (dict): Counters from create_observation_stats.
+    """
+    print(
+        f"Observations applied to {observation_stats['planets']} planets: "
+        f"{observation_stats['biomes_filled']} biomes filled, {observation_stats['biomes_added']} biomes added, "
+        f"{observation_stats['biomes_overridden']} biomes overridden "
+        f"(+{observation_stats['resources_added']}/-{observation_stats['resources_dropped']} resources), "
+        f"{observation_stats['planet_inorganics_added']} planet inorganics added, {observation_stats['flags']} flags"
+    )
+    for observed_system, planet_name, system_name in observation_stats["system_mismatches"]:
+        print(f"  Observed {planet_name} under {observed_system}, but it is in {system_name}")
+    for observed_system, planet_name in observation_stats["unmatched"]:
+        print(f"  No planet matches the observation of {planet_name} ({observed_system})")
+
+
+def get_rules_hash(resource_groups, fix_rules):
+    """
+    Fingerprint everything besides the sources that decides how a system is stitched.
+
+    Parameters:
+    - resource_groups (dict): Mapping of resource groups to their respective resources.
+    - fix_rules (dict): Rule table from compile_fix_rules.
+
+    Returns:
+    - str: Hash of the combine rules.
+    """
+    return hash_data(COMBINE_RULES_VERSION, NAME_MATCHER_VERSION, resource_groups, fix_rules["rules"])
+
+
+def get_system_source_hashes(inara_system, almanac_planets, observations, rules_hash):
+    """
+    Fingerprint the inputs of one stitched system.
+
+    Parameters:
+    - inara_system (dict): The system from INARA.
+    - almanac_planets (list): The Almanac planet matched by each INARA planet, None where there is none.
+    - observations (list): The observation of each INARA planet, None where there is none.
+    - rules_hash (str): Hash from get_rules_hash.
+
+    Returns:
+    - dict: 'inara', 'almanac', 'observations' and 'rules' hashes.
+    """
+    return {
+        "inara": hash_data(inara_system),
+        "almanac": hash_data(almanac_planets),
+        "observations": hash_data(observations),
+        "rules": rules_hash,
+    }
+
+
+def stitch_planet(
+    fixed_planet, almanac_planet, almanac_coverage, almanac_row, resource_groups, name_match_cache, fix_rules
+):
+    """
+    Apply the Almanac corrections to one planet.
+
+    Parameters:
+    - fixed_planet (dict): The planet's copy from stitch_planet_data. Its fields are shared with the INARA input,
+      so the corrections replace them rather than modifying them in place.
+    - almanac_planet (dict): The corresponding planet data from Almanac.
+    - almanac_coverage (dict): Resource coverage of the Almanac, see resource_coverage.py.
+    - almanac_row (int): Row of almanac_planet in almanac_coverage.
+    - resource_groups (dict): Mapping of resource groups to their respective resources.
+    - name_match_cache (dict): Name matches of earlier runs, see load_name_match_cache.
+    - fix_rules (dict): Rule table from compile_fix_rules.
+
+    Returns:
+    - list: The name matchers used, so their results can be cached.
+    """
+    # Flora and Fauna discrepancy check and fix
+    almanac_flora, almanac_fauna = get_almanac_flora_fauna_set(almanac_planet['biomes'])
+    inara_flora, inara_fauna = get_inara_flora_fauna_set(
+        fixed_planet.get('flora', {}), fixed_planet.get('fauna', {})
+    )
+    matchers = [create_name_matcher(almanac_names, name_match_cache) for almanac_names in (almanac_flora, almanac_fauna)]
+
+    # Correct flora and fauna names
+    handle_flora_fauna_discrepancies(
+        fixed_planet, matchers[0], matchers[1], inara_flora, inara_fauna
+    )
+
+    # Handle biome discrepancies
+    missing_in_inara_biomes, missing_in_almanac_biomes = handle_biome_discrepancies(
+        fixed_planet, almanac_planet
+    )
+
+    # Handle inorganic discrepancies
+    handle_inorganic_discrepancies(
+        fixed_planet,
+        almanac_coverage,
+        almanac_row,
+        resource_groups,
+        missing_in_inara_biomes,
+        missing_in_almanac_biomes,
+        fix_rules,
+    )
+
+    # Apply biome resource mapping to fixed_planet directly
+    map_biome_resources(fixed_planet, almanac_planet)
+
+    return matchers
+
+
+def stitch_planet_data(
+    systems_almanac, systems_inara, resource_groups, previous_data=None, observations=None, fix_rules=None
+):
     """
     Stitch planet data from systems_inara and systems_almanac, applying corrections based on discrepancies.
+    Gameplay `observations` (see load_observations) are applied last, so they win over both sources.
+    Every output system is tagged with the hashes of its inputs ('source_hashes'). Systems of `previous_data`
+    whose hashes still match are carried over as they are, only the others are stitched again.
+    Observed systems also record what their observations changed ('observation_stats'), so the totals
+    still count the carried over ones.
 
     Parameters:
     - systems_almanac (list): List of systems from the Almanac.
     - systems_inara (list): List of systems from INARA.
     - resource_groups (dict): Mapping of resource groups to their respective resources.
+    - previous_data (list): The previous output, or None to stitch every system and prune the name match cache.
+    - observations (dict): Gameplay observations, or None for none.
+    - fix_rules (dict): Rule table from compile_fix_rules, or None to load FIX_RULES_PATH.
 
     Returns:
-    - fixed_data (list): Modified copy of systems_inara with corrections applied.
-    """
-    fixed_data = deepcopy(systems_inara)  # Deep copy to preserve original data
-
-    for fixed_system in fixed_data:
-        for fixed_planet in fixed_system["planets"]:
-            # Initialize biome_resources if not present
-            if "biome_resources" not in fixed_planet:
-                fixed_planet["biome_resources"] = {}
-
-            # Search for corresponding planet in Almanac
-            for almanac_system in systems_almanac:
-                # TODO: This is a bit fucked. For some reason, almanac system sometimes looses its planets? 
-                # I'll need to debug this properly when I have time. 
-                for almanac_planet in almanac_system.get("planets", {}):
-                    if fixed_planet["name"].lower() == almanac_planet["name"].lower():
-                        # Flora and Fauna discrepancy check and fix
-                        almanac_flora, almanac_fauna = get_almanac_flora_fauna_set(almanac_planet['biomes'])
-                        inara_flora, inara_fauna = get_inara_flora_fauna_set(
-                            fixed_planet.get('flora', {}), fixed_planet.get('fauna', {})
-                        )
+    - fixed_data (list): Corrected copy of systems_inara, in the same order. Only the dicts and lists the
+      corrections change are copied, the rest is shared with the inputs, which are left untouched.
+    - unmatched_report (dict): Planets only one source has, see get_unmatched_report.
+    - change_log (dict): Which systems were added, changed, removed or carried over, see get_change_log.
+    - observation_stats (dict): What the observations changed, see create_observation_stats.
+    """
+    almanac_coverage = get_resource_coverage(systems_almanac, layout="almanac")
+    # Same order as the coverage rows
+    almanac_planets = [planet for system in systems_almanac for planet in system.get("planets", [])]
+    almanac_index = build_planet_index(almanac_planets)
+    if fix_rules is None:
+        fix_rules = compile_fix_rules(load_fix_rules())
+    rules_hash = get_rules_hash(resource_groups, fix_rules)
+    observation_index = build_observation_index(observations or {})
+    observation_stats = create_observation_stats()
+    observed_planets = set()
+    previous_systems = {system["name"]: system for system in previous_data or []}
+    matched_almanac_rows = set()
+    name_match_cache = load_name_match_cache()
+    # Carried over systems still need their matches, only a full run prunes the ones nothing uses
+    name_matches = {} if previous_data is None else {key: dict(matches) for key, matches in name_match_cache.items()}
+    fixed_data = []
+    stitched_systems = set()
 
-                        # Correct flora and fauna names
-                        handle_flora_fauna_discrepancies(
-                            fixed_planet, almanac_flora, almanac_fauna, inara_flora, inara_fauna
-                        )
+    for inara_system in systems_inara:
+        # Look up the corresponding planets in Almanac, see the unmatched report for the ones it lacks
+        almanac_rows = [almanac_index.get(normalize_planet_name(planet["name"])) for planet in inara_system["planets"]]
+        matched_almanac_rows.update(row for row in almanac_rows if row is not None)
+        planet_observations = [
+            observation_index.get(normalize_planet_name(planet["name"])) for planet in inara_system["planets"]
+        ]
+        for planet, observation in zip(inara_system["planets"], planet_observations):
+            if observation is None:
+                continue
+            observed_planets.add(normalize_planet_name(planet["name"]))
+            if normalize_planet_name(observation["system"]) != normalize_planet_name(inara_system["name"]):
+                observation_stats["system_mismatches"].append(
+                    (observation["system"], observation["planet"], inara_system["name"])
+                )
+        source_hashes = get_system_source_hashes(
+            inara_system,
+            [None if row is None else almanac_planets[row] for row in almanac_rows],
+            planet_observations,
+            rules_hash,
+        )
+        previous_system = previous_systems.get(inara_system["name"])
+        if previous_system is not None and previous_system.get("source_hashes") == source_hashes:
+            add_observation_stats(observation_stats, previous_system.get("observation_stats", {}))
+            fixed_data.append(previous_system)
+            continue
 
-                        # Handle biome discrepancies
-                        missing_in_inara_biomes, missing_in_almanac_biomes = handle_biome_discrepancies(
-                            fixed_planet, almanac_planet
-                        )
+        # Shallow copies, the corrections copy whatever else they change
+        fixed_system = {**inara_system, "planets": [], "source_hashes": source_hashes}
+        system_stats = create_observation_stats()
+        for inara_planet, almanac_row, observation in zip(inara_system["planets"], almanac_rows, planet_observations):
+            fixed_planet = {**inara_planet, "biome_resources": inara_planet.get("biome_resources", {})}
+            fixed_system["planets"].append(fixed_planet)
+            if almanac_row is not None:
+                matchers = stitch_planet(
+                    fixed_planet,
+                    almanac_planets[almanac_row],
+                    almanac_coverage,
+                    almanac_row,
+                    resource_groups,
+                    name_match_cache,
+                    fix_rules,
+                )
+                for matcher in matchers:
+                    name_matches.setdefault(matcher["key"], {}).update(matcher["matches"])
+            if observation is not None:
+                apply_observation(fixed_planet, observation, system_stats)
+        if system_stats["planets"]:
+            fixed_system["observation_stats"] = {
+                key: value for key, value in system_stats.items() if not isinstance(value, list)
+            }
+            add_observation_stats(observation_stats, fixed_system["observation_stats"])
+        fixed_data.append(fixed_system)
+        stitched_systems.add(fixed_system["name"])
 
-                        # Handle inorganic discrepancies
-                        handle_inorganic_discrepancies(
-                            fixed_planet,
-                            almanac_planet,
-                            resource_groups,
-                            missing_in_inara_biomes,
-                            missing_in_almanac_biomes
-                        )
+    if name_matches and name_matches != name_match_cache:
+        save_json_atomic(NAME_MATCH_CACHE_PATH, name_matches)
 
-                        # Apply biome resource mapping to fixed_planet directly
-                        map_biome_resources(fixed_planet, almanac_planet)
+    unmatched_report = get_unmatched_report(systems_almanac, systems_inara, matched_almanac_rows)
+    change_log = get_change_log(fixed_data, previous_systems, stitched_systems)
+    observation_stats["unmatched"] = [
+        (observation["system"], observation["planet"])
+        for key, observation in observation_index.items()
+        if key not in observed_planets
+    ]
+    return fixed_data, unmatched_report, change_log, observation_stats
 
-                        break  # Exit after processing the matching planet
-                else:
-                    continue  # Continue if inner loop wasn't broken
-                break  # Break outer loop if inner loop was broken
 
-    return fixed_data  # Return the modified copy with all corrections applied
+def get_change_log(fixed_data, previous_systems, stitched_systems):
+    """
+    Summarize what a stitch changed compared to the previous output, for incremental downstream stages.
+
+    Parameters:
+    - fixed_data (list): The new output.
+    - previous_systems (dict): The previous output by system name.
+    - stitched_systems (set): Names of the systems that were stitched again.
+
+    Returns:
+    - dict: 'added', 'changed' and 'removed' system names, the number of 'unchanged' systems
+      and the new 'source_hashes' of every added or changed system.
+    """
+    system_names = [system["name"] for system in fixed_data]
+    added = [name for name in system_names if name not in previous_systems]
+    changed = [name for name in system_names if name in stitched_systems and name in previous_systems]
+    removed = sorted(set(previous_systems) - set(system_names))
+    return {
+        "version": COMBINE_RULES_VERSION,
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "unchanged": len(system_names) - len(added) - len(changed),
+        "source_hashes": {
+            system["name"]: system["source_hashes"] for system in fixed_data if system["name"] in stitched_systems
+        },
+    }
+
+
+def print_change_log(change_log):
+    """
+    Print the totals of a change log.
+
+    Parameters:
+    - change_log (dict): Change log from get_change_log.
+    """
+    print(
+        f"Systems stitched: {len(change_log['added'])} added, {len(change_log['changed'])} changed, "
+        f"{len(change_log['removed'])} removed, {change_log['unchanged']} unchanged"
+    )
 
-def combine_scraped_data():
+
+def combine_scraped_data(full=False):
+    """
+    Stitch the scraped sources and the gameplay observations into the raw systems data.
+    Only systems whose inputs changed since the last run are stitched again, unless `full` is set.
+    Writes the change log to COMBINE_CHANGE_LOG_PATH.
+    """
     systems_almanac = load_system_data(ALMANAC_SYSTEM_DATA_PATH)
     systems_inara = load_system_data(INARA_SYSTEM_DATA_PATH)
 
     resource_groups = load_resource_groups(INORGANIC_GROUPS_PATH)
+    fix_rules = compile_fix_rules(load_fix_rules())
+
+    previous_data = None
+    if not full and os.path.exists(RAW_SYSTEMS_DATA_PATH):
+        previous_data = load_system_data(RAW_SYSTEMS_DATA_PATH)
 
-    combined_data = stitch_planet_data(systems_almanac, systems_inara, resource_groups)
+    combined_data, unmatched_report, change_log, observation_stats = stitch_planet_data(
+        systems_almanac, systems_inara, resource_groups, previous_data, load_observations(), fix_rules
+    )
+    print_unmatched_report(unmatched_report)
+    print_change_log(change_log)
+    print_observation_stats(observation_stats)
+    print_fix_rule_hits(combined_data, fix_rules)
 
     save_system_data(RAW_SYSTEMS_DATA_PATH, combined_data)
+    save_json_atomic(COMBINE_CHANGE_LOG_PATH, change_log)
 
 if __name__ == "__main__":
-    combine_scraped_data()
+    parser = argparse.ArgumentParser(description="Combine the INARA and Almanac scrapes into the raw systems data.")
+    parser.add_argument("--full", action="store_true", help="Stitch every system again instead of only changed ones")
+    args = parser.parse_args()
+    combine_scraped_data(args.full)
     
 
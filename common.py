@@ -1,6 +1,8 @@
 import csv
 import json
 import os
+import time
+import hashlib
 from config import (
     INORGANIC_DATA_PATH,
     ORGANIC_DATA_PATH,
@@ -46,6 +48,96 @@ def save_system_data(path, data):
     with open(path, 'w', encoding='utf-8') as file:
         json.dump(data, file, ensure_ascii=False, indent=4)
     
+def _json_default(value):
+    # Sets have no order, sort them so equal inputs always hash the same
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Cannot hash object of type {type(value).__name__}")
+
+def hash_data(*data):
+    """Returns a stable sha256 hex digest of JSON-like data (dicts, lists, sets, strings, numbers)."""
+    hasher = hashlib.sha256()
+    for item in data:
+        hasher.update(json.dumps(item, sort_keys=True, ensure_ascii=False, default=_json_default).encode("utf-8"))
+    return hasher.hexdigest()
+
+def save_json_atomic(path, data):
+    """
+    Writes JSON to a temporary file next to `path` and renames it into place,
+    so an interrupted write never leaves a truncated file behind.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, default=_json_default)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+def append_json_lines(path, items, rewrite=False):
+    """
+    Appends each item as a line of JSON to `path`, or replaces its content with `rewrite`,
+    and syncs it to disk before returning.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w' if rewrite else 'a', encoding='utf-8') as file:
+        for item in items:
+            file.write(json.dumps(item, ensure_ascii=False, default=_json_default) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+def load_cached_result(cache_dir, key):
+    """Returns the result stored under `key`, or None if there is none."""
+    path = os.path.join(cache_dir, f"{key}.json")
+    if not os.path.exists(path):
+        return None
+    return load_system_data(path)
+
+def save_cached_result(cache_dir, key, data):
+    os.makedirs(cache_dir, exist_ok=True)
+    save_system_data(os.path.join(cache_dir, f"{key}.json"), data)
+    
+def create_budget(time_limit=None, max_iterations=None):
+    """
+    Returns a budget for the anytime solvers. `time_limit` is wall-clock seconds,
+    `max_iterations` counts solver steps. Either limit may be None.
+    """
+    return {"start": time.monotonic(), "time_limit": time_limit, "max_iterations": max_iterations, "iterations": 0}
+
+def budget_exhausted(budget):
+    if budget is None:
+        return False
+    if budget["max_iterations"] is not None and budget["iterations"] >= budget["max_iterations"]:
+        return True
+    if budget["time_limit"] is not None and time.monotonic() - budget["start"] >= budget["time_limit"]:
+        return True
+    return False
+
+def get_remaining_time(budget):
+    """Returns the seconds left on a budget's time limit, or None if it has none."""
+    if budget is None or budget["time_limit"] is None:
+        return None
+    return max(0.0, budget["time_limit"] - (time.monotonic() - budget["start"]))
+
+def reserve_budget_time(budget, share):
+    """
+    Takes `share` of a budget's time limit off it, for a step that runs after the budget is spent.
+    Returns the seconds set aside, or None if the budget has no time limit.
+    """
+    if budget is None or budget["time_limit"] is None:
+        return None
+    reserved_time = budget["time_limit"] * share
+    budget["time_limit"] -= reserved_time
+    return reserved_time
+
+def spend_budget(budget, iterations=1):
+    """Counts iterations against a budget. Returns True once the budget is exhausted."""
+    if budget is None:
+        return False
+    budget["iterations"] += iterations
+    return budget_exhausted(budget)
+
 def load_resource_groups(filename, unique_resource=[]):
     with open(filename, 'r', encoding='utf-8') as file:
         data = json.load(file)
@@ -11,6 +11,17 @@ ALMANAC_SYSTEM_DATA_PATH = 'data_systems/almanac_systems_data.json'
 RAW_SYSTEMS_DATA_PATH = 'data_systems/raw_systems_data.json'
 SCORED_SYSTEM_DATA_PATH = 'data_systems/scored_systems_data.json'
 FINAL_SYSTEM_DATA_PATH = 'data_systems/final_systems_data.json'
+MY_SYSTEM_DATA_PATH = 'data_systems/my_system_data.yaml'
+FIX_RULES_PATH = 'data_systems/fix_rules.json'
+
+# Solver Cache
+SOLVER_CACHE_DIR = 'cache/solver'
+EXHAUSTIVE_CHECKPOINT_PATH = 'cache/exhaustive_checkpoint.json'
+NAME_MATCH_CACHE_PATH = 'cache/name_matches.json'
+COMBINE_CHANGE_LOG_PATH = 'cache/combine_changes.json'
+
+# Share of a solver time limit set aside for the lower bound, so an interrupted run still reports its gap
+LOWER_BOUND_TIME_SHARE = 0.1
 
 # Rarity Score Weights
 RARITY_SCORES = {'Common': 1, 'Uncommon': 2, 'Rare': 4, 'Exotic': 8, 'Unique': 16}
\ No newline at end of file
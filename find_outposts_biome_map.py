@@ -1,9 +1,11 @@
-import sys
 import math
-from itertools import combinations
-from collections import defaultdict
+import random
+import argparse
+import numpy as np
 from multiprocessing import Pool, cpu_count
 from tqdm import tqdm
+from scipy.optimize import milp, LinearConstraint, Bounds
+from scipy.sparse import csr_matrix
 
 # Local Imports
 from config import (
@@ -18,175 +20,457 @@ from common import (
     load_system_data,
     load_resource_groups
 )
+from resource_coverage import get_resource_coverage, get_row_resources
 
-def find_outposts_with_biome_resource_map(): 
+# Randomized restarts scale each gain by up to this fraction
+GAIN_NOISE = 0.1
+# Restarts per worker task, fixed so the result does not depend on the number of workers
+RESTARTS_PER_TASK = 25
+
+
+def get_resource_mask(resources, resource_index):
+    """Returns the bitmask of resources, one bit per entry of resource_index."""
+    mask = 0
+    for resource in resources:
+        mask |= 1 << resource_index[resource]
+    return mask
+
+
+def get_mask_resources(mask, resource_names):
+    """Returns the resource names of a bitmask, in index order."""
+    return [name for i, name in enumerate(resource_names) if mask >> i & 1]
+
+
+def build_biome_map(all_systems, required_inorganic, required_organic):
     """
-    Main function to find and rank biome combinations covering all required inorganic and organic resources.
+    Indexes planets and their biomes by position instead of by name.
+    - planets: planet names by planet_id.
+    - biomes: (planet_id, biome_id) per biome, biome_id indexing biome_names.
+    - planet_biomes: the biome indices of every planet.
+    - planet_organics / biome_inorganics: resource bitmasks over organic_names / inorganic_names.
+    - organic_planets / inorganic_biomes: the planets (biomes) holding each resource bit.
+    Rows follow the shared resource coverage (see get_resource_coverage), bitmasks are built from its rows.
+    Returns a dictionary with these lists plus the required organic and inorganic masks.
     """
-    # Load resources
-    inorganic_rarity = load_resources(INORGANIC_DATA_PATH)
-    organic_rarity = load_resources(ORGANIC_DATA_PATH)
+    coverage = get_resource_coverage(all_systems)
+    planets = coverage["planets"]
+    biome_names = coverage["biome_names"]
+    biome_index = {biome: i for i, biome in enumerate(biome_names)}
+    biomes = [(planet_id, biome_index[biome]) for planet_id, biome in coverage["biomes"]]
+    planet_biomes = [list(rows) for rows in coverage["planet_biomes"]]
+    planet_organic_sets = [
+        get_row_resources(coverage, "planet_resources", planet_id, "organic") for planet_id in range(len(planets))
+    ]
+    biome_inorganic_sets = [
+        get_row_resources(coverage, "biome_resources", biome_key) for biome_key in range(len(biomes))
+    ]
 
-    rarity = {"inorganic": inorganic_rarity, "organic": organic_rarity}
+    organic_names = sorted(set(required_organic).union(*planet_organic_sets))
+    inorganic_names = sorted(set(required_inorganic).union(*biome_inorganic_sets))
+    organic_index = {name: i for i, name in enumerate(organic_names)}
+    inorganic_index = {name: i for i, name in enumerate(inorganic_names)}
 
-    unique_resources = {
-        category: {key: value for key, value in items.items() if value == "Unique" and key}
-        for category, items in rarity.items()
+    planet_organics = [get_resource_mask(organics, organic_index) for organics in planet_organic_sets]
+    biome_inorganics = [get_resource_mask(inorganics, inorganic_index) for inorganics in biome_inorganic_sets]
+
+    organic_planets = [[] for _ in organic_names]
+    for planet_id, organics in enumerate(planet_organic_sets):
+        for organic in organics:
+            organic_planets[organic_index[organic]].append(planet_id)
+    inorganic_biomes = [[] for _ in inorganic_names]
+    for biome_key, inorganics in enumerate(biome_inorganic_sets):
+        for inorganic in inorganics:
+            inorganic_biomes[inorganic_index[inorganic]].append(biome_key)
+
+    return {
+        "planets": planets,
+        "biomes": biomes,
+        "biome_names": biome_names,
+        "planet_biomes": planet_biomes,
+        "organic_names": organic_names,
+        "inorganic_names": inorganic_names,
+        "planet_organics": planet_organics,
+        "biome_inorganics": biome_inorganics,
+        "organic_planets": organic_planets,
+        "inorganic_biomes": inorganic_biomes,
+        "required_organics": get_resource_mask(required_organic, organic_index),
+        "required_inorganics": get_resource_mask(required_inorganic, inorganic_index),
     }
 
-    # Load systems
-    all_systems = load_system_data(SCORED_SYSTEM_DATA_PATH)
 
-    # Load gatherable_only lists
-    gatherable_only = load_resource_groups(GATHERABLE_ONLY_PATH)
+def get_biome_label(biome_map, biome_key):
+    planet_id, biome_id = biome_map["biomes"][biome_key]
+    return f"{biome_map['planets'][planet_id]} - {biome_map['biome_names'][biome_id]}"
 
-    # Load organic groups
-    organic_groups = load_resource_groups(ORGANIC_GROUPS_PATH)
 
-    # Determine required resources
-    required_inorganic = set(inorganic_rarity.keys()) - set(gatherable_only.get('inorganic', set())) - set(unique_resources['inorganic'])
-    required_organic = set(organic_rarity.keys()) - set(gatherable_only.get('organic', set())) - set(unique_resources['organic'])
+def get_covered_mask(masks, selected):
+    covered = 0
+    for key in selected:
+        covered |= masks[key]
+    return covered
 
-    # Create mappings
-    planet_to_organics = {}
-    biome_to_inorganics = {}
-
-    for system in all_systems:
-        for planet in system['planets']:
-            planet_name = planet['name']
-            planet_to_organics[planet_name] = set(planet['resources'].get('organic', []))
-            for biome in planet['biomes']:
-                unique_biome = f"{planet_name} - {biome}"
-                biome_inorganics = planet['biome_resources'].get(biome, {}).get('inorganic', [])
-                biome_to_inorganics[unique_biome] = set(biome_inorganics)
-
-    # Greedy set cover function
-    def greedy_set_cover(required, available_dict):
-        uncovered = set(required)
-        selected = set()
-        while uncovered:
-            # Find the key with the maximum intersection
-            best_key = max(available_dict, key=lambda k: len(available_dict[k] & uncovered), default=None)
-            if not best_key or not (available_dict[best_key] & uncovered):
-                break
-            selected.add(best_key)
-            uncovered -= available_dict[best_key]
-        return selected, uncovered
+
+def greedy_set_cover(required, masks, candidates, rng=None, noise=0.0):
+    """
+    Picks from `candidates` (indices into masks) the one covering most of the uncovered bits until
+    `required` is covered or nothing helps. Ties go to the earlier candidate.
+    With an `rng`, each gain is scaled by a random factor in [1, 1 + noise] and ties are broken at random.
+    Returns the selected indices and the mask left uncovered.
+    """
+    uncovered = required
+    selected = set()
+
+    def gain(k):
+        covered = (masks[k] & uncovered).bit_count()
+        if rng is None:
+            return covered
+        return (covered * (1 + noise * rng.random()), rng.random())
+
+    while uncovered:
+        # Find the key with the maximum intersection
+        best_key = max(candidates, key=gain, default=None)
+        if best_key is None or not (masks[best_key] & uncovered):
+            break
+        selected.add(best_key)
+        uncovered &= ~masks[best_key]
+    return selected, uncovered
+
+
+def find_biome_cover(biome_map, rng=None, noise=0.0):
+    """
+    Covers organics with planets, then inorganics with biomes of those planets, then patches what is left.
+    `rng` and `noise` randomize the greedy passes, see greedy_set_cover.
+    Returns the selected planet ids, the selected biome indices and the missing organic and inorganic masks.
+    """
+    planet_organics = biome_map["planet_organics"]
+    biome_inorganics = biome_map["biome_inorganics"]
+    required_organics = biome_map["required_organics"]
+    required_inorganics = biome_map["required_inorganics"]
 
     # Select planets to cover organics
-    selected_planets, missing_organics = greedy_set_cover(required_organic, planet_to_organics)
+    selected_planets, missing_organics = greedy_set_cover(
+        required_organics, planet_organics, range(len(biome_map["planets"])), rng, noise
+    )
 
     # If organics are missing, try to cover them
-    if missing_organics:
-        for organ in list(missing_organics):
-            for planet, organics in planet_to_organics.items():
-                if organ in organics and planet not in selected_planets:
-                    selected_planets.add(planet)
-                    missing_organics.remove(organ)
-                    break
+    for organic in range(len(biome_map["organic_names"])):
+        if not missing_organics >> organic & 1:
+            continue
+        planet_id = next((p for p in biome_map["organic_planets"][organic] if p not in selected_planets), None)
+        if planet_id is not None:
+            selected_planets.add(planet_id)
+            missing_organics &= ~(1 << organic)
 
     # Greedy set cover for inorganics using selected planets' biomes
-    biome_available = {biome: inorganics for biome, inorganics in biome_to_inorganics.items()
-                    if biome.split(' - ')[0] in selected_planets}
-
-    selected_biomes, missing_inorganics = greedy_set_cover(required_inorganic, biome_available)
+    biome_available = [
+        biome_key for planet_id in sorted(selected_planets) for biome_key in biome_map["planet_biomes"][planet_id]
+    ]
+    biome_available.sort()
+    selected_biomes, missing_inorganics = greedy_set_cover(
+        required_inorganics, biome_inorganics, biome_available, rng, noise
+    )
 
     # If inorganics are missing, select additional biomes from any planet
     if missing_inorganics:
-        additional_biomes, missing_inorganics = greedy_set_cover(missing_inorganics, biome_to_inorganics)
+        additional_biomes, missing_inorganics = greedy_set_cover(
+            missing_inorganics, biome_inorganics, range(len(biome_map["biomes"])), rng, noise
+        )
         selected_biomes.update(additional_biomes)
         # Add planets of the additional biomes
-        for biome in additional_biomes:
-            planet = biome.split(' - ')[0]
-            selected_planets.add(planet)
-
-    # Final organics coverage check
-    organics_covered = set()
-    for planet in selected_planets:
-        organics_covered.update(planet_to_organics.get(planet, set()))
+        for biome_key in additional_biomes:
+            selected_planets.add(biome_map["biomes"][biome_key][0])
 
-    organics_missing_final = required_organic - organics_covered
-
-    # Final inorganics coverage check
-    inorganics_covered = set()
-    for biome in selected_biomes:
-        inorganics_covered.update(biome_to_inorganics.get(biome, set()))
-
-    inorganics_missing_final = required_inorganic - inorganics_covered
+    # Final coverage checks
+    organics_missing_final = required_organics & ~get_covered_mask(planet_organics, selected_planets)
+    inorganics_missing_final = required_inorganics & ~get_covered_mask(biome_inorganics, selected_biomes)
 
     # Adjust selection if necessary
     while organics_missing_final or inorganics_missing_final:
-        # If organics are missing, add planets covering them
-        if organics_missing_final:
-            for organ in list(organics_missing_final):
-                for planet, organics in planet_to_organics.items():
-                    if organ in organics and planet not in selected_planets:
-                        selected_planets.add(planet)
-                        organics_covered.update({organ})
-                        organics_missing_final.remove(organ)
-                        # Add all biomes of the new planet to cover inorganics
-                        for biome in biome_to_inorganics:
-                            if biome.startswith(f"{planet} - "):
-                                selected_biomes.add(biome)
-                                inorganics_covered.update(biome_to_inorganics[biome])
-                        break
-        # If inorganics are missing, add biomes covering them
-        if inorganics_missing_final:
-            for inorganic in list(inorganics_missing_final):
-                for biome, inorganics in biome_to_inorganics.items():
-                    if inorganic in inorganics and biome not in selected_biomes:
-                        selected_biomes.add(biome)
-                        inorganics_covered.update({inorganic})
-                        inorganics_missing_final.remove(inorganic)
-                        # Ensure the planet is selected
-                        planet = biome.split(' - ')[0]
-                        selected_planets.add(planet)
-                        break
+        progress = False
+        # If organics are missing, add planets covering them, with all their biomes
+        for organic in range(len(biome_map["organic_names"])):
+            if not organics_missing_final >> organic & 1:
+                continue
+            planet_id = next((p for p in biome_map["organic_planets"][organic] if p not in selected_planets), None)
+            if planet_id is None:
+                continue
+            selected_planets.add(planet_id)
+            selected_biomes.update(biome_map["planet_biomes"][planet_id])
+            progress = True
+        # If inorganics are missing, add biomes covering them and their planets
+        for inorganic in range(len(biome_map["inorganic_names"])):
+            if not inorganics_missing_final >> inorganic & 1:
+                continue
+            biome_key = next((b for b in biome_map["inorganic_biomes"][inorganic] if b not in selected_biomes), None)
+            if biome_key is None:
+                continue
+            selected_biomes.add(biome_key)
+            selected_planets.add(biome_map["biomes"][biome_key][0])
+            progress = True
 
         # Recalculate missing organics and inorganics
-        organics_covered = set()
-        for planet in selected_planets:
-            organics_covered.update(planet_to_organics.get(planet, set()))
-        organics_missing_final = required_organic - organics_covered
+        organics_missing_final = required_organics & ~get_covered_mask(planet_organics, selected_planets)
+        inorganics_missing_final = required_inorganics & ~get_covered_mask(biome_inorganics, selected_biomes)
+        if not progress:
+            break
 
-        inorganics_covered = set()
-        for biome in selected_biomes:
-            inorganics_covered.update(biome_to_inorganics.get(biome, set()))
-        inorganics_missing_final = required_inorganic - inorganics_covered
+    return selected_planets, selected_biomes, organics_missing_final, inorganics_missing_final
 
-        if not organics_missing_final and not inorganics_missing_final:
-            break
+
+def get_cover_rank(selected_planets, selected_biomes, organics_missing, inorganics_missing):
+    """Orders covers by missing resources, then biome count, then planet count."""
+    missing = organics_missing.bit_count() + inorganics_missing.bit_count()
+    return (missing, len(selected_biomes), len(selected_planets))
+
+
+# Biome map of a worker process, set once by init_biome_cover_worker
+_worker_biome_map = {}
+
+
+def init_biome_cover_worker(biome_map):
+    _worker_biome_map.update(biome_map)
+
+
+def run_biome_cover_restarts(task):
+    """
+    Worker task: runs `restarts` randomized greedy covers from `seed` on the worker's biome map.
+    Returns the best cover found as (rank, selected planets, selected biomes).
+    """
+    seed, restarts, noise = task
+    rng = random.Random(seed)
+    best = None
+    for _ in range(restarts):
+        cover = find_biome_cover(_worker_biome_map, rng, noise)
+        rank = get_cover_rank(*cover)
+        if best is None or rank < best[0]:
+            best = (rank, cover[0], cover[1])
+    return best
+
+
+def find_biome_cover_restarts(biome_map, restarts=1000, workers=None, noise=GAIN_NOISE, seed=None):
+    """
+    Runs randomized greedy covers on a process pool and keeps the best by biome count, then planet count.
+    The biome map is sent to every worker once through the pool initializer.
+    Returns the selected planet ids and biome indices of the best cover.
+    """
+    if restarts < 1:
+        raise ValueError(f"Restarts must be at least 1, not {restarts}.")
+    workers = workers or cpu_count()
+    seed_rng = random.Random(seed)
+    tasks = [
+        (seed_rng.getrandbits(64), min(RESTARTS_PER_TASK, restarts - start), noise)
+        for start in range(0, restarts, RESTARTS_PER_TASK)
+    ]
+
+    with Pool(workers, initializer=init_biome_cover_worker, initargs=(biome_map,)) as pool:
+        results = list(tqdm(pool.imap(run_biome_cover_restarts, tasks), total=len(tasks), desc="Restarts"))
+
+    # Ties go to the earlier task, so a seed gives the same cover on any number of workers
+    _, selected_planets, selected_biomes = min(results, key=lambda result: result[0])
+    return selected_planets, selected_biomes
+
+
+def build_biome_cover_model(biome_map):
+    """
+    Builds the joint cover model: planets (x) cover organics, biomes (z) cover inorganics,
+    a biome can only be picked with its planet and every picked planet holds at least one picked biome.
+    Required resources nothing holds get no row, print_biome_cover reports them as missing.
+    Returns a dictionary with the constraint matrix, its row bounds and the two objectives.
+    """
+    planet_count = len(biome_map["planets"])
+    biome_count = len(biome_map["biomes"])
+    z_offset = planet_count
+
+    rows, cols, values = [], [], []
+    lower, upper = [], []
+
+    def add_row(entries, row_lower, row_upper):
+        for col, value in entries:
+            rows.append(len(lower))
+            cols.append(col)
+            values.append(value)
+        lower.append(row_lower)
+        upper.append(row_upper)
+
+    # Every required resource is held by a picked planet (organics) or biome (inorganics)
+    for organic, planet_ids in enumerate(biome_map["organic_planets"]):
+        if biome_map["required_organics"] >> organic & 1 and planet_ids:
+            add_row([(planet_id, 1) for planet_id in planet_ids], 1, np.inf)
+    for inorganic, biome_keys in enumerate(biome_map["inorganic_biomes"]):
+        if biome_map["required_inorganics"] >> inorganic & 1 and biome_keys:
+            add_row([(z_offset + biome_key, 1) for biome_key in biome_keys], 1, np.inf)
+    # A picked biome implies its planet
+    for biome_key, (planet_id, _) in enumerate(biome_map["biomes"]):
+        add_row([(z_offset + biome_key, 1), (planet_id, -1)], -np.inf, 0)
+    # A picked planet needs an outpost in one of its biomes
+    for planet_id, biome_keys in enumerate(biome_map["planet_biomes"]):
+        add_row([(planet_id, 1)] + [(z_offset + biome_key, -1) for biome_key in biome_keys], -np.inf, 0)
+
+    variable_count = planet_count + biome_count
+    biome_objective = np.zeros(variable_count)
+    biome_objective[z_offset:] = 1
+    planet_objective = np.zeros(variable_count)
+    planet_objective[:z_offset] = 1
+    return {
+        "matrix": csr_matrix((values, (rows, cols)), shape=(len(lower), variable_count)),
+        "lower": np.array(lower, dtype=float),
+        "upper": np.array(upper, dtype=float),
+        "z_offset": z_offset,
+        "objectives": {"biomes": biome_objective, "planets": planet_objective},
+    }
+
+
+def solve_biome_cover_model(model, time_limit=None):
+    """
+    Minimizes the biome (outpost) count, then the planet count among covers with that many biomes.
+    Returns the selected planet ids, the selected biome indices and a certificate per objective
+    (value, proven lower bound, and whether the solver proved it optimal), or None if no cover exists.
+    """
+    variable_count = model["matrix"].shape[1]
+    integrality = np.ones(variable_count)
+    bounds = Bounds(np.zeros(variable_count), np.ones(variable_count))
+    options = {"time_limit": time_limit} if time_limit else {}
+    constraints = [LinearConstraint(model["matrix"], model["lower"], model["upper"])]
+
+    certificate = {}
+    result = None
+    for objective in ["biomes", "planets"]:
+        result = milp(
+            model["objectives"][objective],
+            constraints=constraints,
+            integrality=integrality,
+            bounds=bounds,
+            options=options,
+        )
+        if result.x is None:
+            return None
+        value = int(round(result.fun))
+        certificate[objective] = {
+            "value": value,
+            "bound": math.ceil(result.mip_dual_bound - 1e-6),
+            "optimal": result.status == 0,
+        }
+        # Keep this objective's value while optimizing the next one
+        constraints.append(LinearConstraint(model["objectives"][objective], -np.inf, value))
+
+    z_offset = model["z_offset"]
+    selected_planets = {j for j in range(z_offset) if result.x[j] > 0.5}
+    selected_biomes = {j - z_offset for j in range(z_offset, variable_count) if result.x[j] > 0.5}
+    return selected_planets, selected_biomes, certificate
+
+
+def print_biome_certificate(certificate):
+    print("\nOptimality Certificate:")
+    for objective, proof in certificate.items():
+        status = "optimal" if proof["optimal"] and proof["bound"] >= proof["value"] else "not proven optimal"
+        print(f"  {objective.capitalize()}: {proof['value']} (lower bound {proof['bound']}, {status})")
+
+
+def print_biome_cover(biome_map, selected_planets, selected_biomes):
+    organics_covered = get_covered_mask(biome_map["planet_organics"], selected_planets)
+    inorganics_covered = get_covered_mask(biome_map["biome_inorganics"], selected_biomes)
+    organics_missing = biome_map["required_organics"] & ~organics_covered
+    inorganics_missing = biome_map["required_inorganics"] & ~inorganics_covered
 
     # Print the results
     print("Selected Planets:")
-    for planet in selected_planets:
-        print(f"  {planet}")
+    for planet_id in sorted(selected_planets):
+        print(f"  {biome_map['planets'][planet_id]}")
 
     print("\nSelected Biomes:")
-    for biome in selected_biomes:
-        print(f"  {biome}")
+    for biome_key in sorted(selected_biomes):
+        print(f"  {get_biome_label(biome_map, biome_key)}")
 
     print("\nOrganics Covered:")
-    for organic in organics_covered:
+    for organic in get_mask_resources(organics_covered, biome_map["organic_names"]):
         print(f"  {organic}")
 
-    if organics_missing_final:
+    if organics_missing:
         print("\nOrganics Missing:")
-        for organic in organics_missing_final:
+        for organic in get_mask_resources(organics_missing, biome_map["organic_names"]):
             print(f"  {organic}")
     else:
         print("\nAll required organics are covered.")
 
     print("\nInorganics Covered:")
-    for inorganic in inorganics_covered:
+    for inorganic in get_mask_resources(inorganics_covered, biome_map["inorganic_names"]):
         print(f"  {inorganic}")
 
-    if inorganics_missing_final:
+    if inorganics_missing:
         print("\nInorganics Missing:")
-        for inorganic in inorganics_missing_final:
+        for inorganic in get_mask_resources(inorganics_missing, biome_map["inorganic_names"]):
             print(f"  {inorganic}")
     else:
         print("\nAll required inorganics are covered.")
 
+
+def find_outposts_with_biome_resource_map(
+    method="milp", time_limit=None, restarts=1000, workers=None, noise=GAIN_NOISE, seed=None
+):
+    """
+    Main function to find and rank biome combinations covering all required inorganic and organic resources.
+    `method` 'milp' solves the joint planet and biome model exactly (see solve_biome_cover_model),
+    'greedy' runs the two greedy passes of find_biome_cover, 'restarts' many randomized ones
+    (see find_biome_cover_restarts).
+    """
+    # Load resources
+    inorganic_rarity = load_resources(INORGANIC_DATA_PATH)
+    organic_rarity = load_resources(ORGANIC_DATA_PATH)
+
+    rarity = {"inorganic": inorganic_rarity, "organic": organic_rarity}
+
+    unique_resources = {
+        category: {key: value for key, value in items.items() if value == "Unique" and key}
+        for category, items in rarity.items()
+    }
+
+    # Load systems
+    all_systems = load_system_data(SCORED_SYSTEM_DATA_PATH)
+
+    # Load gatherable_only lists
+    gatherable_only = load_resource_groups(GATHERABLE_ONLY_PATH)
+
+    # Load organic groups
+    organic_groups = load_resource_groups(ORGANIC_GROUPS_PATH)
+
+    # Determine required resources
+    required_inorganic = set(inorganic_rarity.keys()) - set(gatherable_only.get('inorganic', set())) - set(unique_resources['inorganic'])
+    required_organic = set(organic_rarity.keys()) - set(gatherable_only.get('organic', set())) - set(unique_resources['organic'])
+
+    biome_map = build_biome_map(all_systems, required_inorganic, required_organic)
+    certificate = None
+    if method == "milp":
+        solution = solve_biome_cover_model(build_biome_cover_model(biome_map), time_limit)
+        if solution is None:
+            print("No cover exists.")
+            return None
+        selected_planets, selected_biomes, certificate = solution
+    elif method == "restarts":
+        selected_planets, selected_biomes = find_biome_cover_restarts(biome_map, restarts, workers, noise, seed)
+    else:
+        selected_planets, selected_biomes, _, _ = find_biome_cover(biome_map)
+
+    print_biome_cover(biome_map, selected_planets, selected_biomes)
+    if certificate is not None:
+        print_biome_certificate(certificate)
+    return selected_planets, selected_biomes
+
 if __name__ == '__main__':
-    find_outposts_with_biome_resource_map()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Cover all required resources with as few biomes as possible.")
+    parser.add_argument(
+        "--method",
+        choices=["milp", "greedy", "restarts"],
+        default="milp",
+        help="Exact model, greedy passes, or randomized greedy restarts.",
+    )
+    parser.add_argument("--time-limit", type=float, help="MILP time limit in seconds per objective.")
+    parser.add_argument("--restarts", type=int, default=1000, help="Randomized greedy covers for --method restarts.")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes for restarts, 0 for one per CPU.")
+    parser.add_argument("--noise", type=float, default=GAIN_NOISE, help="Random gain scaling of the restarts.")
+    parser.add_argument("--seed", type=int, help="Random seed for the restarts.")
+    args = parser.parse_args()
+    if args.restarts < 1:
+        parser.error("--restarts must be at least 1")
+    find_outposts_with_biome_resource_map(
+        args.method, args.time_limit, args.restarts, args.workers or None, args.noise, args.seed
+    )
@@ -1,7 +1,13 @@
 import itertools
+from copy import deepcopy
+import os
+import argparse
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, maximum_flow, min_weight_full_bipartite_matching
 
 # Local Imports
-from config import FINAL_SYSTEM_DATA_PATH, INORGANIC_GROUPS_PATH
+from config import FINAL_SYSTEM_DATA_PATH, INORGANIC_GROUPS_PATH, SOLVER_CACHE_DIR, LOWER_BOUND_TIME_SHARE
 from common import (
     get_grouped_inorganics,
     get_grouped_organics,
@@ -9,8 +15,30 @@ from common import (
     score_organics,
     save_system_data,
     load_all_data,
-    load_resource_groups
+    load_resource_groups,
+    hash_data,
+    load_cached_result,
+    save_cached_result,
+    create_budget,
+    budget_exhausted,
+    spend_budget,
+    get_remaining_time,
+    reserve_budget_time,
 )
+from resource_coverage import get_resource_coverage, get_planet_row, get_row_resources
+
+# Resources an outpost can capture, the last slot is only used when nothing else fits
+OUTPOST_CAPACITY = 5
+PREFERRED_OUTPOST_LOAD = 4
+
+# Preference costs for assigning a resource to a planet in verify_final_planets
+ASSIGNMENT_COST_SELECTED = 1.0
+ASSIGNMENT_COST_GROUPED = 2.0
+ASSIGNMENT_COST_FALLBACK = 4.0
+ASSIGNMENT_COST_LAST_SLOT = 2.0
+
+# Part of the result cache key. Bump when the solver logic changes so stale plans are not reused.
+SOLVER_CACHE_VERSION = 3
 
 
 def find_fullchain_planets(system_data, inorganic_groups):
@@ -186,11 +214,32 @@ def calculate_uncaptured_resources(captured_resources, resources_by_rarity, gath
     return uncaptured_resources
 
 
-def capture_unique_resource_systems(system_data, unique_resources, groups):
+def get_potential_groups(coverage, planet, groups):
+    """
+    Returns the inorganic groups a planet could capture, as group name to the planet's (sorted) resources
+    of that group. Reads the planet's row of the resource coverage, planets outside it are read directly.
+    """
+    planet_row = get_planet_row(coverage, planet["name"])
+    if planet_row is None:
+        planet_inorganics = set(planet["resources"].get("inorganic", []))
+    else:
+        planet_inorganics = get_row_resources(coverage, "planet_resources", planet_row, "inorganic")
+    potential_groups = {}
+    for group_name, group_resources in groups["inorganic"].items():
+        capturable_inorganics = planet_inorganics.intersection(group_resources)
+        if capturable_inorganics:
+            potential_groups[group_name] = sorted(capturable_inorganics)
+    return potential_groups
+
+
+def capture_unique_resource_systems(system_data, unique_resources, groups, coverage=None):
     """
     Captures systems with unique resources and any full chains within those systems.
+    `coverage` is the resource coverage of system_data, looked up (hashing the data) when not given.
     Returns the list of planets, processed systems, and the captured resources.
     """
+    if coverage is None:
+        coverage = get_resource_coverage(system_data)
     captured_inorganics = set()
     captured_organics = set()
     processed_systems = set()
@@ -220,17 +269,9 @@ def capture_unique_resource_systems(system_data, unique_resources, groups):
                     if resource in unique_resources["inorganic"]:
                         captured_inorganics.add(resource)
 
-                # Collect potential inorganics and their groups
-                planet_inorganics = set(planet["resources"].get("inorganic", []))
-                potential_groups = {}
-                for group_name, group_resources in groups["inorganic"].items():
-                    capturable_inorganics = planet_inorganics & set(group_resources)
-                    if capturable_inorganics:
-                        potential_groups[group_name] = list(capturable_inorganics)  # Store as list of resources
-
                 # Store potential groups in outpost_candidacy
                 planet.setdefault("outpost_candidacy", {})
-                planet["outpost_candidacy"]["potential_groups"] = potential_groups
+                planet["outpost_candidacy"]["potential_groups"] = get_potential_groups(coverage, planet, groups)
 
                 # Capture organic resources available on the unique planet
                 captured_organics.update(planet["resources"].get("organic", []))
@@ -262,9 +303,11 @@ def capture_full_chain_systems(
     captured_resources,
     resources_by_rarity,
     groups,
+    budget=None,
 ):
     """
     Iteratively selects additional systems to minimize the number of outposts needed to capture all resources.
+    Stops when the budget runs out or no system can capture the remaining groups.
     Returns the updated list of final planets and captured resources.
     """
     inorganic_groups = groups["inorganic"]
@@ -292,6 +335,10 @@ def capture_full_chain_systems(
         if not uncaptured_inorganic_groups:
             break  # Exit if all resource groups are captured
 
+        if spend_budget(budget):
+            print(f"Budget exhausted with uncaptured resource groups: {sorted(uncaptured_inorganic_groups)}")
+            break
+
         # Score systems based on the count of uncaptured full chains
         system_scores = score_systems_by_full_chains(system_data, uncaptured_inorganic_groups, processed_systems)
 
@@ -299,6 +346,14 @@ def capture_full_chain_systems(
             captured_resources = recalculate_captured_resources(final_planets, captured_resources)
             captured_inorganics = captured_resources["inorganic"]
             captured_organics = captured_resources["organic"]
+            # Groups completed by planets picked so far count as captured, anything else can't be captured here
+            completed_groups = {
+                group for group in uncaptured_inorganic_groups if set(inorganic_groups[group]) <= captured_inorganics
+            }
+            if not completed_groups:
+                print(f"No system left to capture resource groups: {sorted(uncaptured_inorganic_groups)}")
+                break
+            captured_inorganic_groups.update(completed_groups)
             continue
 
         # Identify the maximum count of uncaptured groups and select those systems
@@ -465,11 +520,16 @@ def capture_organic_resources(planet, groups, filter=set()):
     return capturable_resources
 
 
-def capture_remaining_organics(system_data, final_planets, captured_resources, groups, remaining_organics):
+def capture_remaining_organics(
+    system_data, final_planets, captured_resources, groups, remaining_organics, coverage=None
+):
     """
     Selects planets to capture the remaining uncaptured organics using a greedy set cover algorithm.
+    `coverage` is the resource coverage of system_data, looked up (hashing the data) when not given.
     Returns the updated list of final planets and captured resources.
     """
+    if coverage is None:
+        coverage = get_resource_coverage(system_data)
     candidate_planets = []
     for system in system_data:
         for planet in system["planets"]:
@@ -495,12 +555,7 @@ def capture_remaining_organics(system_data, final_planets, captured_resources, g
                 continue
 
             # Collect potential inorganics and their groups
-            planet_inorganics = set(planet["resources"].get("inorganic", []))
-            potential_groups = {}
-            for group_name, group_resources in groups["inorganic"].items():
-                capturable_inorganics = planet_inorganics & set(group_resources)
-                if capturable_inorganics:
-                    potential_groups[group_name] = list(capturable_inorganics)
+            potential_groups = get_potential_groups(coverage, planet, groups)
 
             num_capturable_inorganics = len(potential_groups)
 
@@ -536,6 +591,62 @@ def capture_remaining_organics(system_data, final_planets, captured_resources, g
     return final_planets, captured_resources
 
 
+def reduce_planet_count(
+    system_data,
+    final_planets,
+    captured_resources,
+    resources_by_rarity,
+    groups,
+    budget=None,
+    verbose=False,
+    coverage=None,
+):
+    """
+    Alternates capturing the remaining organics and eliminating redundant planets until every organic is captured.
+    Stops early when the budget runs out or a round leaves the plan unchanged.
+    Pass the resource coverage of system_data as `coverage` when calling this repeatedly on the same data.
+    Returns the final planets, captured resources and uncaptured resources.
+    """
+    uncaptured_resources = calculate_uncaptured_resources(
+        captured_resources, resources_by_rarity, groups["gatherable_only"]
+    )
+
+    iter_count = 1
+    while len(uncaptured_resources["organic"]) > 0:
+        if spend_budget(budget):
+            print(f"Budget exhausted with uncaptured organics: {sorted(uncaptured_resources['organic'])}")
+            break
+        if verbose:
+            print(f" {iter_count}: Reducing planet count... ")
+        previous_state = ([planet["name"] for planet in final_planets], uncaptured_resources["organic"])
+
+        # Step 4: Capture remaining organics
+        final_planets, captured_resources = capture_remaining_organics(
+            system_data,
+            final_planets,
+            captured_resources,
+            groups,
+            uncaptured_resources["organic"],
+            coverage,
+        )
+
+        # Step 5: Elimination
+        final_planets = eliminate_redundant_planets(final_planets, groups)
+
+        captured_resources = recalculate_captured_resources(final_planets, captured_resources)
+        uncaptured_resources = calculate_uncaptured_resources(
+            captured_resources, resources_by_rarity, groups["gatherable_only"]
+        )
+
+        # The next round would repeat this one
+        if ([planet["name"] for planet in final_planets], uncaptured_resources["organic"]) == previous_state:
+            print(f"No progress capturing organics: {sorted(uncaptured_resources['organic'])}")
+            break
+        iter_count += 1
+
+    return final_planets, captured_resources, uncaptured_resources
+
+
 def compute_main_group_shared_resources(groups):
     main_group_shared_resources = {}
     for group_name, resources in groups["inorganic"].items():
@@ -652,243 +763,239 @@ def clean_up_after_processing(all_systems, final_planets):
 
     return all_systems, final_planets
 
-def verify_final_planets(final_planets, resources_by_rarity, groups):
-    # Step 1: Initialize variables and remove irrelevant resources
-    all_inorganics = set(resources_by_rarity["inorganic"].keys())
-    all_inorganics.discard('Helium-3')
-    all_inorganics.discard('Water')
-    all_inorganics -= set(groups.get("gatherable_only", {}).get("inorganic", []))
-    all_organics = set(resources_by_rarity["organic"].keys())
-    all_organics -= set(groups.get("gatherable_only", {}).get("organic", []))
-    inorganic_groups_with_unique = load_resource_groups(INORGANIC_GROUPS_PATH)
+def get_required_resources(resources_by_rarity, groups):
+    """
+    Determines the resources a final plan has to capture with an outpost.
+    Helium-3, Water and gatherable-only resources are excluded.
+    Returns required_inorganics and required_organics sets.
+    """
+    required_inorganics = set(resources_by_rarity["inorganic"].keys())
+    required_inorganics.discard("Helium-3")
+    required_inorganics.discard("Water")
+    required_inorganics -= set(groups.get("gatherable_only", {}).get("inorganic", []))
+    required_organics = set(resources_by_rarity["organic"].keys())
+    required_organics -= set(groups.get("gatherable_only", {}).get("organic", []))
+    return required_inorganics, required_organics
 
-    final_all_resources = all_inorganics | all_organics
 
-    # Initialize 'Captured Resources' for each planet
-    for planet in final_planets:
-        planet.setdefault("outpost_candidacy", {})
-        planet["outpost_candidacy"].setdefault("captured_resources", [])
+def get_assignment_costs(planet, required_inorganics, required_organics, groups, inorganic_groups_with_unique):
+    """
+    Lists the required resources a planet can capture, with a preference cost for each.
+    Resources the planet was picked for (full chain, partial group, unique or 'other') are cheapest,
+    farmable organics in their grouped state (flora or fauna) come next, everything else is a fallback.
+    Returns a dictionary of resource names and costs.
+    """
+    candidacy = planet.get("outpost_candidacy", {})
+    planet_inorganics = set(planet.get("resources", {}).get("inorganic", []))
+    domesticable = {
+        state: set(planet.get(state, {}).get("domesticable", {}))
+        for state in ["flora", "fauna"]
+    }
 
-    # Step 2: Process full chain planets
-    for planet in final_planets:
-        full_resource_chains = planet.get("outpost_candidacy", {}).get("full_resource_chain", [])
-        if not isinstance(full_resource_chains, list):
-            full_resource_chains = [full_resource_chains]
-        for resource_group in full_resource_chains:
-            resource_group = resource_group.strip()
-            if resource_group in groups.get("inorganic", {}):
-                group_resources = set(inorganic_groups_with_unique[resource_group])
-                # Remove gatherable resources
-                group_resources -= set(groups.get("gatherable_only", {}).get("inorganic", []))
-                # Ensure resources are present on the planet
-                planet_inorganics = set(planet.get("resources", {}).get("inorganic", []))
-                relevant_resources = group_resources & planet_inorganics
-                assigned_resources = relevant_resources & all_inorganics
-                # Capacity check
-                capacity_remaining = 5 - len(planet["outpost_candidacy"]["captured_resources"])
-                if capacity_remaining > 0:
-                    assigned_resources = set(list(assigned_resources)[:capacity_remaining])
-                    all_inorganics -= assigned_resources
-                    planet["outpost_candidacy"]["captured_resources"].extend(assigned_resources)
-            else:
-                raise Exception(f"Resource group {resource_group} not found.")
+    # Resources the planet was selected for
+    selected_for = set(candidacy.get("unique", [])) | set(candidacy.get("other", []))
+    for resource_group in candidacy.get("full_resource_chain", []):
+        resource_group = resource_group.strip()
+        if resource_group not in groups.get("inorganic", {}):
+            raise Exception(f"Resource group {resource_group} not found.")
+        selected_for.update(inorganic_groups_with_unique[resource_group])
+    for partial_group in candidacy.get("resource_group_partial", []):
+        resource_group = partial_group.replace(" (partial)", "").strip()
+        if resource_group not in groups.get("inorganic", {}):
+            raise Exception(f"Partial resource group {resource_group} not found.")
+        selected_for.update(groups["inorganic"][resource_group])
+
+    costs = {}
+    for resource in planet_inorganics & required_inorganics:
+        costs[resource] = ASSIGNMENT_COST_SELECTED if resource in selected_for else ASSIGNMENT_COST_FALLBACK
+
+    for resource in (domesticable["flora"] | domesticable["fauna"]) & required_organics:
+        if resource in selected_for:
+            costs[resource] = ASSIGNMENT_COST_SELECTED
+            continue
+        preferred_state = None
+        if resource in groups.get("organic", {}).get("flora", []):
+            preferred_state = "flora"
+        elif resource in groups.get("organic", {}).get("fauna", []):
+            preferred_state = "fauna"
+        if preferred_state and resource in domesticable[preferred_state]:
+            costs[resource] = ASSIGNMENT_COST_GROUPED
+        else:
+            costs[resource] = ASSIGNMENT_COST_FALLBACK
 
-    # Step 3: Process 'other' organics
-    for planet in final_planets:
-        others = planet.get("outpost_candidacy", {}).get("other", [])
-        if not isinstance(others, list):
-            others = [others]
-        for other_resource in others:
-            other_resource = other_resource.strip()
-            # Ignore if 'other' is a gatherable-only resource
-            if other_resource not in groups.get("gatherable_only", {}).get("organic", []):
-                # Ensure resource is present on the planet
-                if other_resource in planet.get("flora", {}).get("domesticable", {}) or \
-                   other_resource in planet.get("fauna", {}).get("domesticable", {}):
-                    assigned_resources = set([other_resource]) & all_organics
-                    # Capacity check
-                    if len(planet["outpost_candidacy"]["captured_resources"]) < 5:
-                        planet["outpost_candidacy"]["captured_resources"].extend(assigned_resources)
-                        all_organics -= assigned_resources
-
-    # Step 4: Process partial resource groups
-    for planet in final_planets:
-        partial_groups = planet.get("outpost_candidacy", {}).get("resource_group_partial", [])
-        if not isinstance(partial_groups, list):
-            partial_groups = [partial_groups]
-        for partial_group in partial_groups:
-            resource_group = partial_group.replace(" (partial)", "").strip()
-            if resource_group in groups.get("inorganic", {}):
-                group_resources = set(groups["inorganic"][resource_group])
-                # Remove gatherable resources
-                group_resources -= set(groups.get("gatherable_only", {}).get("inorganic", []))
-                # Ensure resources are present on the planet
-                planet_inorganics = set(planet.get("resources", {}).get("inorganic", []))
-                relevant_resources = group_resources & planet_inorganics
-                assigned_resources = relevant_resources & all_inorganics
-                # Capacity check
-                capacity_remaining = 5 - len(planet["outpost_candidacy"]["captured_resources"])
-                if capacity_remaining > 0:
-                    assigned_resources = set(list(assigned_resources)[:capacity_remaining])
-                    all_inorganics -= assigned_resources
-                    planet["outpost_candidacy"]["captured_resources"].extend(assigned_resources)
-            else:
-                raise Exception(f"Partial resource group {resource_group} not found.")
+    return costs
 
-    # Step 5: Process unique resource planets
-    for planet in final_planets:
-        unique_resource_list = planet.get("outpost_candidacy", {}).get("unique", [])
-        if not isinstance(unique_resource_list, list):
-            unique_resource_list = [unique_resource_list]
-        for unique_resource in unique_resource_list:
-            unique_resource = unique_resource.strip()
-            # Ignore if unique_resource is gatherable-only
-            if unique_resource in groups.get("gatherable_only", {}).get("inorganic", []) or \
-               unique_resource in groups.get("gatherable_only", {}).get("organic", []):
-                continue  # Skip gatherable-only uniques
-            # Check if the planet has the unique resource
-            resource_present = False
-            if unique_resource in planet.get("resources", {}).get("inorganic", []):
-                resource_type = "inorganic"
-                resource_present = True
-            elif unique_resource in planet.get("flora", {}).get("domesticable", {}) or \
-                 unique_resource in planet.get("fauna", {}).get("domesticable", {}):
-                resource_type = "organic"
-                resource_present = True
-            if resource_present:
-                # Capacity check
-                if len(planet["outpost_candidacy"]["captured_resources"]) < 5:
-                    planet["outpost_candidacy"]["captured_resources"].append(unique_resource)
-                    if resource_type == "inorganic":
-                        all_inorganics.discard(unique_resource)
-                    else:
-                        all_organics.discard(unique_resource)
-            else:
-                # Resource not present on planet, cannot assign
-                pass
 
-    # Step 6: Verify that all inorganic resources have been assigned
-    if all_inorganics:
-        raise Exception(f"Inorganic resources not assigned: {all_inorganics}")
+def find_assignment_bottleneck(resources, planet_count, edges, capacity=OUTPOST_CAPACITY):
+    """
+    Runs a max-flow from resources to planets (each planet holding `capacity` resources).
+    When not every resource can be placed, the resources still reachable from the source in the
+    residual graph form the bottleneck: together they need more slots than their planets offer.
+    Returns the bottleneck resource names and the indices of the saturated planets (both empty if feasible).
+    """
+    # Nodes: 0 = source, 1..R = resources, R+1..R+P = planets, R+P+1 = sink
+    resource_count = len(resources)
+    sink = resource_count + planet_count + 1
+    rows, cols, caps = [], [], []
+    for i in range(resource_count):
+        rows.append(0)
+        cols.append(1 + i)
+        caps.append(1)
+    for i, j in edges:
+        rows.append(1 + i)
+        cols.append(1 + resource_count + j)
+        caps.append(1)
+    for j in range(planet_count):
+        rows.append(1 + resource_count + j)
+        cols.append(sink)
+        caps.append(capacity)
+
+    capacity_graph = csr_matrix(
+        (np.array(caps, dtype=np.int32), (np.array(rows, dtype=np.int32), np.array(cols, dtype=np.int32))),
+        shape=(sink + 1, sink + 1),
+    )
+    flow = maximum_flow(capacity_graph, 0, sink)
+    if flow.flow_value == resource_count:
+        return [], []
+
+    # Residual capacity, reverse arcs appear through the antisymmetric flow matrix
+    residual = (capacity_graph - flow.flow).tocsr()
+    residual.data[residual.data < 0] = 0
+    residual.eliminate_zeros()
+    reachable = breadth_first_order(residual, 0, directed=True, return_predecessors=False)
+
+    bottleneck_resources = sorted(resources[node - 1] for node in reachable if 1 <= node <= resource_count)
+    saturated_planets = sorted(
+        node - 1 - resource_count for node in reachable if resource_count < node < sink
+    )
+    return bottleneck_resources, saturated_planets
 
-    # Step 7: Assign unassigned organics to planets
-    resources_to_assign = all_organics.copy()
 
-    # Assign resources available on only one planet first
-    while True:
-        resource_planet_mapping = {}
-        for resource in resources_to_assign:
-            preferred_state = None
-            if resource in groups.get("organic", {}).get("flora", []):
-                preferred_state = "flora"
-            elif resource in groups.get("organic", {}).get("fauna", []):
-                preferred_state = "fauna"
-            candidate_planets = []
-            for planet in final_planets:
-                # Ensure planet capacity is not exceeded
-                if len(planet["outpost_candidacy"]["captured_resources"]) >= 4:
-                    continue
-                if preferred_state:
-                    planet_resources = planet.get(preferred_state, {}).get("domesticable", {}).keys()
-                    if resource in planet_resources:
-                        candidate_planets.append(planet)
-                else:
-                    for state in ["flora", "fauna"]:
-                        planet_resources = planet.get(state, {}).get("domesticable", {}).keys()
-                        if resource in planet_resources:
-                            candidate_planets.append(planet)
-                            break
-            resource_planet_mapping[resource] = candidate_planets
-
-        assigned_in_this_round = False
-        for resource, planets in resource_planet_mapping.items():
-            if len(planets) == 1:
-                planet = planets[0]
-                # Double-check the planet's capacity before assignment
-                if len(planet["outpost_candidacy"]["captured_resources"]) < 4:
-                    planet["outpost_candidacy"]["captured_resources"].append(resource)
-                    resources_to_assign.discard(resource)
-                    assigned_in_this_round = True
-        if not assigned_in_this_round:
-            break
+def verify_final_planets(final_planets, resources_by_rarity, groups):
+    """
+    Assigns every required resource to exactly one final planet, at most OUTPOST_CAPACITY per planet.
+    The assignment is a min-cost bipartite matching of resources to planet slots, so it always succeeds
+    when an assignment exists. The fifth slot of a planet is only used when needed.
+    Raises a ValueError naming the bottleneck resources when no assignment exists.
+    Returns final_planets with 'captured_resources' set in each outpost_candidacy.
+    """
+    required_inorganics, required_organics = get_required_resources(resources_by_rarity, groups)
+    inorganic_groups_with_unique = load_resource_groups(INORGANIC_GROUPS_PATH)
 
-    # Assign remaining resources based on planet capacity and resource availability
-    while resources_to_assign:
-        planets_with_open_slots = [planet for planet in final_planets if len(planet["outpost_candidacy"]["captured_resources"]) < 4]
-        if not planets_with_open_slots:
-            # Allow adding a 5th resource
-            planets_with_open_slots = [planet for planet in final_planets if len(planet["outpost_candidacy"]["captured_resources"]) < 5]
-            if not planets_with_open_slots:
-                raise Exception("No planets available to assign remaining resources.")
-
-        resources_assigned_this_round = False
-        for resource in list(resources_to_assign):
-            candidate_planets = []
-            for planet in planets_with_open_slots:
-                if len(planet["outpost_candidacy"]["captured_resources"]) >= 5:
-                    continue
-                for state in ["flora", "fauna"]:
-                    planet_resources = planet.get(state, {}).get("domesticable", {}).keys()
-                    if resource in planet_resources:
-                        candidate_planets.append(planet)
-                        break
-            if not candidate_planets:
-                continue
+    # Organics first, then inorganics, both sorted so the assignment is reproducible
+    resources = sorted(required_organics) + sorted(required_inorganics)
+    resource_index = {resource: i for i, resource in enumerate(resources)}
 
-            # Calculate preference scores
-            planet_scores = []
-            for planet in candidate_planets:
-                open_slots = 5 - len(planet["outpost_candidacy"]["captured_resources"])
-                # Count how many resources from the same group are already on the planet
-                resource_groups = groups.get("organic", {})
-                resource_group = None
-                for group_name, resources in resource_groups.items():
-                    if resource in resources:
-                        resource_group = group_name
-                        break
-                existing_group_resources = sum(
-                    res in resource_groups.get(resource_group, []) for res in planet["outpost_candidacy"]["captured_resources"]
-                )
-                # Higher score for planets that already have resources from the same group
-                score = existing_group_resources
-                planet_scores.append((score, planet))
-
-            if planet_scores:
-                # Assign to the planet with the highest score
-                planet_scores.sort(key=lambda x: x[0], reverse=True)
-                for _, best_planet in planet_scores:
-                    if len(best_planet["outpost_candidacy"]["captured_resources"]) < 5:
-                        best_planet["outpost_candidacy"]["captured_resources"].append(resource)
-                        resources_to_assign.discard(resource)
-                        resources_assigned_this_round = True
-                        break
+    edges = {}
+    for j, planet in enumerate(final_planets):
+        costs = get_assignment_costs(
+            planet, required_inorganics, required_organics, groups, inorganic_groups_with_unique
+        )
+        for resource, cost in costs.items():
+            edges[(resource_index[resource], j)] = cost
+
+    bottleneck_resources, saturated_planets = find_assignment_bottleneck(resources, len(final_planets), edges)
+    if bottleneck_resources:
+        planet_names = [final_planets[j]["name"] for j in saturated_planets]
+        raise ValueError(
+            f"Not all resources can be captured. Bottleneck resources: {bottleneck_resources}, "
+            f"saturated planets: {planet_names}"
+        )
 
+    # Expand planets into slots; the last slot carries a penalty
+    rows, cols, weights = [], [], []
+    for (i, j), cost in edges.items():
+        for slot in range(OUTPOST_CAPACITY):
+            rows.append(i)
+            cols.append(j * OUTPOST_CAPACITY + slot)
+            weights.append(cost + (ASSIGNMENT_COST_LAST_SLOT if slot >= PREFERRED_OUTPOST_LOAD else 0))
+    biadjacency = csr_matrix(
+        (np.array(weights, dtype=float), (np.array(rows), np.array(cols))),
+        shape=(len(resources), len(final_planets) * OUTPOST_CAPACITY),
+    )
+    matched_rows, matched_slots = min_weight_full_bipartite_matching(biadjacency)
 
-        if not resources_assigned_this_round:
-            break
-    
-    # Final Check
-    resources = []
-    for planet in final_planets:
-        resources = set(planet.get("outpost_candidacy").get("captured_resources", {}))
-        if not resources != final_all_resources:
-            missing = final_all_resources.discard(resources)
-            raise ValueError(f"Not all resources captured: {missing}")
+    captured = [[] for _ in final_planets]
+    for i, slot in sorted(zip(matched_rows, matched_slots), key=lambda pair: pair[1]):
+        captured[slot // OUTPOST_CAPACITY].append(resources[i])
+
+    for planet, captured_resources in zip(final_planets, captured):
+        planet.setdefault("outpost_candidacy", {})
+        planet["outpost_candidacy"]["captured_resources"] = captured_resources
 
-    # Return the modified final_planets
     return final_planets
 
 
+def build_cached_plan(system_data, final_planets, uncaptured_resources, lower_bound):
+    """
+    Packs a solved plan for the result cache: the final planet names, the outpost candidacy
+    annotations of every planet, the uncaptured resources and the planet lower bound (None if unproven).
+    """
+    return {
+        "final_planets": [planet["name"] for planet in final_planets],
+        "outpost_candidacy": {
+            planet["name"]: planet["outpost_candidacy"]
+            for system in system_data
+            for planet in system["planets"]
+            if "outpost_candidacy" in planet
+        },
+        "uncaptured_resources": {
+            resource_type: sorted(resources) for resource_type, resources in uncaptured_resources.items()
+        },
+        "lower_bound": lower_bound,
+    }
 
 
-def find_best_systems(system_data, unique_resources, resources_by_rarity, groups):
+def restore_cached_plan(system_data, cached_plan):
     """
-    Identifies the best systems for outpost setup based on unique resources and full resource chains.
-    Returns the final list of planets for outpost placement.
+    Applies a cached plan's candidacy annotations to system_data.
+    Returns the final planets and uncaptured resources of the cached plan.
+    """
+    planets_by_name = {}
+    for system in system_data:
+        for planet in system["planets"]:
+            planet.pop("outpost_candidacy", None)
+            if planet["name"] in cached_plan["outpost_candidacy"]:
+                planet["outpost_candidacy"] = cached_plan["outpost_candidacy"][planet["name"]]
+            planets_by_name[planet["name"]] = planet
+
+    final_planets = [planets_by_name[name] for name in cached_plan["final_planets"]]
+    uncaptured_resources = {
+        resource_type: set(resources) for resource_type, resources in cached_plan["uncaptured_resources"].items()
+    }
+    return final_planets, uncaptured_resources
+
+
+def get_solver_cache_key(system_data, unique_resources, resources_by_rarity, groups, solver_options):
+    """
+    Hashes only the solver inputs. The outpost candidacy annotations are left out: earlier steps
+    derive them from the same inputs, and earlier runs leave their own behind.
     """
+    solver_systems = [
+        {
+            **system,
+            "planets": [
+                {key: value for key, value in planet.items() if key != "outpost_candidacy"}
+                for planet in system["planets"]
+            ],
+        }
+        for system in system_data
+    ]
+    return hash_data(
+        SOLVER_CACHE_VERSION, solver_systems, unique_resources, resources_by_rarity, groups, solver_options
+    )
+
+
+def solve_best_systems(system_data, unique_resources, resources_by_rarity, groups, budget=None):
+    """
+    Runs the solver steps, annotating system_data with the outpost candidacy of the plan.
+    Returns the final planets and uncaptured resources, not yet verified.
+    """
+    coverage = get_resource_coverage(system_data)
+
     # Step 1: Capture unique resource systems
     final_planets, processed_systems, captured_resources = capture_unique_resource_systems(
-        system_data, unique_resources, groups
+        system_data, unique_resources, groups, coverage
     )
 
     # Step 2: Capture systems with full chains that contibute the most to uncaptured organics.
@@ -899,6 +1006,7 @@ def find_best_systems(system_data, unique_resources, resources_by_rarity, groups
         captured_resources,
         resources_by_rarity,
         groups,
+        budget,
     )
 
     # final_planets, processed_systems, captured_resources = capture_full_chain_systems_greedy(
@@ -908,54 +1016,111 @@ def find_best_systems(system_data, unique_resources, resources_by_rarity, groups
     # Step 3: Apply Highlander Rules
     final_planets = apply_highlander_rules(final_planets, captured_resources, resources_by_rarity, groups)
 
-    # Calculate uncaptured resources for next step
-    uncaptured_resources = calculate_uncaptured_resources(
-        captured_resources, resources_by_rarity, groups["gatherable_only"]
+    # Steps 4 and 5: Capture remaining organics and eliminate redundant planets
+    final_planets, captured_resources, uncaptured_resources = reduce_planet_count(
+        system_data,
+        final_planets,
+        captured_resources,
+        resources_by_rarity,
+        groups,
+        budget,
+        verbose=True,
+        coverage=coverage,
     )
 
-    iter_count = 1
-    while len(uncaptured_resources["organic"]) > 0:
-        print(f" {iter_count}: Reducing planet count... ")
-        # Step 4: Capture remaining organics
-        final_planets, captured_resources = capture_remaining_organics(
-            system_data,
-            final_planets,
-            captured_resources,
-            groups,
-            uncaptured_resources["organic"],
-        )
-
-        # Step 5: Elimination
-        final_planets = eliminate_redundant_planets(final_planets, groups)
-
-        captured_resources = recalculate_captured_resources(final_planets, captured_resources)
-        uncaptured_resources = calculate_uncaptured_resources(
-            captured_resources, resources_by_rarity, groups["gatherable_only"]
-        )
-        iter_count += 1
-
     # Step 6: Capture Helium-3 and Water and clean up potential groups.
     captured_resources = capture_helium_and_water(final_planets, captured_resources)
     system_data, final_planets = clean_up_after_processing(system_data, final_planets)
 
-
-
-
-    # Print final results
     captured_resources = recalculate_captured_resources(final_planets, captured_resources)
     uncaptured_resources = calculate_uncaptured_resources(
         captured_resources, resources_by_rarity, groups["gatherable_only"]
     )
+    return final_planets, uncaptured_resources
 
-    final_planets = verify_final_planets(final_planets, resources_by_rarity, groups)
+
+def find_best_systems(system_data, unique_resources, resources_by_rarity, groups, solver_options=None, use_cache=True):
+    """
+    Identifies the best systems for outpost setup based on unique resources and full resource chains.
+    `solver_options` may hold a 'time_limit' (seconds) and 'max_iterations' budget. When it runs out before
+    the plan verifies, the cached plan of a complete run on the same inputs is used instead, if there is one.
+    Only verified plans are written to the final data. LOWER_BOUND_TIME_SHARE of the time limit is set aside
+    for the lower bound the optimality gap is reported against.
+    Results are cached by a hash of the solver inputs and of `solver_options`, so an unchanged rerun
+    reloads the stored plan instead of solving again.
+    Returns the final list of planets for outpost placement, or None if no verified plan was found.
+    """
+    # Imported here, find_outposts_pareto builds on this module
+    from find_outposts_pareto import compute_planet_lower_bound
+
+    solver_options = solver_options or {}
+    budget = create_budget(solver_options.get("time_limit"), solver_options.get("max_iterations"))
+    lower_bound_time = reserve_budget_time(budget, LOWER_BOUND_TIME_SHARE)
+
+    if use_cache:
+        cache_key = get_solver_cache_key(system_data, unique_resources, resources_by_rarity, groups, solver_options)
+        cached_plan = load_cached_result(SOLVER_CACHE_DIR, cache_key)
+        if cached_plan is not None:
+            final_planets, uncaptured_resources = restore_cached_plan(system_data, cached_plan)
+            save_system_data(FINAL_SYSTEM_DATA_PATH, system_data)
+            print_final_results(final_planets, uncaptured_resources)
+            print_optimality_gap(len(final_planets), cached_plan["lower_bound"])
+            return final_planets
+
+    # The annotations from before solving, to go back to if the plan doesn't verify
+    initial_candidacy = deepcopy(build_cached_plan(system_data, [], {}, None))
+    final_planets, uncaptured_resources = solve_best_systems(
+        system_data, unique_resources, resources_by_rarity, groups, budget
+    )
+
+    try:
+        final_planets = verify_final_planets(final_planets, resources_by_rarity, groups)
+    except ValueError as error:
+        if not budget_exhausted(budget):
+            raise
+        print(f"Budget-limited plan not verified: {error}")
+        restore_cached_plan(system_data, initial_candidacy)
+        complete_plan = None
+        if use_cache:
+            complete_key = get_solver_cache_key(system_data, unique_resources, resources_by_rarity, groups, {})
+            complete_plan = load_cached_result(SOLVER_CACHE_DIR, complete_key)
+        if complete_plan is None:
+            print("No verified plan found within the budget, the final data is left unchanged.")
+            return None
+        print("Using the cached plan of a complete run instead.")
+        final_planets, uncaptured_resources = restore_cached_plan(system_data, complete_plan)
+        save_system_data(FINAL_SYSTEM_DATA_PATH, system_data)
+        print_final_results(final_planets, uncaptured_resources)
+        print_optimality_gap(len(final_planets), complete_plan["lower_bound"])
+        return final_planets
+
+    # The reserved time, plus whatever the solver left
+    if lower_bound_time is not None:
+        lower_bound_time += get_remaining_time(budget)
+    lower_bound = compute_planet_lower_bound(system_data, resources_by_rarity, groups, lower_bound_time)
 
     save_system_data(FINAL_SYSTEM_DATA_PATH, system_data)
+    # Budget-limited plans depend on timing, only complete ones are cached
+    if use_cache and not budget_exhausted(budget):
+        save_cached_result(
+            SOLVER_CACHE_DIR,
+            cache_key,
+            build_cached_plan(system_data, final_planets, uncaptured_resources, lower_bound),
+        )
 
     print_final_results(final_planets, uncaptured_resources)
+    print_optimality_gap(len(final_planets), lower_bound)
 
     return final_planets
 
 
+def print_optimality_gap(planet_count, lower_bound):
+    if lower_bound is None:
+        print("Lower bound not proven within the budget.")
+    else:
+        print(f"Lower bound: {lower_bound} planets, optimality gap: {planet_count - lower_bound}")
+
+
 def print_final_results(final_planets, uncaptured_resources):
     """
     Prints the final planets, the count of final planets, and uncaptured resources.
@@ -1010,13 +1175,23 @@ def print_final_results(final_planets, uncaptured_resources):
 
 
 
-def find_outposts_with_scored_fullchain(): 
+def find_outposts_with_scored_fullchain(time_limit=None, max_iterations=None):
     
     all_systems, rarity, unique, groups = load_all_data()
 
+    solver_options = {
+        option: value
+        for option, value in {"time_limit": time_limit, "max_iterations": max_iterations}.items()
+        if value is not None
+    }
+
     find_fullchain_planets(all_systems, groups["inorganic"])
     find_unique_resources(all_systems, unique)
-    find_best_systems(all_systems, unique, rarity, groups)
+    find_best_systems(all_systems, unique, rarity, groups, solver_options)
 
 if __name__ == '__main__':
-    find_outposts_with_scored_fullchain()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Find outposts with the scored full chain solver.")
+    parser.add_argument("--time-limit", type=float, help="Wall-clock budget in seconds.")
+    parser.add_argument("--max-iterations", type=int, help="Budget in solver iterations.")
+    args = parser.parse_args()
+    find_outposts_with_scored_fullchain(args.time_limit, args.max_iterations)
\ No newline at end of file
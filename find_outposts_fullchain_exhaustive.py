@@ -1,8 +1,15 @@
-import itertools
+import os
+import sys
+import time
 import warnings
+import argparse
+import math
+import json
+import random
 from tqdm.rich import tqdm as rich_tqdm
 from tqdm.std import TqdmExperimentalWarning
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from multiprocessing import Pool, cpu_count
 from rich.live import Live
 from rich.table import Table
 from rich.console import Console, Group
@@ -14,25 +21,55 @@ from copy import deepcopy, copy
 # Suppress the experimental warning for rich tqdm
 warnings.filterwarnings("ignore", category=TqdmExperimentalWarning)
 
+# Part of the checkpoint run key. Bump when the checkpoint layout or search order changes.
+CHECKPOINT_VERSION = 3
+# Seconds between checkpoint writes
+CHECKPOINT_INTERVAL = 5
+# Post-Highlander results kept by the suffix cache. An entry holds one plan's planet copies.
+SUFFIX_CACHE_SIZE = 4096
+# Distinct minimal plans kept by the plan pool, further plans are only counted
+MAX_RETAINED_PLANS = 1000
+# Sampling: z-score of the confidence intervals (95%), samples between interval checks,
+# and samples drawn before an interval width may stop the run
+SAMPLE_Z_SCORE = 1.96
+SAMPLE_CHECK_INTERVAL = 100
+MIN_SAMPLES_BEFORE_STOP = 500
+
 # Local Imports
 
+from config import EXHAUSTIVE_CHECKPOINT_PATH, LOWER_BOUND_TIME_SHARE
 from common import (
     save_system_data,
+    load_system_data,
+    save_json_atomic,
+    append_json_lines,
+    hash_data,
     load_all_data,
+    create_budget,
+    budget_exhausted,
+    spend_budget,
+    get_remaining_time,
+    reserve_budget_time,
 )
 
 from find_outposts_fullchain import (
     apply_highlander_rules,
     calculate_uncaptured_resources,
-    capture_remaining_organics,
-    eliminate_redundant_planets,
+    capture_organic_resources,
+    reduce_planet_count,
     recalculate_captured_resources,
     capture_helium_and_water,
     capture_unique_resource_systems,
     find_fullchain_planets,
     find_unique_resources,
+    get_required_resources,
     print_final_results,
+    print_optimality_gap,
+    score_by_desired,
+    verify_final_planets,
 )
+from find_outposts_pareto import compute_planet_lower_bound
+from resource_coverage import get_resource_coverage
 
 
 def collect_full_chain_planets(system_data, groups, processed_systems, final_planets):
@@ -41,7 +78,8 @@ def collect_full_chain_planets(system_data, groups, processed_systems, final_pla
     Returns a dictionary mapping group names to lists of planets.
     """
     fullchain_by_group = {}
-    remaining_inorganic_groups = set(groups["inorganic"].keys())
+    # Keep the groups file order, combination indexes must mean the same in every process
+    remaining_inorganic_groups = list(groups["inorganic"].keys())
 
     for group_name in remaining_inorganic_groups:
         candidate_planets = []
@@ -63,15 +101,155 @@ def collect_full_chain_planets(system_data, groups, processed_systems, final_pla
     return fullchain_by_group
 
 
-def generate_full_chain_combinations(fullchain_by_group):
+def get_candidate_lists(fullchain_by_group):
     """
-    Generates all possible combinations where each group is represented by one planet.
-    Returns a list of combinations, where each combination is a list of planets.
+    Returns the candidate planets of each group, in group order.
+    Combinations are numbered over these lists in itertools.product order.
     """
-    group_names = list(fullchain_by_group.keys())
-    candidate_lists = [fullchain_by_group[group_name] for group_name in group_names]
-    all_combinations = list(itertools.product(*candidate_lists))
-    return all_combinations
+    return [fullchain_by_group[group_name] for group_name in fullchain_by_group]
+
+
+def get_class_candidate_lists(classes_by_group):
+    """
+    Returns the class representatives of each group, in group order, and each representative's class size.
+    """
+    candidate_lists = [[candidate_class["planet"] for candidate_class in classes] for classes in classes_by_group.values()]
+    class_sizes = {
+        candidate_class["planet"]["name"]: candidate_class["multiplicity"]
+        for classes in classes_by_group.values()
+        for candidate_class in classes
+    }
+    return candidate_lists, class_sizes
+
+
+def count_combinations(candidate_lists):
+    return math.prod(len(candidates) for candidates in candidate_lists)
+
+
+def decode_combination_index(index, candidate_lists):
+    """
+    Maps a combination index to its planets by mixed-radix decoding, the last group varying fastest.
+    Returns a tuple with one planet per group.
+    """
+    if not 0 <= index < count_combinations(candidate_lists):
+        raise IndexError(f"Combination index {index} out of range.")
+    digits = []
+    for candidates in reversed(candidate_lists):
+        index, digit = divmod(index, len(candidates))
+        digits.append(digit)
+    return tuple(candidates[digit] for candidates, digit in zip(candidate_lists, reversed(digits)))
+
+
+def encode_combination(combination, candidate_lists):
+    """
+    Maps a combination (one planet per group) back to its index.
+    """
+    index = 0
+    for planet, candidates in zip(combination, candidate_lists):
+        digit = next((i for i, candidate in enumerate(candidates) if candidate["name"] == planet["name"]), None)
+        if digit is None:
+            raise ValueError(f"Planet {planet['name']} is not a candidate for its group.")
+        index = index * len(candidates) + digit
+    return index
+
+
+def iterate_combinations(candidate_lists, start=0, stop=None):
+    """
+    Lazily yields the combinations with index in [start, stop), without building the full product.
+    Only the first one is decoded, the rest step the mixed-radix digits like an odometer.
+    """
+    total = count_combinations(candidate_lists)
+    stop = total if stop is None else min(stop, total)
+    if start >= stop:
+        return
+
+    digits = []
+    index = start
+    for candidates in reversed(candidate_lists):
+        index, digit = divmod(index, len(candidates))
+        digits.append(digit)
+    digits.reverse()
+
+    for _ in range(start, stop):
+        yield tuple(candidates[digit] for candidates, digit in zip(candidate_lists, digits))
+        for position in range(len(digits) - 1, -1, -1):
+            digits[position] += 1
+            if digits[position] < len(candidate_lists[position]):
+                break
+            digits[position] = 0
+
+
+def get_organic_candidate_systems(system_data, resources_by_rarity, groups):
+    """
+    Returns the systems with only the planets capture_remaining_organics could pick,
+    those holding a capturable required organic. Planet order is kept, so the greedy picks the same planet.
+    """
+    _, required_organics = get_required_resources(resources_by_rarity, groups)
+    organic_candidate_systems = []
+    for system in system_data:
+        planets = [planet for planet in system["planets"] if capture_organic_resources(planet, groups, required_organics)]
+        if planets:
+            organic_candidate_systems.append({**system, "planets": planets})
+    return organic_candidate_systems
+
+
+def overlay_planet(planet, overlay):
+    """
+    Returns the combination's copy of a planet, made on first use. Only the planet dict and its
+    outpost_candidacy are copied: the pipeline assigns annotations there, everything else stays shared.
+    """
+    if planet["name"] not in overlay:
+        overlay[planet["name"]] = {**planet, "outpost_candidacy": dict(planet.get("outpost_candidacy", {}))}
+    return overlay[planet["name"]]
+
+
+def create_suffix_cache(max_size=SUFFIX_CACHE_SIZE):
+    """
+    Returns an LRU cache for the part of process_combination after the Highlander rules.
+    Branch and bound memoizes whole leaves in it instead. A max_size of 0 turns it off.
+    """
+    return {"entries": OrderedDict(), "max_size": max_size, "hits": 0, "misses": 0}
+
+
+def lookup_suffix_cache(suffix_cache, cache_key):
+    """Returns the entry of `cache_key` and marks it recently used, or None. Counts the hit or miss."""
+    if cache_key in suffix_cache["entries"]:
+        suffix_cache["hits"] += 1
+        suffix_cache["entries"].move_to_end(cache_key)
+        return suffix_cache["entries"][cache_key]
+    suffix_cache["misses"] += 1
+    return None
+
+
+def store_suffix_cache(suffix_cache, cache_key, value):
+    """Stores an entry, evicting the least recently used one once the cache is full."""
+    suffix_cache["entries"][cache_key] = value
+    if len(suffix_cache["entries"]) > suffix_cache["max_size"]:
+        suffix_cache["entries"].popitem(last=False)
+
+
+def get_suffix_cache_key(final_planets, captured_resources):
+    """
+    Everything the steps after the Highlander rules depend on: the planets they start from, and the organics
+    captured_resources still holds from planets the Highlander rules dropped. The planet order follows from
+    the set, as apply_highlander_rules orders planets by unique resource and chain.
+    """
+    kept_organics = set()
+    for planet in final_planets:
+        kept_organics.update(planet["resources"].get("organic", []))
+    return (
+        frozenset(planet["name"] for planet in final_planets),
+        frozenset(captured_resources["organic"] - kept_organics),
+    )
+
+
+def report_suffix_cache(suffix_cache):
+    lookups = suffix_cache["hits"] + suffix_cache["misses"]
+    if lookups:
+        print(
+            f"Suffix cache: {suffix_cache['hits']} hits of {lookups} lookups "
+            f"({suffix_cache['hits'] / lookups:.1%}), {len(suffix_cache['entries'])} entries"
+        )
 
 
 def process_combination(
@@ -82,28 +260,31 @@ def process_combination(
     initial_system_data,
     resources_by_rarity,
     groups,
+    suffix_cache=None,
+    coverage=None,
 ):
     """
     Processes a single combination of planets.
+    `initial_system_data` only needs the planets the organics capture can pick, see get_organic_candidate_systems.
+    Every planet the pipeline touches is a per-combination overlay copy, so the dataset is never modified
+    and no annotation carries over to the next combination.
+    With a `suffix_cache` (see create_suffix_cache), combinations that leave the Highlander rules in the same
+    state share the result of the remaining steps. Cached planets are shared between results, don't modify them.
+    Pass the resource coverage of initial_system_data as `coverage` so it isn't looked up for every combination.
     Returns the final planets, the total number of planets, and uncaptured resources.
     """
-
-
-    # Deep copy the initial data structures to avoid modifying the originals
-    final_planets = initial_final_planets[:]
-    processed_systems = deepcopy(initial_processed_systems)
-    captured_resources = deepcopy(initial_captured_resources)
-    system_data_copy = [
-        {
-            **data,
-            'outpost_candidacy': deepcopy(data['outpost_candidacy'])
-        } if 'outpost_candidacy' in data else data
-        for data in initial_system_data
+    overlay = {}
+    final_planets = [overlay_planet(planet, overlay) for planet in initial_final_planets]
+    processed_systems = set(initial_processed_systems)
+    captured_resources = {resource_type: set(resources) for resource_type, resources in initial_captured_resources.items()}
+    system_data_view = [
+        {**system, "planets": [overlay_planet(planet, overlay) for planet in system["planets"]]}
+        for system in initial_system_data
     ]
 
-
     # Add planets from the combination to final_planets
     for planet in combination:
+        planet = overlay_planet(planet, overlay)
         if planet not in final_planets:
             final_planets.append(planet)
             captured_resources["inorganic"].update(planet["resources"].get("inorganic", []))
@@ -116,30 +297,17 @@ def process_combination(
     # Step 3: Apply Highlander Rules
     final_planets = apply_highlander_rules(final_planets, captured_resources, resources_by_rarity, groups)
 
-    # Calculate uncaptured resources for next step
-    uncaptured_resources = calculate_uncaptured_resources(
-        captured_resources, resources_by_rarity, groups["gatherable_only"]
-    )
-
-    iter_count = 1
-    while len(uncaptured_resources["organic"]) > 0:
-        # Step 4: Capture remaining organics
-        final_planets, captured_resources = capture_remaining_organics(
-            system_data_copy,
-            final_planets,
-            captured_resources,
-            groups,
-            uncaptured_resources["organic"],
-        )
-
-        # Step 5: Elimination
-        final_planets = eliminate_redundant_planets(final_planets, groups)
+    cache_key = None
+    if suffix_cache is not None and suffix_cache["max_size"] > 0:
+        cache_key = get_suffix_cache_key(final_planets, captured_resources)
+        cached_result = lookup_suffix_cache(suffix_cache, cache_key)
+        if cached_result is not None:
+            return cached_result
 
-        captured_resources = recalculate_captured_resources(final_planets, captured_resources)
-        uncaptured_resources = calculate_uncaptured_resources(
-            captured_resources, resources_by_rarity, groups["gatherable_only"]
-        )
-        iter_count += 1
+    # Steps 4 and 5: Capture remaining organics and eliminate redundant planets
+    final_planets, captured_resources, uncaptured_resources = reduce_planet_count(
+        system_data_view, final_planets, captured_resources, resources_by_rarity, groups, coverage=coverage
+    )
 
     # Step 6: Capture Helium-3 and Water
     captured_resources = capture_helium_and_water(final_planets, captured_resources)
@@ -150,23 +318,290 @@ def process_combination(
         captured_resources, resources_by_rarity, groups["gatherable_only"]
     )
 
+    result = (final_planets, len(final_planets), uncaptured_resources)
+    if cache_key is not None:
+        store_suffix_cache(suffix_cache, cache_key, result)
+
     # Return the final planets, their count, and uncaptured_resources
-    return final_planets, len(final_planets), uncaptured_resources
+    return result
+
+
+def get_plan_key(final_planets):
+    """
+    Returns the canonical key of a plan: its sorted planet names, plus each planet's
+    partial resource groups and partner planets.
+    """
+    planet_names = tuple(sorted(planet["name"] for planet in final_planets))
+    optional_attributes = tuple(
+        tuple(sorted(planet.get("outpost_candidacy", {}).get("resource_group_partial", [])))
+        + tuple(sorted(planet.get("outpost_candidacy", {}).get("partner_planets", [])))
+        for planet in sorted(final_planets, key=lambda planet: planet["name"])
+    )
+    return (planet_names, optional_attributes)
+
+
+def create_plan_pool(max_plans=MAX_RETAINED_PLANS):
+    """
+    Returns an empty pool of the distinct plans with the fewest planets found so far.
+    Plans are keyed by get_plan_key and stored as planet names with their outpost candidacy,
+    together with how many raw combinations reached them. Once `max_plans` distinct plans are kept,
+    combinations reaching other plans are only counted in `dropped_count`.
+    """
+    return {"min_planet_count": float("inf"), "plans": {}, "max_plans": max_plans, "dropped_count": 0}
+
+
+def add_plan(plan_pool, final_planets, planet_count, uncaptured_resources, multiplicity=1):
+    """
+    Records a plan reached by `multiplicity` raw combinations, if it ties or beats the pool's minimum.
+    Returns the plan's key for add_repeated_plan, or None if it was above the minimum.
+    """
+    if planet_count > plan_pool["min_planet_count"]:
+        return None
+    if planet_count < plan_pool["min_planet_count"]:
+        plan_pool.update({"min_planet_count": planet_count, "plans": {}, "dropped_count": 0})
+
+    plan_key = get_plan_key(final_planets)
+    plans = plan_pool["plans"]
+    if plan_key in plans:
+        plans[plan_key]["count"] += multiplicity
+    elif len(plans) < plan_pool["max_plans"]:
+        plans[plan_key] = {
+            "planets": [
+                {"name": planet["name"], "outpost_candidacy": planet.get("outpost_candidacy", {})}
+                for planet in final_planets
+            ],
+            "uncaptured_resources": uncaptured_resources,
+            "count": multiplicity,
+        }
+    else:
+        plan_pool["dropped_count"] += multiplicity
+    return plan_key
+
+
+def add_repeated_plan(plan_pool, plan_key, planet_count, multiplicity=1):
+    """
+    Records more combinations reaching a plan add_plan has already seen, from its key and planet count.
+    The pool's minimum never rises, so a plan that was above it or not kept still isn't.
+    """
+    if planet_count > plan_pool["min_planet_count"]:
+        return
+    if plan_key in plan_pool["plans"]:
+        plan_pool["plans"][plan_key]["count"] += multiplicity
+    else:
+        plan_pool["dropped_count"] += multiplicity
+
+
+def merge_plan_pools(plan_pool, other_pool):
+    """Adds the plans and dropped counts of `other_pool` to `plan_pool`."""
+    if other_pool["min_planet_count"] > plan_pool["min_planet_count"]:
+        return
+    if other_pool["min_planet_count"] < plan_pool["min_planet_count"]:
+        plan_pool.update({"min_planet_count": other_pool["min_planet_count"], "plans": {}, "dropped_count": 0})
+
+    plans = plan_pool["plans"]
+    for plan_key, plan in other_pool["plans"].items():
+        if plan_key in plans:
+            plans[plan_key]["count"] += plan["count"]
+        elif len(plans) < plan_pool["max_plans"]:
+            plans[plan_key] = dict(plan)
+        else:
+            plan_pool["dropped_count"] += plan["count"]
+    plan_pool["dropped_count"] += other_pool["dropped_count"]
+
+
+def get_pool_combinations(plan_pool, system_data):
+    """
+    Rebuilds the pool's plans from system_data, in the order they were found.
+    Returns a list of combinations with copies of their planets and `combination_count`,
+    the number of raw combinations that reached the plan.
+    """
+    planets_by_name = {planet["name"]: (system["name"], planet) for system in system_data for planet in system["planets"]}
+    best_combinations = []
+    for plan in plan_pool["plans"].values():
+        final_planets = []
+        for saved_planet in plan["planets"]:
+            system_name, planet = planets_by_name[saved_planet["name"]]
+            planet = deepcopy(planet)
+            planet["system_name"] = system_name
+            planet["outpost_candidacy"] = deepcopy(saved_planet["outpost_candidacy"])
+            final_planets.append(planet)
+        best_combinations.append(
+            {
+                "combination": None,
+                "final_planets": final_planets,
+                "planet_count": len(final_planets),
+                "uncaptured_resources": {
+                    resource_type: set(resources) for resource_type, resources in plan["uncaptured_resources"].items()
+                },
+                "combination_count": plan["count"],
+            }
+        )
+    return best_combinations
+
+
+def get_checkpoint_plans_path(path):
+    """Returns the path of the append-only plans file kept next to the checkpoint at `path`."""
+    return f"{os.path.splitext(path)[0]}_plans.jsonl"
+
+
+def create_checkpoint(path, run_key, resume=False, interval=CHECKPOINT_INTERVAL, max_plans=MAX_RETAINED_PLANS):
+    """
+    Returns the checkpoint state of a search run. With `resume`, a checkpoint at `path` written by a run
+    with the same `run_key` is restored: its next combination index, plan pool and occurrences.
+    The pool's plans are read from the plans file (see get_checkpoint_plans_path), up to the number
+    the checkpoint recorded, so plans appended after its last write are ignored.
+    """
+    checkpoint = {
+        "path": path,
+        "plans_path": get_checkpoint_plans_path(path),
+        "run_key": run_key,
+        "interval": interval,
+        "last_saved": time.monotonic(),
+        "next_index": None,
+        "plan_pool": create_plan_pool(max_plans),
+        "planet_count_occurrences": {},
+        # Plans in the plans file and the minimum they were written for, None to rewrite it
+        "plans_written": None,
+        "plans_min_planet_count": None,
+    }
+    if not resume:
+        return checkpoint
+    if not os.path.exists(path):
+        print(f"No checkpoint at {path}, starting from the beginning.")
+        return checkpoint
+
+    saved = load_system_data(path)
+    if saved.get("run_key") != run_key:
+        print(f"Checkpoint at {path} belongs to a different run, starting from the beginning.")
+        return checkpoint
+
+    plan_counts = saved["plan_counts"]
+    saved_plans = []
+    if plan_counts:
+        with open(checkpoint["plans_path"], "r", encoding="utf-8") as file:
+            for line, count in zip(file, plan_counts):
+                saved_plans.append({**json.loads(line), "count": count})
+    if len(saved_plans) < len(plan_counts):
+        print(f"Plans file {checkpoint['plans_path']} is incomplete, starting from the beginning.")
+        return checkpoint
+
+    plan_pool = checkpoint["plan_pool"]
+    min_planet_count = saved["min_planet_count"]
+    plan_pool.update(
+        {
+            "min_planet_count": min_planet_count if min_planet_count is not None else float("inf"),
+            "plans": {get_plan_key(plan["planets"]): plan for plan in saved_plans},
+            "dropped_count": saved["dropped_count"],
+        }
+    )
+    checkpoint.update(
+        {
+            "next_index": saved["next_index"],
+            "planet_count_occurrences": {int(count): n for count, n in saved["planet_count_occurrences"].items()},
+        }
+    )
+    print(f"Resuming from combination {saved['next_index']} with {len(plan_pool['plans'])} minimal plans.")
+    return checkpoint
+
+
+def restore_search_state(checkpoint):
+    """Returns the plan pool and occurrences a search starts from."""
+    if checkpoint is None:
+        return create_plan_pool(), defaultdict(int)
+    plan_pool = dict(checkpoint["plan_pool"])
+    plan_pool["plans"] = dict(plan_pool["plans"])
+    return plan_pool, defaultdict(int, checkpoint["planet_count_occurrences"])
+
+
+def write_checkpoint_plans(checkpoint, plan_pool):
+    """
+    Brings the plans file up to date with the pool. Plans only get added while the pool's minimum holds,
+    so new ones are appended; a lower minimum replaces the pool and the file is written again.
+    """
+    plans = list(plan_pool["plans"].values())
+    rewrite = (
+        checkpoint["plans_written"] is None
+        or checkpoint["plans_min_planet_count"] != plan_pool["min_planet_count"]
+    )
+    start = 0 if rewrite else checkpoint["plans_written"]
+    if not rewrite and start == len(plans):
+        return
+
+    append_json_lines(
+        checkpoint["plans_path"],
+        [{key: value for key, value in plan.items() if key != "count"} for plan in plans[start:]],
+        rewrite,
+    )
+    checkpoint["plans_written"] = len(plans)
+    checkpoint["plans_min_planet_count"] = plan_pool["min_planet_count"]
+
+
+def update_checkpoint(checkpoint, next_index, plan_pool, planet_count_occurrences, force=False):
+    """
+    Writes the checkpoint if `interval` seconds have passed since the last write (or `force` is set).
+    Every combination before `next_index` is included. The checkpoint itself only holds the index,
+    the occurrences and each plan's count; the plans go to the plans file when they change
+    (see write_checkpoint_plans), which is written first. The checkpoint write is atomic, see save_json_atomic.
+    """
+    if checkpoint is None:
+        return
+    now = time.monotonic()
+    if not force and now - checkpoint["last_saved"] < checkpoint["interval"]:
+        return
+
+    write_checkpoint_plans(checkpoint, plan_pool)
+    min_planet_count = plan_pool["min_planet_count"]
+    save_json_atomic(
+        checkpoint["path"],
+        {
+            "run_key": checkpoint["run_key"],
+            "next_index": next_index,
+            "min_planet_count": min_planet_count if min_planet_count != float("inf") else None,
+            "plan_counts": [plan["count"] for plan in plan_pool["plans"].values()],
+            "dropped_count": plan_pool["dropped_count"],
+            "planet_count_occurrences": dict(planet_count_occurrences),
+        },
+    )
+    checkpoint["last_saved"] = now
+
+
+def get_combination_multiplicity(combination, class_sizes=None):
+    """Returns how many raw combinations a combination of class representatives stands for."""
+    if not class_sizes:
+        return 1
+    return math.prod(class_sizes[planet["name"]] for planet in combination)
 
 
 def find_best_combinations(
-    all_combinations,
+    candidate_lists,
     initial_final_planets,
     initial_processed_systems,
     initial_captured_resources,
     system_data,
     resources_by_rarity,
     groups,
+    budget=None,
+    start=0,
+    stop=None,
+    class_sizes=None,
+    checkpoint=None,
+    suffix_cache=None,
 ):
-    min_planet_count = float("inf")
-    planet_count_occurrences = defaultdict(int)
+    """
+    Processes the combinations with index in [start, stop) until all are done or the budget runs out.
+    With `class_sizes` (planet name to class size), each combination of class representatives
+    counts for every raw combination it stands for in the occurrences.
+    Progress is written to `checkpoint` (see create_checkpoint), whose restored state the search starts from.
+    Returns the plan pool of the best combinations (see create_plan_pool), the planet count occurrences
+    and the number of combinations processed.
+    """
+    plan_pool, planet_count_occurrences = restore_search_state(checkpoint)
+    processed_count = 0
+    organic_candidate_systems = get_organic_candidate_systems(system_data, resources_by_rarity, groups)
+    coverage = get_resource_coverage(organic_candidate_systems)
 
-    total_combinations = len(all_combinations)
+    stop = count_combinations(candidate_lists) if stop is None else min(stop, count_combinations(candidate_lists))
+    total_combinations = max(stop - start, 0)
 
     # Function to generate a table with planet count distribution and a blank line
     def generate_distribution_table_with_spacing():
@@ -186,83 +621,721 @@ def find_best_combinations(
         # Initialize tqdm using tqdm.rich
         pbar = rich_tqdm(total=total_combinations, desc="Processing combinations", smoothing=0.1, mininterval=0.25, miniters=100)
 
-        for idx, combination in enumerate(all_combinations):
+        for combination in iterate_combinations(candidate_lists, start, stop):
             # Process the combination
             final_planets, planet_count, uncaptured_resources = process_combination(
                 combination,
                 initial_final_planets,
                 initial_processed_systems,
                 initial_captured_resources,
-                system_data,
+                organic_candidate_systems,
                 resources_by_rarity,
                 groups,
+                suffix_cache,
+                coverage,
             )
-
-            if planet_count < min_planet_count:
-                min_planet_count = planet_count
-                best_combinations = [{
-                    "combination": None, 
-                    "final_planets": final_planets,
-                    "planet_count": planet_count,
-                    "uncaptured_resources": uncaptured_resources,
-                }]
-            elif planet_count == min_planet_count:
-                best_combinations.append({
-                    "combination": None,  
-                    "final_planets": final_planets,
-                    "planet_count": planet_count,
-                    "uncaptured_resources": uncaptured_resources,
-                })
+            multiplicity = get_combination_multiplicity(combination, class_sizes)
+            add_plan(plan_pool, final_planets, planet_count, uncaptured_resources, multiplicity)
 
             # Update the count for this planet count
-            planet_count_occurrences[planet_count] += 1
-
-            # Update the minimal planet count if necessary
-            if planet_count < min_planet_count:
-                min_planet_count = planet_count
+            planet_count_occurrences[planet_count] += multiplicity
 
-            # Manually update tqdm's progress
-            if idx % 10 == 0:
-                pbar.update(10)  # Update by 100 steps at once
-                pbar.set_postfix({"Min planets": min_planet_count})
+            pbar.update(1)
+            pbar.set_postfix({"Min planets": plan_pool["min_planet_count"]}, refresh=False)
 
             # Refresh the live table display
             live.update(generate_distribution_table_with_spacing())
 
+            processed_count += 1
+            update_checkpoint(checkpoint, start + processed_count, plan_pool, planet_count_occurrences)
+            if spend_budget(budget):
+                break
+
         # Ensure tqdm progress is complete
         pbar.close()
 
-    return best_combinations, min_planet_count, dict(planet_count_occurrences)
+    update_checkpoint(checkpoint, start + processed_count, plan_pool, planet_count_occurrences, force=True)
+
+    return plan_pool, dict(planet_count_occurrences), processed_count
 
-def dedupe_combinations(best_combinations):
-    unique_combinations = set()
-    deduped_combinations = []
+# Per-process solver state, filled once by init_combination_worker
+_worker_state = {}
 
+
+def init_combination_worker(search_state, suffix_cache_size=SUFFIX_CACHE_SIZE):
+    """
+    Pool initializer: keeps the search state the parent built once, see find_best_combinations_parallel.
+    Worker output is discarded, it would only garble the parent's live display.
+    """
+    sys.stdout = open(os.devnull, "w")
+    _worker_state.update(search_state)
+    _worker_state["suffix_cache"] = create_suffix_cache(suffix_cache_size)
+
+
+def process_combination_range(index_range):
+    """
+    Worker task: processes the combinations with index in [start, stop).
+    Returns only the planet count histogram and the plan pool of the range. The pool keeps every plan
+    of the range, so the counts of the plans the parent keeps stay exact.
+    """
+    start, stop = index_range
+    state = _worker_state
+    hits, misses = state["suffix_cache"]["hits"], state["suffix_cache"]["misses"]
+    plan_pool = create_plan_pool(max_plans=stop - start)
+    planet_count_occurrences = defaultdict(int)
+
+    for combination in iterate_combinations(state["candidate_lists"], start, stop):
+        final_planets, planet_count, uncaptured_resources = process_combination(
+            combination,
+            state["initial_final_planets"],
+            state["initial_processed_systems"],
+            state["initial_captured_resources"],
+            state["system_data"],
+            state["resources_by_rarity"],
+            state["groups"],
+            state["suffix_cache"],
+            state["coverage"],
+        )
+        multiplicity = get_combination_multiplicity(combination, state["class_sizes"])
+        planet_count_occurrences[planet_count] += multiplicity
+        add_plan(plan_pool, final_planets, planet_count, uncaptured_resources, multiplicity)
+
+    return {
+        "processed_count": stop - start,
+        "plan_pool": plan_pool,
+        "planet_count_occurrences": dict(planet_count_occurrences),
+        "cache_hits": state["suffix_cache"]["hits"] - hits,
+        "cache_misses": state["suffix_cache"]["misses"] - misses,
+    }
+
+
+def find_best_combinations_parallel(
+    candidate_lists,
+    initial_final_planets,
+    initial_processed_systems,
+    initial_captured_resources,
+    system_data,
+    resources_by_rarity,
+    groups,
+    budget=None,
+    start=0,
+    stop=None,
+    workers=None,
+    chunk_size=1000,
+    class_sizes=None,
+    checkpoint=None,
+    suffix_cache=None,
+):
+    """
+    Splits the index range [start, stop) into chunks and processes them on a pool of worker processes.
+    The candidate lists, starting plan and organic candidates are built once here and sent to every
+    worker through the pool initializer (see init_combination_worker). The parent merges histograms and
+    plan pools in chunk order, so every combination before the last merged chunk is done when it checkpoints.
+    Workers keep their own suffix cache of `suffix_cache`'s size, their hits and misses are added to it.
+    Returns the same values as find_best_combinations.
+    """
+    workers = workers or cpu_count()
+    stop = count_combinations(candidate_lists) if stop is None else min(stop, count_combinations(candidate_lists))
+    chunks = [(chunk_start, min(chunk_start + chunk_size, stop)) for chunk_start in range(start, stop, chunk_size)]
+
+    plan_pool, planet_count_occurrences = restore_search_state(checkpoint)
+    processed_count = 0
+    organic_candidate_systems = get_organic_candidate_systems(system_data, resources_by_rarity, groups)
+    search_state = {
+        "system_data": organic_candidate_systems,
+        "coverage": get_resource_coverage(organic_candidate_systems),
+        "resources_by_rarity": resources_by_rarity,
+        "groups": groups,
+        "initial_final_planets": initial_final_planets,
+        "initial_processed_systems": initial_processed_systems,
+        "initial_captured_resources": initial_captured_resources,
+        "candidate_lists": candidate_lists,
+        "class_sizes": class_sizes,
+    }
+
+    def generate_distribution_table_with_spacing():
+        table = Table(title="Planet Count Distribution", box=box.MINIMAL_HEAVY_HEAD)
+        table.add_column("Planet Count", justify="right")
+        table.add_column("Occurrences", justify="right")
+        for count, occurrences in sorted(planet_count_occurrences.items()):
+            table.add_row(str(count), str(occurrences))
+        return Group(table, Text(""))
+
+    console = Console()
+    with Live(generate_distribution_table_with_spacing(), refresh_per_second=1, console=console) as live:
+        pbar = rich_tqdm(total=max(stop - start, 0), desc=f"Processing combinations ({workers} workers)", smoothing=0.1)
+        suffix_cache_size = suffix_cache["max_size"] if suffix_cache is not None else 0
+        with Pool(
+            workers, initializer=init_combination_worker, initargs=(search_state, suffix_cache_size)
+        ) as pool:
+            for chunk_result in pool.imap(process_combination_range, chunks):
+                for count, occurrences in chunk_result["planet_count_occurrences"].items():
+                    planet_count_occurrences[count] += occurrences
+
+                merge_plan_pools(plan_pool, chunk_result["plan_pool"])
+
+                processed_count += chunk_result["processed_count"]
+                if suffix_cache is not None:
+                    suffix_cache["hits"] += chunk_result["cache_hits"]
+                    suffix_cache["misses"] += chunk_result["cache_misses"]
+                pbar.update(chunk_result["processed_count"])
+                pbar.set_postfix({"Min planets": plan_pool["min_planet_count"]})
+                live.update(generate_distribution_table_with_spacing())
+
+                update_checkpoint(checkpoint, start + processed_count, plan_pool, planet_count_occurrences)
+                if spend_budget(budget, chunk_result["processed_count"]):
+                    # Leaving the pool block terminates the remaining chunks
+                    break
+        pbar.close()
+
+    update_checkpoint(checkpoint, start + processed_count, plan_pool, planet_count_occurrences, force=True)
+
+    return plan_pool, dict(planet_count_occurrences), processed_count
+
+
+def get_candidate_signature(planet):
+    """
+    Returns everything the pipeline reads from a candidate planet, without its name or system.
+    """
+    return json.dumps(
+        [
+            sorted(planet["resources"].get("inorganic", [])),
+            sorted(planet["resources"].get("organic", [])),
+            sorted(planet["flora"]["domesticable"]),
+            sorted(planet["fauna"]["domesticable"]),
+            planet.get("outpost_candidacy", {}),
+        ],
+        sort_keys=True,
+    )
+
+
+def get_candidate_classes(
+    group_name,
+    candidates,
+    initial_highlander_planets,
+    initial_captured_organics,
+    resources_by_rarity,
+    groups,
+):
+    """
+    Splits a group's candidates into classes that reach the same planet count, so only one per class is processed.
+    - Losers: a candidate that loses its chain to an initial planet (or whose chain is locked by a unique resource
+      planet) is dropped by the Highlander rules, and only matters through the organics it left in
+      captured_resources. Losers leaving the same organics give the same plan.
+    - Twins: candidates that keep their chain and look the same to the pipeline (see get_candidate_signature),
+      but have no organics capture_remaining_organics could pick them for, give the same plan with the
+      twin's name swapped in. Twins that can capture organics are kept apart, as their place in the
+      system list could change the greedy choice.
+    Candidates that span several groups or hold unique resources get a class of their own.
+    Returns a list of dictionaries with the representative planet, its class members, whether it wins its chain,
+    the organics it leaves behind when it loses, and the number of candidates in the class.
+    """
+    _, required_organics = get_required_resources(resources_by_rarity, groups)
+    locked_chains = set()
+    chain_holders = {}
+    for planet in initial_highlander_planets:
+        full_resource_chain = tuple(planet.get("outpost_candidacy", {}).get("full_resource_chain", []))
+        if not full_resource_chain:
+            continue
+        if planet["outpost_candidacy"].get("unique"):
+            locked_chains.add(full_resource_chain)
+        chain_holders[full_resource_chain] = planet
+
+    all_organics = [res for res in resources_by_rarity["organic"]]
+    scores = score_by_desired(
+        list(chain_holders.values()) + candidates,
+        resources_by_rarity,
+        groups,
+        desired_inorganics=[],
+        desired_organics=all_organics,
+    )
+
+    classes = {}
+    for planet in candidates:
+        candidacy = planet.get("outpost_candidacy", {})
+        full_resource_chain = tuple(candidacy.get("full_resource_chain", []))
+        holder = chain_holders.get(full_resource_chain)
+        loses_chain = full_resource_chain == (group_name,) and not candidacy.get("unique") and (
+            full_resource_chain in locked_chains
+            or (holder is not None and scores[planet["name"]] <= scores[holder["name"]])
+        )
+        leftover_organics = frozenset()
+        if loses_chain:
+            leftover_organics = frozenset(set(planet["resources"].get("organic", [])) - initial_captured_organics)
+            class_key = ("loses", leftover_organics)
+        elif (
+            full_resource_chain == (group_name,)
+            and not candidacy.get("unique")
+            and not capture_organic_resources(planet, groups, required_organics)
+        ):
+            class_key = ("twins", get_candidate_signature(planet))
+        else:
+            class_key = ("wins", planet["name"])
+
+        if class_key in classes:
+            classes[class_key]["members"].append(planet)
+            classes[class_key]["multiplicity"] += 1
+        else:
+            classes[class_key] = {
+                "planet": planet,
+                "members": [planet],
+                "wins": not loses_chain,
+                "leftover_organics": leftover_organics,
+                "multiplicity": 1,
+            }
+
+    return list(classes.values())
+
+
+def reduce_full_chain_candidates(
+    fullchain_by_group,
+    initial_final_planets,
+    initial_captured_resources,
+    resources_by_rarity,
+    groups,
+):
+    """
+    Collapses each group's candidates into classes (see get_candidate_classes) before the search.
+    Every class reaches the same planet count, so the minimal count is preserved and
+    expand_best_combinations recovers the equivalent plans afterwards.
+    Returns a dictionary mapping group names to their classes.
+    """
+    initial_highlander_planets = apply_highlander_rules(
+        initial_final_planets[:], deepcopy(initial_captured_resources), resources_by_rarity, groups
+    )
+    classes_by_group = {
+        group_name: get_candidate_classes(
+            group_name,
+            candidates,
+            initial_highlander_planets,
+            set(initial_captured_resources["organic"]),
+            resources_by_rarity,
+            groups,
+        )
+        for group_name, candidates in fullchain_by_group.items()
+    }
+
+    raw_count = math.prod(len(candidates) for candidates in fullchain_by_group.values())
+    reduced_count = math.prod(len(classes) for classes in classes_by_group.values())
+    print(f"Candidate classes per group: {({group_name: len(classes) for group_name, classes in classes_by_group.items()})}")
+    print(f"Combinations reduced from {raw_count} to {reduced_count}")
+    return classes_by_group
+
+
+def expand_best_combinations(best_combinations, classes_by_group):
+    """
+    Expands plans holding a twin class representative into one plan per twin.
+    The twin replaces the representative, keeping its outpost candidacy, and partner names are updated.
+    A plan's `combination_count` is split evenly over its variants, as every twin stands for as many combinations.
+    Returns the expanded list of combinations.
+    """
+    twins = {
+        candidate_class["planet"]["name"]: candidate_class["members"]
+        for classes in classes_by_group.values()
+        for candidate_class in classes
+        if candidate_class["wins"] and len(candidate_class["members"]) > 1
+    }
+
+    expanded_combinations = []
     for combination in best_combinations:
-        planets = combination['final_planets']
-
-        # Create a tuple with sorted planet names and optional attributes for comparison
-        planet_names = tuple(sorted([planet['name'] for planet in planets]))
-        optional_attributes = tuple(
-            tuple(sorted(planet.get('outpost_candidacy', {}).get('resource_group_partial', []))) +
-            tuple(sorted(planet.get('outpost_candidacy', {}).get('partner_planets', [])))
-            for planet in planets
+        variants = [combination]
+        for planet in combination["final_planets"]:
+            if planet["name"] not in twins:
+                continue
+            representative_name = planet["name"]
+            expanded_variants = []
+            for variant in variants:
+                for member in twins[representative_name]:
+                    if member["name"] == representative_name:
+                        expanded_variants.append(variant)
+                        continue
+                    final_planets = []
+                    for variant_planet in variant["final_planets"]:
+                        if variant_planet["name"] == representative_name:
+                            twin = deepcopy(member)
+                            twin["outpost_candidacy"] = deepcopy(variant_planet.get("outpost_candidacy", {}))
+                            twin["system_name"] = member.get("system_name", variant_planet.get("system_name"))
+                            final_planets.append(twin)
+                            continue
+                        partners = variant_planet.get("outpost_candidacy", {}).get("partner_planets", [])
+                        if representative_name in partners:
+                            variant_planet = deepcopy(variant_planet)
+                            variant_planet["outpost_candidacy"]["partner_planets"] = [
+                                member["name"] if name == representative_name else name for name in partners
+                            ]
+                        final_planets.append(variant_planet)
+                    expanded_variants.append({**variant, "final_planets": final_planets})
+            variants = expanded_variants
+        if "combination_count" in combination:
+            variant_count = combination["combination_count"] // len(variants)
+            variants = [{**variant, "combination_count": variant_count} for variant in variants]
+        expanded_combinations.extend(variants)
+    return expanded_combinations
+
+
+def branch_and_bound_combinations(
+    fullchain_by_group,
+    classes_by_group,
+    initial_final_planets,
+    initial_processed_systems,
+    initial_captured_resources,
+    system_data,
+    resources_by_rarity,
+    groups,
+    budget=None,
+    checkpoint=None,
+    suffix_cache=None,
+):
+    """
+    Assigns one full chain planet per group, group by group, instead of processing every product combination.
+    Branches run over the candidate classes from reduce_full_chain_candidates. Leaves that reach
+    process_combination with the same planets and captured organics share one result: `suffix_cache`
+    memoizes leaves here, with their planet count and plan key, instead of the steps after the Highlander rules.
+    A subtree is pruned when its lower bound is above the best planet count so far, so ties are kept:
+    planets without a full chain that the Highlander rules always keep, plus the organics they lack divided
+    by the most organics a single planet holds. Planets without a full chain are never eliminated, so the
+    bound holds for every plan that captures all organics. Full chain planets, picked or still to pick,
+    are not counted and neither are their organics: eliminate_redundant_planets drops any of them whose
+    group other planets cover partially, so no pick is certain to stay in the plan. The bound is therefore
+    the same for every subtree, and enumeration over the classes is just as fast on more workers.
+    Leaves are numbered in product order over the classes, so a checkpoint can skip every subtree before it.
+    Returns the same values as find_best_combinations, with occurrences counted in raw combinations.
+    """
+    _, required_organics = get_required_resources(resources_by_rarity, groups)
+    organic_candidate_systems = get_organic_candidate_systems(system_data, resources_by_rarity, groups)
+    coverage = get_resource_coverage(organic_candidate_systems)
+    initial_highlander_planets = apply_highlander_rules(
+        initial_final_planets[:], deepcopy(initial_captured_resources), resources_by_rarity, groups
+    )
+
+    group_names = list(fullchain_by_group.keys())
+    classes_by_group = [classes_by_group[group_name] for group_name in group_names]
+
+    # Planets kept no matter which candidates are picked, unless a candidate competes for their unique resource
+    candidate_unique_resources = {
+        res
+        for candidates in fullchain_by_group.values()
+        for planet in candidates
+        for res in planet.get("outpost_candidacy", {}).get("unique", [])
+    }
+    kept_planets = [
+        planet
+        for planet in initial_highlander_planets
+        if not planet["outpost_candidacy"].get("full_resource_chain")
+        and not set(planet["outpost_candidacy"].get("unique", [])) & candidate_unique_resources
+    ]
+    kept_organics = set()
+    for planet in kept_planets:
+        kept_organics.update(planet["resources"].get("organic", []))
+    max_organics_per_planet = max(
+        len(set(planet["resources"].get("organic", [])) & required_organics)
+        for system in system_data
+        for planet in system["planets"]
+    )
+    missing_organics = required_organics - kept_organics
+    if not missing_organics:
+        plan_lower_bound = len(kept_planets)
+    elif max_organics_per_planet == 0:
+        plan_lower_bound = float("inf")
+    else:
+        plan_lower_bound = len(kept_planets) + math.ceil(len(missing_organics) / max_organics_per_planet)
+
+    leaf_count = math.prod(len(classes) for classes in classes_by_group)
+    subtree_leaves = [math.prod(len(classes) for classes in classes_by_group[depth:]) for depth in range(len(group_names) + 1)]
+
+    plan_pool, planet_count_occurrences = restore_search_state(checkpoint)
+    resume_index = (checkpoint["next_index"] or 0) if checkpoint is not None else 0
+    state = {
+        "processed_count": 0,
+        "pruned_count": 0,
+        "next_index": resume_index,
+        "stopped": False,
+    }
+    leaf_cache = suffix_cache if suffix_cache is not None and suffix_cache["max_size"] > 0 else None
+
+    pbar = rich_tqdm(total=leaf_count, desc="Branch and bound", smoothing=0.1, mininterval=0.25)
+    pbar.update(resume_index)
+
+    def save_progress(next_index):
+        state["next_index"] = next_index
+        update_checkpoint(checkpoint, next_index, plan_pool, planet_count_occurrences)
+
+    def visit(depth, index, combination, multiplicity, winners, winner_organics, leftover_organics):
+        if state["stopped"]:
+            return
+        # Subtree done before the checkpoint
+        if index + subtree_leaves[depth] <= resume_index:
+            return
+        if depth == len(group_names):
+            leaf_key = (tuple(winners), frozenset(leftover_organics - winner_organics))
+            cached_leaf = lookup_suffix_cache(leaf_cache, leaf_key) if leaf_cache is not None else None
+            if cached_leaf is not None:
+                planet_count, plan_key = cached_leaf
+                add_repeated_plan(plan_pool, plan_key, planet_count, multiplicity)
+            else:
+                final_planets, planet_count, uncaptured_resources = process_combination(
+                    combination,
+                    initial_final_planets,
+                    initial_processed_systems,
+                    initial_captured_resources,
+                    organic_candidate_systems,
+                    resources_by_rarity,
+                    groups,
+                    coverage=coverage,
+                )
+                plan_key = add_plan(plan_pool, final_planets, planet_count, uncaptured_resources, multiplicity)
+                # The pool holds the plan itself, a repeated leaf only needs its key
+                if leaf_cache is not None:
+                    store_suffix_cache(leaf_cache, leaf_key, (planet_count, plan_key))
+                state["processed_count"] += 1
+                if spend_budget(budget):
+                    state["stopped"] = True
+            planet_count_occurrences[planet_count] += multiplicity
+            pbar.update(1)
+            pbar.set_postfix({"Min planets": plan_pool["min_planet_count"]})
+            save_progress(index + 1)
+            return
+
+        if plan_lower_bound > plan_pool["min_planet_count"]:
+            skipped_leaves = index + subtree_leaves[depth] - max(index, resume_index)
+            state["pruned_count"] += skipped_leaves
+            pbar.update(skipped_leaves)
+            save_progress(index + subtree_leaves[depth])
+            return
+
+        for digit, candidate_class in enumerate(classes_by_group[depth]):
+            planet = candidate_class["planet"]
+            if candidate_class["wins"]:
+                next_winners = winners + [planet["name"]]
+                next_winner_organics = winner_organics | set(planet["resources"].get("organic", []))
+            else:
+                next_winners = winners + [None]
+                next_winner_organics = winner_organics
+            visit(
+                depth + 1,
+                index + digit * subtree_leaves[depth + 1],
+                combination + [planet],
+                multiplicity * candidate_class["multiplicity"],
+                next_winners,
+                next_winner_organics,
+                leftover_organics | candidate_class["leftover_organics"],
+            )
+
+    visit(0, 0, [], 1, [], set(), frozenset())
+    pbar.close()
+    update_checkpoint(checkpoint, state["next_index"], plan_pool, planet_count_occurrences, force=True)
+
+    print(f"Processed {state['processed_count']} of {leaf_count} leaves, pruned {state['pruned_count']}")
+    return plan_pool, dict(planet_count_occurrences), state["processed_count"]
+
+
+def get_candidate_weights(candidate_lists, class_sizes=None):
+    """Returns, per group, how many raw candidates each entry stands for."""
+    return [
+        [class_sizes[planet["name"]] if class_sizes else 1 for planet in candidates] for candidates in candidate_lists
+    ]
+
+
+def estimate_planet_count_distribution(stratum_occurrences, stratum_weights):
+    """
+    Estimates the share of raw combinations per planet count from sampled planet counts.
+    `stratum_occurrences` holds a planet count histogram per stratum, `stratum_weights` the share
+    of raw combinations in it (a single stratum of weight 1 for uniform sampling).
+    Returns a dictionary mapping planet counts to (share, confidence interval half width),
+    or None while a stratum has no samples.
+    """
+    stratum_samples = [sum(occurrences.values()) for occurrences in stratum_occurrences]
+    if not all(stratum_samples):
+        return None
+
+    planet_counts = sorted({count for occurrences in stratum_occurrences for count in occurrences})
+    estimate = {}
+    for count in planet_counts:
+        share = 0.0
+        variance = 0.0
+        for occurrences, weight, samples in zip(stratum_occurrences, stratum_weights, stratum_samples):
+            stratum_share = occurrences.get(count, 0) / samples
+            share += weight * stratum_share
+            variance += weight**2 * stratum_share * (1 - stratum_share) / samples
+        estimate[count] = (share, SAMPLE_Z_SCORE * math.sqrt(variance))
+    return estimate
+
+
+def print_sampled_distribution(estimate, total_combinations, sample_count):
+    table = Table(title=f"Estimated Planet Count Distribution ({sample_count} samples)", box=box.MINIMAL_HEAVY_HEAD)
+    table.add_column("Planet Count", justify="right")
+    table.add_column("Share", justify="right")
+    table.add_column("95% CI", justify="right")
+    table.add_column("Est. Occurrences", justify="right")
+    for count, (share, half_width) in estimate.items():
+        table.add_row(
+            str(count),
+            f"{share:.2%}",
+            f"{max(share - half_width, 0):.2%} - {min(share + half_width, 1):.2%}",
+            f"{round(share * total_combinations)}",
         )
-        
-        combination_key = (planet_names, optional_attributes)
+    Console().print(table)
 
-        # Only add to deduped_combinations if unique
-        if combination_key not in unique_combinations:
-            unique_combinations.add(combination_key)
-            deduped_combinations.append(combination)
 
-    return deduped_combinations
+def sample_best_combinations(
+    candidate_lists,
+    initial_final_planets,
+    initial_processed_systems,
+    initial_captured_resources,
+    system_data,
+    resources_by_rarity,
+    groups,
+    budget=None,
+    class_sizes=None,
+    samples=10000,
+    sampling="uniform",
+    target_width=None,
+    seed=None,
+    suffix_cache=None,
+    max_plans=MAX_RETAINED_PLANS,
+):
+    """
+    Processes random combinations instead of all of them, to estimate the planet count distribution.
+    Every group's candidate is drawn in proportion to the raw candidates it stands for (its class size),
+    so each sample is a uniformly drawn raw combination. "stratified" sampling splits the samples over
+    the candidates of the group with the most of them, in proportion to their share of raw combinations.
+    Stops after `samples` samples, when the budget runs out, or once every planet count's confidence
+    interval is at most `target_width` wide.
+    Returns the plan pool of the best plans seen (counted in samples), the sampled planet count
+    occurrences and the number of samples.
+    """
+    rng = random.Random(seed)
+    organic_candidate_systems = get_organic_candidate_systems(system_data, resources_by_rarity, groups)
+    coverage = get_resource_coverage(organic_candidate_systems)
+    candidate_weights = get_candidate_weights(candidate_lists, class_sizes)
+    total_combinations = math.prod(sum(weights) for weights in candidate_weights)
+
+    strata_group = None
+    stratum_weights = [1.0]
+    if sampling == "stratified":
+        strata_group = max(range(len(candidate_lists)), key=lambda group_index: len(candidate_lists[group_index]))
+        group_weight = sum(candidate_weights[strata_group])
+        stratum_weights = [weight / group_weight for weight in candidate_weights[strata_group]]
+    stratum_occurrences = [defaultdict(int) for _ in stratum_weights]
+
+    plan_pool = create_plan_pool(max_plans)
+    planet_count_occurrences = defaultdict(int)
+    sample_count = 0
+
+    pbar = rich_tqdm(total=samples, desc=f"Sampling combinations ({sampling})", smoothing=0.1, mininterval=0.25)
+    while sample_count < samples:
+        stratum = 0
+        if strata_group is not None:
+            # Proportional allocation: the stratum furthest below its share gets the next sample
+            stratum = max(
+                range(len(stratum_weights)),
+                key=lambda h: stratum_weights[h] * (sample_count + 1) - sum(stratum_occurrences[h].values()),
+            )
+        combination = [
+            rng.choices(candidates, weights)[0] for candidates, weights in zip(candidate_lists, candidate_weights)
+        ]
+        if strata_group is not None:
+            combination[strata_group] = candidate_lists[strata_group][stratum]
+
+        final_planets, planet_count, uncaptured_resources = process_combination(
+            combination,
+            initial_final_planets,
+            initial_processed_systems,
+            initial_captured_resources,
+            organic_candidate_systems,
+            resources_by_rarity,
+            groups,
+            suffix_cache,
+            coverage,
+        )
+        add_plan(plan_pool, final_planets, planet_count, uncaptured_resources)
+        planet_count_occurrences[planet_count] += 1
+        stratum_occurrences[stratum][planet_count] += 1
+        sample_count += 1
+        pbar.update(1)
+        pbar.set_postfix({"Min planets": plan_pool["min_planet_count"]})
+
+        if spend_budget(budget):
+            break
+        check_due = sample_count >= MIN_SAMPLES_BEFORE_STOP and sample_count % SAMPLE_CHECK_INTERVAL == 0
+        if target_width is not None and check_due:
+            estimate = estimate_planet_count_distribution(stratum_occurrences, stratum_weights)
+            if estimate and all(2 * half_width <= target_width for _, half_width in estimate.values()):
+                print(f"Confidence intervals reached the target width after {sample_count} samples.")
+                break
+    pbar.close()
 
-def find_best_systems(system_data, unique_resources, resources_by_rarity, groups):
+    estimate = estimate_planet_count_distribution(stratum_occurrences, stratum_weights)
+    if estimate is not None:
+        print_sampled_distribution(estimate, total_combinations, sample_count)
+    return plan_pool, dict(planet_count_occurrences), sample_count
+
+
+def verify_best_combinations(best_combinations, resources_by_rarity, groups):
+    """
+    Verifies copies of each best combination's planets, so the shared planet data is left alone.
+    Returns the combinations that pass verify_final_planets, with their verified planets,
+    and the number of combinations that failed.
+    """
+    verified_combinations = []
+    failed_count = 0
+    for combination in best_combinations:
+        final_planets = deepcopy(combination["final_planets"])
+        try:
+            final_planets = verify_final_planets(final_planets, resources_by_rarity, groups)
+        except ValueError:
+            failed_count += 1
+            continue
+        verified_combinations.append({**combination, "final_planets": final_planets})
+    return verified_combinations, failed_count
+
+
+def find_best_systems(
+    system_data,
+    unique_resources,
+    resources_by_rarity,
+    groups,
+    time_limit=None,
+    max_combinations=None,
+    search="enumerate",
+    start=0,
+    stop=None,
+    workers=1,
+    reduce_candidates=True,
+    checkpoint_path=EXHAUSTIVE_CHECKPOINT_PATH,
+    resume=False,
+    suffix_cache_size=SUFFIX_CACHE_SIZE,
+    max_plans=MAX_RETAINED_PLANS,
+    samples=10000,
+    sampling="uniform",
+    target_width=None,
+    seed=None,
+):
     """
     Identifies the best systems for outpost setup based on unique resources and full resource chains.
+    `search` is 'branch-and-bound' or 'enumerate' (every product combination); both find the same minimal plans.
+    Unless `reduce_candidates` is off, enumeration runs over candidate classes (see reduce_full_chain_candidates),
+    branch and bound always does.
+    Enumeration can be limited to the combinations with index in [start, stop), and spread over
+    `workers` processes (None for one per CPU). Other searches run in one process and raise a ValueError
+    for any other `workers`.
+    With a `time_limit` (seconds) or `max_combinations` budget, the search stops early and reports
+    the best verified plans found so far together with the optimality gap to a lower bound.
+    LOWER_BOUND_TIME_SHARE of the time limit is set aside for the bound.
+    Progress is checkpointed to `checkpoint_path` every few seconds, `resume` continues from there.
+    The checkpoint is removed once the search completes.
+    Results after the Highlander rules, or whole leaves under branch and bound, are memoized in an LRU of
+    `suffix_cache_size` entries per process.
+    Up to `max_plans` distinct minimal plans are kept, see create_plan_pool.
+    `search` 'sample' only processes random combinations and estimates the planet count distribution,
+    see sample_best_combinations for `samples`, `sampling`, `target_width` and `seed`. It is not checkpointed.
     Returns the final list of planets for outpost placement.
     """
+    if workers != 1 and search != "enumerate":
+        raise ValueError(f"Workers only apply to the enumerate search, not {search}.")
+    budget = create_budget(time_limit, max_combinations)
+    lower_bound_time = reserve_budget_time(budget, LOWER_BOUND_TIME_SHARE)
+
     # Step 1: Capture unique resource systems
     initial_final_planets, initial_processed_systems, initial_captured_resources = capture_unique_resource_systems(
         system_data, unique_resources, groups
@@ -276,37 +1349,162 @@ def find_best_systems(system_data, unique_resources, resources_by_rarity, groups
         initial_final_planets,
     )
 
-    # Generate all possible combinations
-    all_combinations = generate_full_chain_combinations(fullchain_by_group)
-    print(f"Total combinations to process: {len(all_combinations)}")
+    classes_by_group = None
+    if search == "branch-and-bound" or reduce_candidates:
+        classes_by_group = reduce_full_chain_candidates(
+            fullchain_by_group, initial_final_planets, initial_captured_resources, resources_by_rarity, groups
+        )
 
-    # For each combination, process and find the best ones
-    best_combinations, min_planet_count, planet_count_occurrences = find_best_combinations(
-        all_combinations,
-        initial_final_planets,
-        initial_processed_systems,
-        initial_captured_resources,
-        system_data,
-        resources_by_rarity,
-        groups,
+    # Combinations are numbered over these lists, a checkpoint only applies to the same lists
+    candidate_lists, class_sizes = get_candidate_lists(fullchain_by_group), None
+    if classes_by_group is not None:
+        candidate_lists, class_sizes = get_class_candidate_lists(classes_by_group)
+    run_key = hash_data(
+        CHECKPOINT_VERSION,
+        search,
+        stop,
+        [[planet["name"] for planet in candidates] for candidates in candidate_lists],
+        class_sizes,
     )
+    checkpoint = None
+    if search != "sample":
+        checkpoint = create_checkpoint(checkpoint_path, run_key, resume, max_plans=max_plans)
+        if checkpoint["next_index"] is not None:
+            start = max(start, checkpoint["next_index"])
+    suffix_cache = create_suffix_cache(suffix_cache_size)
 
-    print("... Deduping...")
-    best_combinations = dedupe_combinations(best_combinations)
+    if search == "sample":
+        plan_pool, planet_count_occurrences, processed_count = sample_best_combinations(
+            candidate_lists,
+            initial_final_planets,
+            initial_processed_systems,
+            initial_captured_resources,
+            system_data,
+            resources_by_rarity,
+            groups,
+            budget,
+            class_sizes,
+            samples,
+            sampling,
+            target_width,
+            seed,
+            suffix_cache,
+            max_plans,
+        )
+    elif search == "branch-and-bound":
+        plan_pool, planet_count_occurrences, processed_count = branch_and_bound_combinations(
+            fullchain_by_group,
+            classes_by_group,
+            initial_final_planets,
+            initial_processed_systems,
+            initial_captured_resources,
+            system_data,
+            resources_by_rarity,
+            groups,
+            budget,
+            checkpoint,
+            suffix_cache,
+        )
+    else:
+        # Combinations are decoded from their index on the fly
+        total_combinations = count_combinations(candidate_lists)
+        stop = total_combinations if stop is None else min(stop, total_combinations)
+        print(f"Total combinations: {total_combinations}, processing {start} to {stop}")
 
-    print(f"\nMinimal total planets: {min_planet_count}")
-    print(f"Number of combinations with minimal planets: {len(best_combinations)}")
+        # For each combination, process and find the best ones
+        if workers == 1:
+            plan_pool, planet_count_occurrences, processed_count = find_best_combinations(
+                candidate_lists,
+                initial_final_planets,
+                initial_processed_systems,
+                initial_captured_resources,
+                system_data,
+                resources_by_rarity,
+                groups,
+                budget,
+                start,
+                stop,
+                class_sizes,
+                checkpoint,
+                suffix_cache,
+            )
+        else:
+            plan_pool, planet_count_occurrences, processed_count = (
+                find_best_combinations_parallel(
+                    candidate_lists,
+                    initial_final_planets,
+                    initial_processed_systems,
+                    initial_captured_resources,
+                    system_data,
+                    resources_by_rarity,
+                    groups,
+                    budget,
+                    start,
+                    stop,
+                    workers,
+                    class_sizes=class_sizes,
+                    checkpoint=checkpoint,
+                    suffix_cache=suffix_cache,
+                )
+            )
+    report_suffix_cache(suffix_cache)
+    if budget_exhausted(budget):
+        print(f"Budget exhausted after {processed_count} processed combinations.")
+        if checkpoint is not None:
+            print(f"Progress saved to {checkpoint_path}, continue with --resume.")
+    elif checkpoint is not None:
+        for path in (checkpoint_path, checkpoint["plans_path"]):
+            if os.path.exists(path):
+                os.remove(path)
+
+    # Plans found by sampling are counted in samples, not combinations
+    count_unit = "samples" if search == "sample" else "combinations"
+    best_combinations = get_pool_combinations(plan_pool, system_data)
+    print(
+        f"Distinct minimal plans: {len(best_combinations)}, reached by "
+        f"{sum(combination['combination_count'] for combination in best_combinations)} {count_unit}"
+    )
+    if plan_pool["dropped_count"]:
+        print(
+            f"{plan_pool['dropped_count']} further minimal {count_unit} reached plans that were not kept, "
+            f"raise --max-plans to keep them."
+        )
+
+    print("... Verifying...")
+    best_combinations, failed_count = verify_best_combinations(best_combinations, resources_by_rarity, groups)
+    if failed_count:
+        print(f"{failed_count} of the minimal plans failed verification and were dropped.")
+
+    if classes_by_group is not None:
+        print("... Expanding candidate classes...")
+        best_combinations = expand_best_combinations(best_combinations, classes_by_group)
+
+    # Only plans that verified count towards the result
+    min_planet_count = min((len(result["final_planets"]) for result in best_combinations), default=None)
+    if min_planet_count is None:
+        print("\nNo minimal plan passed verification.")
+    else:
+        print(f"\nMinimal total planets: {min_planet_count}")
+    print(f"Number of verified combinations with minimal planets: {len(best_combinations)}")
+
+    if min_planet_count is not None:
+        # The reserved time, plus whatever the search left
+        if lower_bound_time is not None:
+            lower_bound_time += get_remaining_time(budget)
+        lower_bound = compute_planet_lower_bound(system_data, resources_by_rarity, groups, lower_bound_time)
+        print_optimality_gap(min_planet_count, lower_bound)
 
     print("Planet Count Occurrences: ")
     pprint(planet_count_occurrences, width=80)
 
-    if min_planet_count < 23 and len(best_combinations) <= 100:
+    if min_planet_count is not None and min_planet_count < 23 and len(best_combinations) <= 100:
         # For each best combination, print the planet names and detailed results
         for idx, result in enumerate(best_combinations, 1):
             print(f"\nBest Combination {idx}:")
             final_planets = result["final_planets"]
             planet_names = [planet["name"] for planet in final_planets]
             print(f"Planets ({len(planet_names)}): {', '.join(planet_names)}")
+            print(f"Reached by {result['combination_count']} {count_unit}")
 
             # Get uncaptured_resources from result
             uncaptured_resources = result["uncaptured_resources"]
@@ -314,20 +1512,115 @@ def find_best_systems(system_data, unique_resources, resources_by_rarity, groups
             # Print detailed results for each combination
             print_final_results(final_planets, uncaptured_resources)
 
-    if min_planet_count < 24:
+    if min_planet_count is not None and min_planet_count < 24:
+        os.makedirs("best_combinations", exist_ok=True)
         for idx, result in enumerate(best_combinations, 1):
             filename = "best_combinations/" + str(idx) + ".json"
-            save_system_data(filename, final_planets)
+            save_system_data(filename, result["final_planets"])
 
     return best_combinations
 
 
-def find_outposts_with_exhaustive_fullchain(): 
+def find_outposts_with_exhaustive_fullchain(
+    time_limit=None,
+    max_combinations=None,
+    search="enumerate",
+    start=0,
+    stop=None,
+    workers=1,
+    reduce_candidates=True,
+    resume=False,
+    suffix_cache_size=SUFFIX_CACHE_SIZE,
+    max_plans=MAX_RETAINED_PLANS,
+    samples=10000,
+    sampling="uniform",
+    target_width=None,
+    seed=None,
+):
     all_systems, rarity, unique, groups = load_all_data()
 
     find_fullchain_planets(all_systems, groups["inorganic"])
     find_unique_resources(all_systems, unique)
-    find_best_systems(all_systems, unique, rarity, groups)
+    find_best_systems(
+        all_systems,
+        unique,
+        rarity,
+        groups,
+        time_limit,
+        max_combinations,
+        search,
+        start,
+        stop,
+        workers,
+        reduce_candidates,
+        resume=resume,
+        suffix_cache_size=suffix_cache_size,
+        max_plans=max_plans,
+        samples=samples,
+        sampling=sampling,
+        target_width=target_width,
+        seed=seed,
+    )
 
 if __name__ == '__main__':
-    find_outposts_with_exhaustive_fullchain()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Exhaustively search full chain combinations.")
+    parser.add_argument("--time-limit", type=float, help="Wall-clock budget in seconds.")
+    parser.add_argument("--max-combinations", type=int, help="Budget in processed combinations.")
+    parser.add_argument(
+        "--search",
+        choices=["branch-and-bound", "enumerate", "sample"],
+        default="enumerate",
+        help="Prune and collapse equivalent combinations, process every one, or process random ones.",
+    )
+    parser.add_argument("--start", type=int, default=0, help="First combination index to enumerate.")
+    parser.add_argument("--stop", type=int, help="Enumerate up to, not including, this combination index.")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes for enumeration, 0 for one per CPU."
+    )
+    parser.add_argument(
+        "--no-reduction",
+        action="store_true",
+        help="Enumerate raw candidates instead of equivalent candidate classes.",
+    )
+    parser.add_argument("--resume", action="store_true", help="Continue from the last checkpoint of the same search.")
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=SUFFIX_CACHE_SIZE,
+        help="Results after the Highlander rules, or leaves under branch and bound, kept per process. 0 turns it off.",
+    )
+    parser.add_argument(
+        "--max-plans", type=int, default=MAX_RETAINED_PLANS, help="Distinct minimal plans kept in memory."
+    )
+    parser.add_argument("--samples", type=int, default=10000, help="Combinations drawn by --search sample.")
+    parser.add_argument(
+        "--sampling",
+        choices=["uniform", "stratified"],
+        default="uniform",
+        help="Draw combinations uniformly, or stratified over the candidates of the largest group.",
+    )
+    parser.add_argument(
+        "--target-width",
+        type=float,
+        help="Stop sampling once every planet count's 95%% confidence interval is at most this wide (e.g. 0.02).",
+    )
+    parser.add_argument("--seed", type=int, help="Random seed for --search sample.")
+    args = parser.parse_args()
+    if args.workers != 1 and args.search != "enumerate":
+        parser.error("--workers only applies to --search enumerate")
+    find_outposts_with_exhaustive_fullchain(
+        args.time_limit,
+        args.max_combinations,
+        args.search,
+        args.start,
+        args.stop,
+        args.workers or None,
+        not args.no_reduction,
+        args.resume,
+        args.cache_size,
+        args.max_plans,
+        args.samples,
+        args.sampling,
+        args.target_width,
+        args.seed,
+    )
\ No newline at end of file
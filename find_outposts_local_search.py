@@ -0,0 +1,333 @@
+import math
+import random
+import argparse
+from copy import deepcopy
+
+# Local Imports
+from config import INORGANIC_GROUPS_PATH
+from common import load_all_data, load_resource_groups, create_budget, budget_exhausted, spend_budget
+from find_outposts_fullchain import (
+    find_fullchain_planets,
+    find_unique_resources,
+    get_required_resources,
+    get_assignment_costs,
+    find_assignment_bottleneck,
+    capture_unique_resource_systems,
+    capture_full_chain_systems,
+    apply_highlander_rules,
+    reduce_planet_count,
+    print_final_results,
+)
+from find_outposts_pareto import build_coverage_model, build_verified_plan
+from resource_coverage import get_resource_coverage
+
+# A resource no selected planet holds costs more than any planet it could save
+UNCOVERED_PENALTY = 2.0
+# Annealing schedule of every restart: temperature falls geometrically from start to end
+START_TEMPERATURE = 1.0
+END_TEMPERATURE = 0.02
+ITERATIONS_PER_RESTART = 20000
+# Planets a restart drops from the best plan before repairing it
+RESTART_KICK = 3
+
+
+def build_local_search_model(model, resources_by_rarity, groups):
+    """
+    Adds what moves need to the coverage model (see build_coverage_model): the resources every planet
+    holds, the planets holding every resource, and the planets sharing a resource with each planet.
+    """
+    required_inorganics, required_organics = get_required_resources(resources_by_rarity, groups)
+    inorganic_groups_with_unique = load_resource_groups(INORGANIC_GROUPS_PATH)
+    resource_index = {resource: i for i, resource in enumerate(model["resources"])}
+
+    planet_resources = []
+    resource_planets = [[] for _ in model["resources"]]
+    for j, planet in enumerate(model["planets"]):
+        costs = get_assignment_costs(
+            planet, required_inorganics, required_organics, groups, inorganic_groups_with_unique
+        )
+        resources = sorted(resource_index[resource] for resource in costs)
+        planet_resources.append(resources)
+        for i in resources:
+            resource_planets[i].append(j)
+
+    neighbors = [
+        sorted({k for i in resources for k in resource_planets[i] if k != j})
+        for j, resources in enumerate(planet_resources)
+    ]
+    habitability_tiebreak = 1 / (sum(abs(value) for value in model["habitability"]) + 1)
+    return {
+        **model,
+        "planet_resources": planet_resources,
+        "resource_planets": resource_planets,
+        "neighbors": neighbors,
+        "tiebreak": [float(value) * habitability_tiebreak for value in model["habitability"]],
+    }
+
+
+def create_search_state(model, selection):
+    """
+    Returns the state of a selection: the selected planets, how many of them hold each resource,
+    the number of resources none holds, and the energy the search minimizes.
+    """
+    coverage = [0] * len(model["resources"])
+    for j in selection:
+        for i in model["planet_resources"][j]:
+            coverage[i] += 1
+    state = {
+        "selection": set(selection),
+        "coverage": coverage,
+        "uncovered": sum(1 for count in coverage if count == 0),
+        "tiebreak": sum(model["tiebreak"][j] for j in selection),
+    }
+    state["energy"] = get_energy(len(state["selection"]), state["uncovered"], state["tiebreak"])
+    return state
+
+
+def get_energy(planet_count, uncovered, tiebreak):
+    """Planets, plus a penalty per uncovered resource, minus a habitability tiebreak below one planet."""
+    return planet_count + UNCOVERED_PENALTY * uncovered - tiebreak
+
+
+def evaluate_move(model, state, removed, added):
+    """
+    Returns the energy of the state after the move, from the cached coverage counts of the
+    resources the moved planets hold only.
+    """
+    changes = {}
+    for j in removed:
+        for i in model["planet_resources"][j]:
+            changes[i] = changes.get(i, 0) - 1
+    for j in added:
+        for i in model["planet_resources"][j]:
+            changes[i] = changes.get(i, 0) + 1
+
+    uncovered = state["uncovered"]
+    for i, change in changes.items():
+        before = state["coverage"][i]
+        after = before + change
+        if before == 0 and after > 0:
+            uncovered -= 1
+        elif before > 0 and after == 0:
+            uncovered += 1
+
+    planet_count = len(state["selection"]) - len(removed) + len(added)
+    tiebreak = state["tiebreak"] - sum(model["tiebreak"][j] for j in removed) + sum(model["tiebreak"][j] for j in added)
+    return get_energy(planet_count, uncovered, tiebreak), uncovered, tiebreak
+
+
+def apply_move(model, state, removed, added, energy, uncovered, tiebreak):
+    for j in removed:
+        state["selection"].discard(j)
+        for i in model["planet_resources"][j]:
+            state["coverage"][i] -= 1
+    for j in added:
+        state["selection"].add(j)
+        for i in model["planet_resources"][j]:
+            state["coverage"][i] += 1
+    state.update({"energy": energy, "uncovered": uncovered, "tiebreak": tiebreak})
+
+
+def get_critical_resources(model, state, j):
+    """Resources only planet j holds among the selected planets."""
+    return [i for i in model["planet_resources"][j] if state["coverage"][i] == 1]
+
+
+def repair_coverage(model, state, removed, rng):
+    """
+    Picks planets for the resources left without a planet once `removed` is gone, each time the planet
+    holding most of them (ties at random).
+    Returns the list of planets to add.
+    """
+    coverage = list(state["coverage"])
+    for j in removed:
+        for i in model["planet_resources"][j]:
+            coverage[i] -= 1
+    missing = {i for i, count in enumerate(coverage) if count == 0}
+    selection = state["selection"] - set(removed)
+
+    added = []
+    while missing:
+        candidates = {k for i in missing for k in model["resource_planets"][i] if k not in selection}
+        if not candidates:
+            break
+        gains = {k: len(missing.intersection(model["planet_resources"][k])) for k in candidates}
+        best_gain = max(gains.values())
+        planet = rng.choice(sorted(k for k, gain in gains.items() if gain == best_gain))
+        added.append(planet)
+        selection.add(planet)
+        missing.difference_update(model["planet_resources"][planet])
+    return added
+
+
+def propose_move(model, state, rng):
+    """
+    Proposes one of three moves:
+    - swap: replace a selected planet by one sharing a resource with it, e.g. another planet with the same full chain.
+    - merge: replace two selected planets by one holding what only they hold, e.g. two chains on one planet.
+    - drop: remove a selected planet and repair the coverage it leaves behind.
+    Returns the removed and added planets, or None if the move does not apply.
+    """
+    selection = sorted(state["selection"])
+    move = rng.random()
+    if move < 0.4:
+        planet = rng.choice(selection)
+        candidates = [k for k in model["neighbors"][planet] if k not in state["selection"]]
+        if not candidates:
+            return None
+        return [planet], [rng.choice(candidates)]
+
+    if move < 0.7:
+        if len(selection) < 2:
+            return None
+        first, second = rng.sample(selection, 2)
+        critical = set(get_critical_resources(model, state, first)) | set(get_critical_resources(model, state, second))
+        if not critical:
+            return [first, second], []
+        gains = {}
+        for i in critical:
+            for k in model["resource_planets"][i]:
+                if k not in state["selection"]:
+                    gains[k] = gains.get(k, 0) + 1
+        if not gains:
+            return None
+        best_gain = max(gains.values())
+        return [first, second], [rng.choice(sorted(k for k, gain in gains.items() if gain == best_gain))]
+
+    planet = rng.choice(selection)
+    return [planet], repair_coverage(model, state, [planet], rng)
+
+
+def is_assignable(model, selection, feasibility_cache):
+    """True if the selected planets can hold every required resource within their capacity."""
+    key = frozenset(selection)
+    if key not in feasibility_cache:
+        order = sorted(selection)
+        edges = {(i, position): 0 for position, j in enumerate(order) for i in model["planet_resources"][j]}
+        bottleneck_resources, _ = find_assignment_bottleneck(model["resources"], len(order), edges)
+        feasibility_cache[key] = not bottleneck_resources
+    return feasibility_cache[key]
+
+
+def anneal(model, start_selection, budget, rng, feasibility_cache, iterations=ITERATIONS_PER_RESTART):
+    """
+    Runs one simulated annealing pass from `start_selection`. Moves that lower the energy are always
+    taken, others with probability exp(-increase / temperature).
+    Returns the best assignable selection seen and its energy, or (None, inf).
+    """
+    state = create_search_state(model, start_selection)
+    best_selection, best_energy = None, float("inf")
+    if state["uncovered"] == 0 and is_assignable(model, state["selection"], feasibility_cache):
+        best_selection, best_energy = set(state["selection"]), state["energy"]
+
+    cooling = (END_TEMPERATURE / START_TEMPERATURE) ** (1 / max(iterations - 1, 1))
+    temperature = START_TEMPERATURE
+    for _ in range(iterations):
+        if spend_budget(budget):
+            break
+        temperature *= cooling
+        move = propose_move(model, state, rng)
+        if move is None:
+            continue
+        removed, added = move
+        energy, uncovered, tiebreak = evaluate_move(model, state, removed, added)
+        increase = energy - state["energy"]
+        if increase > 0 and rng.random() >= math.exp(-increase / temperature):
+            continue
+        apply_move(model, state, removed, added, energy, uncovered, tiebreak)
+
+        if uncovered == 0 and energy < best_energy and is_assignable(model, state["selection"], feasibility_cache):
+            best_selection, best_energy = set(state["selection"]), energy
+    return best_selection, best_energy
+
+
+def kick_selection(model, selection, rng, kick=RESTART_KICK):
+    """Drops `kick` random planets from a selection and repairs its coverage, to start a restart elsewhere."""
+    state = create_search_state(model, selection)
+    removed = rng.sample(sorted(selection), min(kick, len(selection)))
+    added = repair_coverage(model, state, removed, rng)
+    return (set(selection) - set(removed)) | set(added)
+
+
+def find_greedy_selection(model, system_data, unique_resources, resources_by_rarity, groups):
+    """
+    Runs the greedy steps of find_outposts_fullchain on a copy of the data, without writing anything.
+    Returns the selection (model planet indices) of its plan.
+    """
+    system_data = deepcopy(system_data)
+    coverage = get_resource_coverage(system_data)
+    final_planets, processed_systems, captured_resources = capture_unique_resource_systems(
+        system_data, unique_resources, groups, coverage
+    )
+    final_planets, processed_systems, captured_resources = capture_full_chain_systems(
+        system_data, processed_systems, final_planets, captured_resources, resources_by_rarity, groups
+    )
+    final_planets = apply_highlander_rules(final_planets, captured_resources, resources_by_rarity, groups)
+    final_planets, _, _ = reduce_planet_count(
+        system_data, final_planets, captured_resources, resources_by_rarity, groups, coverage=coverage
+    )
+    return {model["planet_index"][planet["name"]] for planet in final_planets if planet["name"] in model["planet_index"]}
+
+
+def local_search(model, start_selection, time_limit=None, max_iterations=None, restarts=None, seed=None):
+    """
+    Improves `start_selection` by simulated annealing. The first pass starts from it, every restart from
+    the best plan so far after kick_selection. Runs until `restarts` restarts are done or the budget
+    (`time_limit` seconds, `max_iterations` moves) runs out; without any limit, a single pass is run.
+    Returns the best assignable selection, sorted, or None if none was found.
+    """
+    rng = random.Random(seed)
+    budget = create_budget(time_limit, max_iterations)
+    if restarts is None and time_limit is None and max_iterations is None:
+        restarts = 0
+    feasibility_cache = {}
+
+    best_selection, best_energy = None, float("inf")
+    start = set(start_selection)
+    start_state = create_search_state(model, start)
+    if start_state["uncovered"] == 0 and is_assignable(model, start, feasibility_cache):
+        best_selection, best_energy = start, start_state["energy"]
+
+    restart = 0
+    while True:
+        selection, energy = anneal(model, start, budget, rng, feasibility_cache)
+        if energy < best_energy:
+            best_selection, best_energy = selection, energy
+            print(f"Pass {restart + 1}: {len(best_selection)} planets, energy {best_energy:.4f}")
+        restart += 1
+        if (restarts is not None and restart > restarts) or budget_exhausted(budget):
+            break
+        start = kick_selection(model, best_selection or start, rng)
+
+    return sorted(best_selection) if best_selection is not None else None
+
+
+def find_outposts_with_local_search(time_limit=60, max_iterations=None, restarts=None, seed=None):
+    all_systems, rarity, unique, groups = load_all_data()
+
+    find_fullchain_planets(all_systems, groups["inorganic"])
+    find_unique_resources(all_systems, unique)
+
+    model = build_local_search_model(build_coverage_model(all_systems, rarity, groups), rarity, groups)
+    greedy_selection = find_greedy_selection(model, all_systems, unique, rarity, groups)
+    print(f"Greedy plan: {len(greedy_selection)} planets")
+
+    selection = local_search(model, greedy_selection, time_limit, max_iterations, restarts, seed)
+    if selection is None:
+        print("No plan capturing every resource was found.")
+        return []
+
+    final_planets, uncaptured_resources = build_verified_plan(model, selection, rarity, groups)
+    print(f"\nLocal search plan: {len(final_planets)} planets (greedy: {len(greedy_selection)})")
+    print_final_results(final_planets, uncaptured_resources)
+    return final_planets
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Improve the greedy plan by local search.")
+    parser.add_argument("--time-limit", type=float, default=60, help="Wall-clock budget in seconds.")
+    parser.add_argument("--max-iterations", type=int, help="Budget in moves.")
+    parser.add_argument("--restarts", type=int, help="Restarts after the first pass, until the budget runs out if unset.")
+    parser.add_argument("--seed", type=int, help="Random seed.")
+    args = parser.parse_args()
+    find_outposts_with_local_search(args.time_limit, args.max_iterations, args.restarts, args.seed)
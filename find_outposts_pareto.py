@@ -0,0 +1,329 @@
+import numpy as np
+from copy import deepcopy
+from scipy.optimize import milp, LinearConstraint, Bounds
+from scipy.sparse import csr_matrix
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+# Local Imports
+from config import INORGANIC_GROUPS_PATH
+from common import load_all_data, load_resource_groups
+from find_outposts_fullchain import (
+    OUTPOST_CAPACITY,
+    find_fullchain_planets,
+    find_unique_resources,
+    get_required_resources,
+    get_assignment_costs,
+    verify_final_planets,
+    recalculate_captured_resources,
+    calculate_uncaptured_resources,
+    print_final_results,
+)
+
+# The game allows 24 outposts, frontier points above that are not useful
+MAX_OUTPOSTS = 24
+
+# Habitability scores move in steps of 0.5. The tiebreak on outpost and system count
+# has to stay below that step for any plan size.
+TIEBREAK_WEIGHT = 1e-3
+
+
+def build_coverage_model(system_data, resources_by_rarity, groups, kept_planets=()):
+    """
+    Builds the planet selection model shared by every frontier point.
+    A plan picks planets (x), the systems they lie in (y) and assigns every required resource
+    to one picked planet holding it (a), at most OUTPOST_CAPACITY per planet. These are the
+    same rules verify_final_planets checks.
+    Planets named in `kept_planets` get a variable even when they capture nothing, so they can be pinned.
+    Returns a dictionary with the planets, systems, objective vectors and constraint matrix.
+    """
+    required_inorganics, required_organics = get_required_resources(resources_by_rarity, groups)
+    inorganic_groups_with_unique = load_resource_groups(INORGANIC_GROUPS_PATH)
+    resources = sorted(required_organics) + sorted(required_inorganics)
+    resource_index = {resource: i for i, resource in enumerate(resources)}
+
+    # Only planets that can capture something are worth a variable
+    planets = []
+    planet_systems = []
+    system_names = []
+    edges = []
+    for system in system_data:
+        system_planets = []
+        for planet in system["planets"]:
+            costs = get_assignment_costs(
+                planet, required_inorganics, required_organics, groups, inorganic_groups_with_unique
+            )
+            if not costs and planet["name"] not in kept_planets:
+                continue
+            for resource in costs:
+                edges.append((resource_index[resource], len(planets)))
+            system_planets.append(planet)
+            planets.append(planet)
+            planet_systems.append(len(system_names))
+        if system_planets:
+            system_names.append(system["name"])
+
+    planet_count = len(planets)
+    system_count = len(system_names)
+    edge_count = len(edges)
+    resource_count = len(resources)
+    habitability = np.array([float(planet["scores"]["habitability_score"]) for planet in planets])
+
+    # Variable layout: x (planets), y (systems), a (resource-planet edges)
+    x_offset, y_offset, a_offset = 0, planet_count, planet_count + system_count
+    variable_count = a_offset + edge_count
+
+    rows, cols, values = [], [], []
+
+    def add(row, col, value):
+        rows.append(row)
+        cols.append(col)
+        values.append(value)
+
+    # Every resource is assigned exactly once
+    for k, (i, j) in enumerate(edges):
+        add(i, a_offset + k, 1)
+    # A planet holds at most OUTPOST_CAPACITY resources, and only if it is picked
+    capacity_row = resource_count
+    for k, (i, j) in enumerate(edges):
+        add(capacity_row + j, a_offset + k, 1)
+    for j in range(planet_count):
+        add(capacity_row + j, x_offset + j, -OUTPOST_CAPACITY)
+    # A picked planet visits its system, a visited system has a picked planet
+    link_row = capacity_row + planet_count
+    for j in range(planet_count):
+        add(link_row + j, x_offset + j, 1)
+        add(link_row + j, y_offset + planet_systems[j], -1)
+    visit_row = link_row + planet_count
+    for j in range(planet_count):
+        add(visit_row + planet_systems[j], x_offset + j, -1)
+    for s in range(system_count):
+        add(visit_row + s, y_offset + s, 1)
+    # Budget rows, bounded per solve
+    outposts_row = visit_row + system_count
+    systems_row = outposts_row + 1
+    habitability_row = systems_row + 1
+    for j in range(planet_count):
+        add(outposts_row, x_offset + j, 1)
+        add(habitability_row, x_offset + j, habitability[j])
+    for s in range(system_count):
+        add(systems_row, y_offset + s, 1)
+
+    row_count = habitability_row + 1
+    matrix = csr_matrix((values, (rows, cols)), shape=(row_count, variable_count))
+
+    lower = np.full(row_count, -np.inf)
+    upper = np.zeros(row_count)
+    lower[:resource_count] = 1
+    upper[:resource_count] = 1
+    upper[outposts_row:] = np.inf
+
+    integrality = np.zeros(variable_count)
+    integrality[:a_offset] = 1
+
+    # Between plans of equal size, prefer the more habitable one
+    habitability_tiebreak = 1 / (np.abs(habitability).sum() + 1)
+    outposts_objective = np.zeros(variable_count)
+    outposts_objective[x_offset:y_offset] = 1 - habitability * habitability_tiebreak
+    habitability_objective = np.zeros(variable_count)
+    habitability_objective[x_offset:y_offset] = -habitability + TIEBREAK_WEIGHT
+    habitability_objective[y_offset:a_offset] = TIEBREAK_WEIGHT
+
+    return {
+        "planets": planets,
+        "planet_index": {planet["name"]: j for j, planet in enumerate(planets)},
+        "planet_systems": np.array(planet_systems),
+        "system_names": system_names,
+        "system_index": {name: s for s, name in enumerate(system_names)},
+        "resources": resources,
+        "habitability": habitability,
+        "matrix": matrix,
+        "lower": lower,
+        "upper": upper,
+        "integrality": integrality,
+        "rows": {"outposts": outposts_row, "systems": systems_row, "habitability": habitability_row},
+        "objectives": {"outposts": outposts_objective, "habitability": habitability_objective},
+    }
+
+
+def run_coverage_milp(
+    model,
+    objective,
+    max_outposts=None,
+    max_systems=None,
+    variable_lower=None,
+    variable_upper=None,
+    time_limit=None,
+):
+    """
+    Runs the MILP of the coverage model for one objective ('outposts' or 'habitability') under optional
+    outpost and system budgets. `variable_lower`/`variable_upper` fix variables per solve
+    (pinned or excluded planets and systems). The model itself is never modified.
+    Returns the scipy milp result, its status is 0 only when the optimum was proven.
+    """
+    lower = model["lower"]
+    upper = model["upper"].copy()
+    if max_outposts is not None:
+        upper[model["rows"]["outposts"]] = max_outposts
+    if max_systems is not None:
+        upper[model["rows"]["systems"]] = max_systems
+
+    variable_count = len(model["integrality"])
+    bounds = Bounds(
+        variable_lower if variable_lower is not None else np.zeros(variable_count),
+        variable_upper if variable_upper is not None else np.ones(variable_count),
+    )
+
+    # The habitability tiebreak is smaller than the default relative gap, close it to honor ties
+    options = {"mip_rel_gap": 0}
+    if time_limit:
+        options["time_limit"] = time_limit
+    result = milp(
+        model["objectives"][objective],
+        constraints=LinearConstraint(model["matrix"], lower, upper),
+        integrality=model["integrality"],
+        bounds=bounds,
+        options=options,
+    )
+    return result
+
+
+def solve_coverage_model(
+    model,
+    objective,
+    max_outposts=None,
+    max_systems=None,
+    variable_lower=None,
+    variable_upper=None,
+    time_limit=None,
+):
+    """
+    Solves the coverage model with run_coverage_milp.
+    Returns the sorted indices of the picked planets, or None if no plan fits the budgets.
+    """
+    result = run_coverage_milp(
+        model, objective, max_outposts, max_systems, variable_lower, variable_upper, time_limit
+    )
+    if result.x is None:
+        return None
+
+    planet_count = len(model["planets"])
+    return [j for j in range(planet_count) if result.x[j] > 0.5]
+
+
+def compute_planet_lower_bound(system_data, resources_by_rarity, groups, time_limit=None):
+    """
+    Returns the fewest planets any verified plan can have, from the coverage model.
+    Returns None if the MILP doesn't prove its optimum within `time_limit` seconds.
+    """
+    model = build_coverage_model(system_data, resources_by_rarity, groups)
+    result = run_coverage_milp(model, "outposts", time_limit=time_limit)
+    if result.status != 0:
+        return None
+    return int((result.x[: len(model["planets"])] > 0.5).sum())
+
+
+def evaluate_selection(model, selection):
+    """Returns the (outposts, habitability, systems) objectives of a planet selection."""
+    habitability = float(model["habitability"][selection].sum())
+    systems = len(set(model["planet_systems"][selection]))
+    return len(selection), habitability, systems
+
+
+def dominates(point, other):
+    """True if `point` is at least as good as `other` in every objective and better in one."""
+    outposts, habitability, systems = point
+    other_outposts, other_habitability, other_systems = other
+    no_worse = outposts <= other_outposts and habitability >= other_habitability and systems <= other_systems
+    return no_worse and (outposts, habitability, systems) != (other_outposts, other_habitability, other_systems)
+
+
+def find_pareto_front(model, max_outposts=MAX_OUTPOSTS):
+    """
+    Finds the Pareto frontier over outpost count (min), summed habitability (max) and
+    distinct systems (min) with the epsilon-constraint method: for every outpost budget,
+    maximize habitability, then tighten the system budget below the found plan until infeasible.
+    Returns a list of (objectives, selection) tuples sorted by outposts, then systems.
+    """
+    minimal = solve_coverage_model(model, "outposts")
+    if minimal is None:
+        return []
+
+    candidates = {}
+    for outpost_budget in range(len(minimal), max_outposts + 1):
+        system_budget = None
+        while True:
+            selection = solve_coverage_model(
+                model, "habitability", max_outposts=outpost_budget, max_systems=system_budget
+            )
+            if selection is None:
+                break
+            objectives = evaluate_selection(model, selection)
+            candidates.setdefault(objectives, selection)
+            system_budget = objectives[2] - 1
+
+    front = [
+        (objectives, selection)
+        for objectives, selection in candidates.items()
+        if not any(dominates(other, objectives) for other in candidates)
+    ]
+    return sorted(front, key=lambda point: (point[0][0], point[0][2], -point[0][1]))
+
+
+def build_verified_plan(model, selection, resources_by_rarity, groups):
+    """
+    Turns a selection into a verified plan. Planets are copied so the shared data stays untouched.
+    Returns the final planets and their uncaptured resources.
+    """
+    final_planets = []
+    for j in selection:
+        planet = deepcopy(model["planets"][j])
+        planet["system_name"] = model["system_names"][model["planet_systems"][j]]
+        final_planets.append(planet)
+
+    final_planets = verify_final_planets(final_planets, resources_by_rarity, groups)
+
+    captured_resources = recalculate_captured_resources(final_planets, None)
+    uncaptured_resources = calculate_uncaptured_resources(
+        captured_resources, resources_by_rarity, groups["gatherable_only"]
+    )
+    return final_planets, uncaptured_resources
+
+
+def print_pareto_front(front):
+    table = Table(title="Pareto Frontier", box=box.MINIMAL_HEAVY_HEAD)
+    table.add_column("Point", justify="right")
+    table.add_column("Outposts", justify="right")
+    table.add_column("Habitability", justify="right")
+    table.add_column("Systems", justify="right")
+    for idx, ((outposts, habitability, systems), _) in enumerate(front, 1):
+        table.add_row(str(idx), str(outposts), f"{habitability:.1f}", str(systems))
+    Console().print(table)
+
+
+def find_outposts_with_pareto_front(max_outposts=MAX_OUTPOSTS):
+    all_systems, rarity, unique, groups = load_all_data()
+
+    find_fullchain_planets(all_systems, groups["inorganic"])
+    find_unique_resources(all_systems, unique)
+
+    model = build_coverage_model(all_systems, rarity, groups)
+    front = find_pareto_front(model, max_outposts)
+
+    plans = []
+    for idx, (objectives, selection) in enumerate(front, 1):
+        final_planets, uncaptured_resources = build_verified_plan(model, selection, rarity, groups)
+        plans.append({"objectives": objectives, "final_planets": final_planets})
+        outposts, habitability, systems = objectives
+        print(f"\nFrontier Point {idx}: {outposts} outposts, habitability {habitability:.1f}, {systems} systems")
+        print_final_results(final_planets, uncaptured_resources)
+
+    print()
+    print_pareto_front(front)
+
+    return plans
+
+
+if __name__ == '__main__':
+    find_outposts_with_pareto_front()
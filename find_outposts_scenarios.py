@@ -0,0 +1,212 @@
+import operator
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+# Local Imports
+from config import SOLVER_CACHE_DIR
+from common import load_all_data, hash_data, load_cached_result, save_cached_result
+from find_outposts_fullchain import find_fullchain_planets, find_unique_resources
+from find_outposts_pareto import build_coverage_model, solve_coverage_model, build_verified_plan
+
+# Part of the scenario cache key. Bump when the model or scenario rules change.
+SCENARIO_CACHE_VERSION = 3
+
+FILTER_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+def get_filter_value(planet, attribute):
+    """
+    Returns a comparable value for a planet attribute. Gravity ('0.89g') and day length
+    ('32.0 hours') become floats, planet_type is its subtype, atmosphere is 'density type'.
+    """
+    attributes = planet["attributes"]
+    if attribute == "gravity":
+        return float(attributes["gravity"].replace("g", ""))
+    if attribute == "day_length":
+        return float(attributes["day_length"].split()[0])
+    if attribute == "planet_type":
+        return attributes["planet_type"][1]
+    if attribute == "atmosphere":
+        atmosphere = attributes["atmosphere"]
+        return f"{atmosphere.get('density', 'Unknown')} {atmosphere.get('type', 'Unknown')}"
+    if attribute in planet.get("scores", {}):
+        return float(planet["scores"][attribute])
+    return attributes.get(attribute)
+
+
+def matches_filter(planet, attribute_filter):
+    attribute, comparison, value = attribute_filter
+    planet_value = get_filter_value(planet, attribute)
+    if planet_value is None:
+        return False
+    return FILTER_OPERATORS[comparison](planet_value, value)
+
+
+def get_scenario_planets(scenario, system_data):
+    """
+    Checks the scenario's planet and system names against system_data.
+    Raises a ValueError for names not in system_data.
+    Returns the names of the planets the scenario pins, directly or through their system.
+    """
+    planets_by_system = {system["name"]: [planet["name"] for planet in system["planets"]] for system in system_data}
+    planet_names = {name for names in planets_by_system.values() for name in names}
+    for name in scenario.get("pinned_planets", []) + scenario.get("excluded_planets", []):
+        if name not in planet_names:
+            raise ValueError(f"Planet {name} not found.")
+    for name in scenario.get("pinned_systems", []) + scenario.get("excluded_systems", []):
+        if name not in planets_by_system:
+            raise ValueError(f"System {name} not found.")
+
+    pinned_planets = list(scenario.get("pinned_planets", []))
+    for name in scenario.get("pinned_systems", []):
+        pinned_planets.extend(planets_by_system[name])
+    return pinned_planets
+
+
+def get_scenario_bounds(model, scenario):
+    """
+    Translates a scenario into variable bounds on the coverage model from run_scenarios.
+    Scenario keys (all optional):
+    - pinned_planets / pinned_systems: must be part of the plan.
+    - excluded_planets / excluded_systems: may not be part of the plan. Excluding a planet
+      or system the model dropped changes nothing.
+    - exclude_where: list of (attribute, operator, value), e.g. ("gravity", ">", 2.0).
+      A planet matching any of them is excluded.
+    Returns the lower and upper bound arrays.
+    """
+    variable_count = len(model["integrality"])
+    planet_count = len(model["planets"])
+    lower = np.zeros(variable_count)
+    upper = np.ones(variable_count)
+
+    for name in scenario.get("excluded_planets", []):
+        if name in model["planet_index"]:
+            upper[model["planet_index"][name]] = 0
+    for name in scenario.get("excluded_systems", []):
+        if name in model["system_index"]:
+            upper[planet_count + model["system_index"][name]] = 0
+
+    for j, planet in enumerate(model["planets"]):
+        if any(matches_filter(planet, attribute_filter) for attribute_filter in scenario.get("exclude_where", [])):
+            upper[j] = 0
+
+    for name in scenario.get("pinned_planets", []):
+        if name not in model["planet_index"]:
+            raise ValueError(f"Pinned planet {name} is not in the model.")
+        lower[model["planet_index"][name]] = 1
+    for name in scenario.get("pinned_systems", []):
+        if name not in model["system_index"]:
+            raise ValueError(f"Pinned system {name} is not in the model.")
+        lower[planet_count + model["system_index"][name]] = 1
+
+    return lower, upper
+
+
+def solve_scenario(model, scenario, resources_by_rarity, groups, data_hash=None):
+    """
+    Solves one what-if scenario for the fewest outposts (most habitable plan on ties).
+    The model must keep the planets the scenario pins, see run_scenarios.
+    The shared model and planet dictionaries are left untouched, the plan holds copies.
+    When `data_hash` is given, results are cached under it and the scenario.
+    Returns a dictionary with the scenario name, planet count, final planets and uncaptured resources.
+    """
+    cache_key = None
+    if data_hash is not None:
+        cache_key = hash_data(SCENARIO_CACHE_VERSION, data_hash, scenario)
+        cached_result = load_cached_result(SOLVER_CACHE_DIR, cache_key)
+        if cached_result is not None:
+            cached_result["uncaptured_resources"] = {
+                resource_type: set(resources)
+                for resource_type, resources in cached_result["uncaptured_resources"].items()
+            }
+            return cached_result
+
+    lower, upper = get_scenario_bounds(model, scenario)
+    selection = solve_coverage_model(model, "outposts", variable_lower=lower, variable_upper=upper)
+
+    result = {
+        "name": scenario.get("name", ""),
+        "planet_count": None,
+        "final_planets": [],
+        "uncaptured_resources": {"inorganic": set(), "organic": set()},
+    }
+    if selection is not None:
+        final_planets, uncaptured_resources = build_verified_plan(model, selection, resources_by_rarity, groups)
+        result.update(
+            {
+                "planet_count": len(final_planets),
+                "final_planets": final_planets,
+                "uncaptured_resources": uncaptured_resources,
+            }
+        )
+
+    if cache_key is not None:
+        cached_result = dict(result)
+        cached_result["uncaptured_resources"] = {
+            resource_type: sorted(resources) for resource_type, resources in result["uncaptured_resources"].items()
+        }
+        save_cached_result(SOLVER_CACHE_DIR, cache_key, cached_result)
+    return result
+
+
+def run_scenarios(scenarios, system_data, resources_by_rarity, groups, use_cache=True):
+    """
+    Evaluates every scenario against one coverage model built from system_data.
+    Planets the scenarios pin are kept in the model even when they can't capture any required resource,
+    the other scenarios never pick them as they would only add an outpost.
+    Raises a ValueError for scenario names not in system_data.
+    Returns a list of scenario results in input order.
+    """
+    kept_planets = set()
+    for scenario in scenarios:
+        kept_planets.update(get_scenario_planets(scenario, system_data))
+    model = build_coverage_model(system_data, resources_by_rarity, groups, kept_planets)
+    data_hash = hash_data(system_data, resources_by_rarity, groups) if use_cache else None
+    return [
+        solve_scenario(model, scenario, resources_by_rarity, groups, data_hash) for scenario in scenarios
+    ]
+
+
+def print_scenario_results(results):
+    table = Table(title="Scenario Results", box=box.MINIMAL_HEAVY_HEAD)
+    table.add_column("Scenario")
+    table.add_column("Planets", justify="right")
+    table.add_column("Plan")
+    for result in results:
+        planet_count = str(result["planet_count"]) if result["planet_count"] is not None else "Infeasible"
+        planet_names = ", ".join(planet["name"] for planet in result["final_planets"])
+        table.add_row(result["name"], planet_count, planet_names)
+    Console().print(table)
+
+
+def find_outposts_with_scenarios():
+    all_systems, rarity, unique, groups = load_all_data()
+
+    find_fullchain_planets(all_systems, groups["inorganic"])
+    find_unique_resources(all_systems, unique)
+
+    scenarios = [
+        {"name": "Baseline"},
+        {"name": "Keep Schrodinger II", "pinned_planets": ["Schrodinger II"]},
+        {"name": "Gravity at most 2g", "exclude_where": [("gravity", ">", 2.0)]},
+        {"name": "No Narion", "excluded_systems": ["Narion"]},
+        {"name": "Habitable planets only", "exclude_where": [("habitability_score", "<", 0)]},
+    ]
+
+    results = run_scenarios(scenarios, all_systems, rarity, groups)
+    print_scenario_results(results)
+
+    return results
+
+
+if __name__ == '__main__':
+    find_outposts_with_scenarios()
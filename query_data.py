@@ -13,6 +13,7 @@ from common import (
     load_system_data,
     get_grouped_inorganics,
 )
+from resource_coverage import get_resource_coverage, get_group_matrix
 
 ### VALUES ###
 
@@ -579,7 +580,6 @@ def query_flora_fauna(planets):
 
 def query_biome_group_tendency(systems, planets):
     # TODO: Fix to use new biome_resources data.
-    resource_biome_data = []
     inorganic_rarity = load_resources(INORGANIC_DATA_PATH)
     gatherable_only = load_resource_groups(GATHERABLE_ONLY_PATH)
 
@@ -591,40 +591,35 @@ def query_biome_group_tendency(systems, planets):
 
     inorganic_groups = load_resource_groups(INORGANIC_GROUPS_PATH, unique)
     print(json.dumps(inorganic_groups, indent=4))
-    for system in systems:
-        for planet in system.get("planets", []):
-            grouped_resources = get_grouped_inorganics(
-                planet["resources"]["inorganic"], inorganic_groups
-            )
-            for resource in grouped_resources:
-                resource_biomes = {
-                    "planet": planet["name"],
-                    "resource": (
-                        [resource] if isinstance(resource, str) else resource
-                    ),  # Ensure resource is a list
-                    "biomes": planet.get("biomes", []),
-                }
-                resource_biome_data.append(resource_biomes)
+
+    # Like get_grouped_inorganics, a resource listed in several groups counts for the last one
+    resource_group = {
+        resource: group for group, group_resources in inorganic_groups.items() for resource in group_resources
+    }
+    counted_groups = {
+        group: [resource for resource in resource_group if resource_group[resource] == group]
+        for group in inorganic_groups
+    }
+
+    # Planets x groups (has any resource of the group), then groups x biome types
+    coverage = get_resource_coverage(systems)
+    planet_groups = (coverage["planet_resources"] @ get_group_matrix(coverage, counted_groups)) > 0
+    group_biomes = (planet_groups.T.astype(int) @ coverage["planet_biome_types"]).toarray()
+    group_totals = planet_groups.sum(axis=0).A1
 
     frequency_data = {}
     total_counts = {}
     total_biome_distribution = {}
-    # Populate frequency_data and total_counts
-    for datum in resource_biome_data:
-        for resource in datum["resource"]:  # Iterate over each resource in the list
-            if resource not in frequency_data:
-                frequency_data[resource] = {}
-                total_counts[resource] = 0
-            total_counts[
-                resource
-            ] += 1  # Increment total count for each resource occurrence
-            for biome in datum["biomes"]:
-                total_biome_distribution[biome] = (
-                    total_biome_distribution.get(biome, 0) + 1
-                )
-                frequency_data[resource][biome] = (
-                    frequency_data[resource].get(biome, 0) + 1
-                )
+    for group_column, group in enumerate(inorganic_groups):
+        if not group_totals[group_column]:
+            continue
+        total_counts[group] = int(group_totals[group_column])
+        frequency_data[group] = {}
+        for biome_column, biome in enumerate(coverage["biome_names"]):
+            count = int(group_biomes[group_column, biome_column])
+            if count:
+                frequency_data[group][biome] = count
+                total_biome_distribution[biome] = total_biome_distribution.get(biome, 0) + count
 
     # Convert total biome distribution to relative frequencies
     total_biome_count = sum(total_biome_distribution.values())
@@ -0,0 +1,193 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Local Imports
+from common import hash_data
+
+# Part of the coverage cache key. Bump when the matrix layout changes.
+COVERAGE_VERSION = 1
+
+# Coverage structures by dataset fingerprint, see get_resource_coverage
+_coverage_cache = {}
+
+
+def get_planet_biome_resources(planet, layout):
+    """
+    Returns a planet's (biome name, inorganic resources) pairs in biome order.
+    The 'systems' layout (INARA, raw, scored and final data) lists biomes in planet['biomes'] and their
+    resources in planet['biome_resources']; the 'almanac' layout keys planet['biomes'] by biome name.
+    """
+    if layout == "almanac":
+        return [
+            (biome_name, biome_data.get("resources", {}).get("inorganic", []))
+            for biome_name, biome_data in planet.get("biomes", {}).items()
+        ]
+    biome_resources = planet.get("biome_resources", {})
+    return [
+        (biome_name, biome_resources.get(biome_name, {}).get("inorganic", []))
+        for biome_name in planet.get("biomes", [])
+    ]
+
+
+def get_planet_resources(planet, layout):
+    """Returns a planet's inorganic and organic resources. Almanac planets hold what their biomes hold."""
+    if layout == "almanac":
+        inorganics = set()
+        for _, biome_inorganics in get_planet_biome_resources(planet, layout):
+            inorganics.update(biome_inorganics)
+        return {"inorganic": sorted(inorganics), "organic": []}
+    resources = planet.get("resources", {})
+    return {"inorganic": resources.get("inorganic", []), "organic": resources.get("organic", [])}
+
+
+def get_coverage_key(system_data, layout="systems"):
+    """Fingerprints only what the coverage is built from, so annotations added by the solvers don't change it."""
+    return hash_data(
+        COVERAGE_VERSION,
+        layout,
+        [
+            [planet["name"], get_planet_resources(planet, layout), get_planet_biome_resources(planet, layout)]
+            for system in system_data
+            for planet in system.get("planets", [])
+        ],
+    )
+
+
+def build_resource_coverage(system_data, layout="systems"):
+    """
+    Builds the sparse coverage of a dataset. Rows are planets (in system order) and their biomes,
+    columns are resources (sorted, inorganics and organics together).
+    - planet_resources: planets x resources, inorganic and organic resources of each planet.
+    - biome_resources: biomes x resources, inorganic resources of each biome.
+    - planet_biome_types: planets x biome names, how many times a planet lists each biome type.
+    The *_by_resource copies are the same matrices in CSC form, for fast column slicing.
+    Returns a dictionary with the matrices and the row and column labels.
+    """
+    planets = []
+    planet_systems = []
+    planet_resource_sets = []
+    biomes = []
+    biome_resource_sets = []
+    planet_biomes = []
+
+    for system in system_data:
+        for planet in system.get("planets", []):
+            planet_row = len(planets)
+            planets.append(planet["name"])
+            planet_systems.append(system["name"])
+            resources = get_planet_resources(planet, layout)
+            planet_resource_sets.append(set(resources["inorganic"]) | set(resources["organic"]))
+            biome_start = len(biomes)
+            for biome_name, biome_inorganics in get_planet_biome_resources(planet, layout):
+                biomes.append((planet_row, biome_name))
+                biome_resource_sets.append(set(biome_inorganics))
+            planet_biomes.append(range(biome_start, len(biomes)))
+
+    resource_types = {}
+    for system in system_data:
+        for planet in system.get("planets", []):
+            for resource_type, resources in get_planet_resources(planet, layout).items():
+                for resource in resources:
+                    resource_types.setdefault(resource, resource_type)
+    for resource_set in biome_resource_sets:
+        for resource in resource_set:
+            resource_types.setdefault(resource, "inorganic")
+    resources = sorted(resource_types)
+    resource_index = {resource: i for i, resource in enumerate(resources)}
+    biome_names = sorted({biome_name for _, biome_name in biomes})
+    biome_name_index = {biome_name: i for i, biome_name in enumerate(biome_names)}
+
+    def incidence(row_sets, column_index, column_count):
+        # Repeated columns in a row add up
+        rows, cols = [], []
+        for row, columns in enumerate(row_sets):
+            for column in sorted(column_index[column] for column in columns):
+                rows.append(row)
+                cols.append(column)
+        return csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(row_sets), column_count)
+        )
+
+    planet_resources = incidence(planet_resource_sets, resource_index, len(resources))
+    biome_resources = incidence(biome_resource_sets, resource_index, len(resources))
+    planet_biome_types = incidence(
+        [[biomes[row][1] for row in rows] for rows in planet_biomes], biome_name_index, len(biome_names)
+    )
+
+    return {
+        "planets": planets,
+        "planet_systems": planet_systems,
+        "planet_index": {name: row for row, name in reversed(list(enumerate(planets)))},
+        "biomes": biomes,
+        "planet_biomes": planet_biomes,
+        "biome_names": biome_names,
+        "resources": resources,
+        "resource_index": resource_index,
+        "resource_types": [resource_types[resource] for resource in resources],
+        "planet_resources": planet_resources,
+        "biome_resources": biome_resources,
+        "planet_biome_types": planet_biome_types,
+        "planet_resources_by_resource": planet_resources.tocsc(),
+        "biome_resources_by_resource": biome_resources.tocsc(),
+    }
+
+
+def get_resource_coverage(system_data, layout="systems"):
+    """
+    Returns the coverage of system_data (see build_resource_coverage), built once per dataset version
+    and reused by every caller in the process.
+    The lookup hashes the whole dataset, so look it up once per run and pass it down to the steps.
+    """
+    key = get_coverage_key(system_data, layout)
+    if key not in _coverage_cache:
+        _coverage_cache[key] = build_resource_coverage(system_data, layout)
+    return _coverage_cache[key]
+
+
+def get_row_resources(coverage, matrix, rows, resource_type=None):
+    """
+    Returns the set of resources held by any of `rows` (a row index or a list of them) of
+    coverage[matrix], optionally only those of `resource_type` ('inorganic' or 'organic').
+    """
+    matrix = coverage[matrix]
+    row_list = [rows] if isinstance(rows, (int, np.integer)) else list(rows)
+    columns = set()
+    for row in row_list:
+        columns.update(matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]].tolist())
+    return {
+        coverage["resources"][column]
+        for column in columns
+        if resource_type is None or coverage["resource_types"][column] == resource_type
+    }
+
+
+def get_resource_rows(coverage, matrix, resources):
+    """Returns the sorted rows of coverage[matrix] holding any of `resources`. Unknown resources hold nothing."""
+    by_resource = coverage[f"{matrix}_by_resource"]
+    rows = set()
+    for resource in resources:
+        column = coverage["resource_index"].get(resource)
+        if column is not None:
+            rows.update(by_resource.indices[by_resource.indptr[column]:by_resource.indptr[column + 1]].tolist())
+    return sorted(rows)
+
+
+def get_planet_row(coverage, planet_name):
+    """Returns the row of a planet, or None if the dataset has no planet of that name."""
+    return coverage["planet_index"].get(planet_name)
+
+
+def get_group_matrix(coverage, resource_groups):
+    """
+    Returns a resources x groups incidence matrix of `resource_groups` (group name to resources),
+    so `planet_resources @ group_matrix` counts each planet's resources per group.
+    """
+    rows, cols = [], []
+    for group_column, group_resources in enumerate(resource_groups.values()):
+        for resource in set(group_resources):
+            if resource in coverage["resource_index"]:
+                rows.append(coverage["resource_index"][resource])
+                cols.append(group_column)
+    return csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(len(coverage["resources"]), len(resource_groups))
+    )